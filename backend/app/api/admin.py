@@ -0,0 +1,191 @@
+"""Admin endpoints"""
+
+import asyncio
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal, get_db
+from app.services.retention_service import RetentionService, retention_sweeper
+from app.services.storage_service import StorageService
+from app.utils.logger import get_logger
+from app.utils.profiler import ProfilerBusyError, SamplingProfiler, profile_store
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _has_admin_token(request: Request) -> bool:
+    """Whether the request carries the configured admin token"""
+    token = request.headers.get("X-Admin-Token")
+    return bool(
+        settings.ADMIN_TOKEN
+        and token
+        and secrets.compare_digest(token, settings.ADMIN_TOKEN)
+    )
+
+
+async def require_admin(request: Request) -> None:
+    """
+    Dependency guarding admin endpoints.
+    
+    Raises:
+        HTTPException: 404 when no ADMIN_TOKEN is configured, 403 on a wrong token
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not _has_admin_token(request):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+async def profiling_requested(request: Request) -> bool:
+    """
+    Whether an admin asked to profile this request with `X-Profile: 1`.
+    
+    A single header lookup when the header is absent. Async so FastAPI
+    calls it inline instead of through the thread pool.
+    """
+    return request.headers.get("X-Profile") is not None and _has_admin_token(request)
+
+
+def _collapsed_response(collapsed: str, filename: str) -> PlainTextResponse:
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/profile", dependencies=[Depends(require_admin)])
+async def run_profile(
+    seconds: float = Query(default=10.0, gt=0),
+    interval_ms: Optional[float] = Query(default=None, gt=0)
+):
+    """
+    Sample every thread of this worker for a number of seconds.
+    
+    Args:
+        seconds: Profiling duration (capped at PROFILER_MAX_SECONDS)
+        interval_ms: Sampling interval (defaults to PROFILER_INTERVAL_MS)
+        
+    Returns:
+        Collapsed stacks, ready for flamegraph.pl or speedscope
+    """
+    seconds = min(seconds, settings.PROFILER_MAX_SECONDS)
+    profiler = SamplingProfiler((interval_ms or settings.PROFILER_INTERVAL_MS) / 1000)
+    
+    try:
+        profiler.start()
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        collapsed = profiler.stop()
+    
+    logger.info("Admin profile finished: %s samples over %.2fs", profiler.samples, profiler.duration)
+    return _collapsed_response(collapsed, "profile.collapsed")
+
+
+@router.post("/retention/sweep", dependencies=[Depends(require_admin)])
+async def sweep_sessions(
+    dry_run: bool = True,
+    limit: Optional[int] = Query(default=None, ge=1)
+):
+    """
+    Run the session retention sweep now.
+    
+    Defaults to a dry run that only reports what would be deleted.
+    
+    Args:
+        dry_run: Report without deleting
+        limit: Maximum number of sessions to process
+        
+    Returns:
+        Sweep report with counts and bytes reclaimed
+    """
+    return await RetentionService().sweep(dry_run=dry_run, limit=limit)
+
+
+@router.get("/retention", dependencies=[Depends(require_admin)])
+async def retention_status():
+    """Retention settings and the report of the last background sweep"""
+    return {
+        "enabled": retention_sweeper.running,
+        "retention_days": settings.SESSION_RETENTION_DAYS,
+        "interval_minutes": settings.RETENTION_SWEEP_INTERVAL_MINUTES,
+        "last_report": retention_sweeper.last_report
+    }
+
+
+@router.get("/storage/top", dependencies=[Depends(require_admin)])
+async def storage_top_consumers(
+    limit: int = Query(default=20, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    Sessions using the most storage.
+    
+    Args:
+        limit: Maximum number of sessions
+        db: Database session
+        
+    Returns:
+        Global usage, configured quotas and per-session breakdowns
+    """
+    return {
+        "total_bytes": StorageService.get_global_usage(db),
+        "session_quota_bytes": settings.SESSION_STORAGE_QUOTA_BYTES,
+        "global_quota_bytes": settings.GLOBAL_STORAGE_QUOTA_BYTES,
+        "sessions": StorageService.top_consumers(db, limit)
+    }
+
+
+@router.post("/storage/reconcile", dependencies=[Depends(require_admin)])
+async def reconcile_storage():
+    """
+    Rebuild storage counters from disk.
+    
+    A one-off backfill for sessions created before storage accounting;
+    walks every session's directories on the default executor.
+    
+    Returns:
+        Number of sessions reconciled and the new global total
+    """
+    def _reconcile():
+        db = SessionLocal()
+        try:
+            return StorageService.reconcile(db)
+        finally:
+            db.close()
+    
+    return await asyncio.get_running_loop().run_in_executor(None, _reconcile)
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """List stored per-request profiles"""
+    return {"profiles": profile_store.list()}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str):
+    """
+    Get a stored per-request profile.
+    
+    Args:
+        profile_id: Id from the X-Profile-Id response header (or the document id for uploads)
+        
+    Returns:
+        Collapsed stacks
+    """
+    collapsed = profile_store.get(profile_id)
+    
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    return _collapsed_response(collapsed, f"{profile_id}.collapsed")
@@ -1,45 +1,77 @@
 """Chat API endpoints"""
 
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models import MessageRole
+from app.api.admin import profiling_requested
 from app.schemas import (
     ChatRequest,
     ChatResponse,
     ChatHistoryResponse,
     CleanupResponse,
+    MessageVisualsResponse,
     VisualContent
 )
 from app.services.rag_service import RAGService
+from app.services.providers import get_rag_service
+from app.services.retrieval_cache import retrieval_cache
 from app.services.chat_service import ChatService
-from app.utils.logger import logger
+from app.services.chat_writer import chat_turn_writer
+from app.services.llm_client import LLMUnavailableError
+from app.utils.logger import get_logger
+from app.utils.profiler import finish_request_profile, start_request_profile
 
 router = APIRouter(prefix="/chat", tags=["chat"])
-
-# Initialize services
-rag_service = RAGService()
+logger = get_logger(__name__)
 
 
 @router.post("", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: Session = Depends(get_db),
+    rag_service: RAGService = Depends(get_rag_service),
+    profile: bool = Depends(profiling_requested)
 ):
     """
     Send a chat message and get AI response.
     
+    Admins can send `X-Profile: 1` with their `X-Admin-Token` to sample
+    the worker while the request runs; the profile id is returned in the
+    `X-Profile-Id` header.
+    
     Args:
         request: Chat request with query and session info
+        response: Response used for the profile header
         db: Database session
+        rag_service: Shared RAG service
+        profile: Whether this request is profiled
         
     Returns:
         Chat response with answer and visuals
     """
+    if not profile:
+        return await _chat(request, db, rag_service)
+    
+    profiler = start_request_profile()
     try:
-        logger.info(f"Chat request from session {request.session_id}: {request.query[:100]}")
+        return await _chat(request, db, rag_service)
+    finally:
+        if profiler:
+            response.headers["X-Profile-Id"] = finish_request_profile(profiler)
+
+
+async def _chat(
+    request: ChatRequest,
+    db: Session,
+    rag_service: RAGService
+) -> ChatResponse:
+    """Answer a chat request and persist the turn"""
+    try:
+        logger.info("Chat request from session %s: %.100s", request.session_id, request.query)
         
         # Get chat history for context
         chat_history = ChatService.get_history_for_context(
@@ -48,76 +80,139 @@ async def chat(
             limit=10
         )
         
+        # Include turns still queued for write-behind
+        if chat_turn_writer.running:
+            chat_history = (
+                chat_history + chat_turn_writer.pending_context(request.session_id)
+            )[-10:]
+        
         # Query RAG system
         result = await rag_service.query_with_history(
             query=request.query,
             session_id=request.session_id,
             chat_history=chat_history,
             num_chunks=request.num_chunks,
-            document_ids=request.document_ids
-        )
-        
-        # Save user message
-        ChatService.create_message(
-            db,
-            session_id=request.session_id,
-            role=MessageRole.USER,
-            content=request.query
+            document_ids=request.document_ids,
+            mmr_lambda=request.mmr_lambda
         )
         
-        # Save assistant message
-        message = ChatService.create_message(
-            db,
+        # Save user and assistant messages as one turn
+        user_message, message = ChatService.build_turn(
             session_id=request.session_id,
-            role=MessageRole.ASSISTANT,
-            content=result["answer"],
+            query=request.query,
+            answer=result["answer"],
             visuals={
                 "chunks": result["chunks"],
                 "tables": result["tables"],
                 "images": result["images"]
             }
         )
+        message_id = message.id
+        message_timestamp = message.timestamp
+        
+        ChatService.touch_session(db, request.session_id)
+        
+        if chat_turn_writer.running:
+            await chat_turn_writer.submit((user_message, message))
+        else:
+            ChatService.save_turns(db, [(user_message, message)])
         
         return ChatResponse(
-            message_id=message.id,
+            message_id=message_id,
             answer=result["answer"],
             visuals=VisualContent(
                 tables=result["tables"],
                 images=result["images"],
                 chunks=result["chunks"]
             ),
-            timestamp=message.timestamp,
+            timestamp=message_timestamp,
             processing_time=result["processing_time"]
         )
         
+    except LLMUnavailableError as e:
+        logger.warning("Chat rejected, LLM unavailable: %s", e.detail)
+        raise HTTPException(status_code=503, detail=e.message)
     except Exception as e:
-        logger.error(f"Chat failed: {e}", exc_info=True)
+        logger.error("Chat failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/history/{session_id}", response_model=ChatHistoryResponse)
 async def get_history(
     session_id: str,
-    limit: int = 50,
+    limit: int = Query(default=50, ge=1, le=200),
+    before: Optional[str] = None,
+    include_visuals: bool = False,
     db: Session = Depends(get_db)
 ):
     """
-    Get chat history for a session.
+    Get chat history for a session, newest page first.
+    
+    Assistant messages carry lightweight visual references unless
+    include_visuals is set; use /chat/messages/{message_id}/visuals to
+    fetch the full tables and images of a single message.
     
     Args:
         session_id: Session identifier
         limit: Maximum number of messages
+        before: Cursor from a previous response to fetch older messages
+        include_visuals: Return full visuals instead of references
         db: Database session
         
     Returns:
         Chat history
     """
-    messages = ChatService.get_history(db, session_id, limit)
+    # Make queued turns visible before reading
+    if chat_turn_writer.running:
+        await chat_turn_writer.flush()
+    
+    try:
+        messages, next_cursor = ChatService.get_history_page(
+            db,
+            session_id,
+            limit=limit,
+            cursor=before,
+            include_visuals=include_visuals
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return ChatHistoryResponse(
         session_id=session_id,
         messages=messages,
-        total_count=len(messages)
+        total_count=len(messages),
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/messages/{message_id}/visuals", response_model=MessageVisualsResponse)
+async def get_message_visuals(
+    message_id: str,
+    session_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the full visual content of a single chat message.
+    
+    Args:
+        message_id: Message identifier
+        session_id: Session the message belongs to
+        db: Database session
+        
+    Returns:
+        Tables, images and chunks of the message
+    """
+    if chat_turn_writer.running:
+        await chat_turn_writer.flush()
+    
+    visuals = ChatService.get_message_visuals(db, session_id, message_id)
+    
+    if visuals is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    
+    return MessageVisualsResponse(
+        message_id=message_id,
+        visuals=VisualContent(**visuals)
     )
 
 
@@ -136,12 +231,35 @@ async def clear_history(
     Returns:
         Cleanup response
     """
+    await chat_turn_writer.discard_session(session_id)
     count = ChatService.clear_history(db, session_id)
     
-    logger.info(f"Cleared chat history for session {session_id}: {count} messages")
+    logger.info("Cleared chat history for session %s: %d messages", session_id, count)
     
     return CleanupResponse(
         status="success",
         message=f"Chat history cleared successfully",
         deleted_items={"messages": count}
     )
+
+
+@router.get("/llm/stats")
+async def get_llm_stats(rag_service: RAGService = Depends(get_rag_service)):
+    """
+    Get LLM client metrics.
+    
+    Returns:
+        Request, retry, hedging and circuit breaker counters with latency percentiles
+    """
+    return rag_service.llm.stats()
+
+
+@router.get("/retrieval/stats")
+async def get_retrieval_stats():
+    """
+    Get retrieval cache metrics.
+    
+    Returns:
+        Hits, misses, hit rate, entries and invalidations of this worker's cache
+    """
+    return retrieval_cache.stats()
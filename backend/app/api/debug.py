@@ -0,0 +1,55 @@
+"""Debug endpoints for inspecting recorded traces"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.admin import require_admin
+from app.utils.tracing import exporter
+
+# Span attributes carry session ids, which grant access to a session's data
+router = APIRouter(prefix="/debug", tags=["debug"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/traces")
+async def list_traces(
+    limit: int = Query(default=50, ge=1, le=500),
+    document_id: Optional[str] = None,
+    session_id: Optional[str] = None
+):
+    """
+    List recent traces, newest first.
+    
+    Args:
+        limit: Maximum number of traces
+        document_id: Only traces that touched this document
+        session_id: Only traces that touched this session
+        
+    Returns:
+        Trace summaries
+    """
+    attribute = None
+    if document_id:
+        attribute = ("document_id", document_id)
+    elif session_id:
+        attribute = ("session_id", session_id)
+    
+    return {"traces": exporter.recent_traces(limit, attribute)}
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """
+    Get all buffered spans of a trace.
+    
+    Args:
+        trace_id: Trace identifier (also returned in the X-Trace-Id header)
+        
+    Returns:
+        Spans in start order
+    """
+    spans = exporter.get_trace(trace_id)
+    
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    
+    return {"trace_id": trace_id, "spans": spans}
@@ -1,19 +1,50 @@
 """Document management endpoints"""
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import Document, Session as SessionModel
 from app.schemas import CleanupResponse
 from app.services.vectorization_service import VectorizationService
-from app.utils.logger import logger
+from app.services.chat_writer import chat_turn_writer
+from app.services.image_service import ImageService
+from app.services.ingestion_checkpoint import IngestionCheckpoint
+from app.services.retrieval_cache import retrieval_cache
+from app.services.storage_service import StorageService
+from app.utils.logger import get_logger
 import shutil
 from pathlib import Path
 
+logger = get_logger(__name__)
+
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
+@router.get("/images/{session_id}/{image_id}")
+async def get_image(session_id: str, image_id: str):
+    """
+    Get a full-size normalized image.
+    
+    Args:
+        session_id: Session identifier
+        image_id: Image identifier from chat visuals
+        
+    Returns:
+        Image file
+    """
+    image_path = ImageService.get_image_path(session_id, image_id)
+    
+    if not image_path:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    return FileResponse(
+        image_path,
+        headers={"Cache-Control": "private, max-age=31536000, immutable"}
+    )
+
+
 @router.delete("/{document_id}", response_model=CleanupResponse)
 async def delete_document(
     document_id: str,
@@ -40,13 +71,17 @@ async def delete_document(
         if file_path.exists():
             file_path.unlink()
     except Exception as e:
-        logger.error(f"Failed to delete file: {e}")
+        logger.error("Failed to delete file: %s", e)
+    
+    IngestionCheckpoint(document.session_id, document_id).clear()
     
     # Delete from database
+    StorageService.add(db, document.session_id, commit=False, upload=-document.file_size)
     db.delete(document)
     db.commit()
+    retrieval_cache.invalidate(document.session_id)
     
-    logger.info(f"Deleted document: {document_id}")
+    logger.info("Deleted document: %s", document_id)
     
     return CleanupResponse(
         status="success",
@@ -86,19 +121,26 @@ async def clear_session(
             if file_path.exists():
                 file_path.unlink()
         except Exception as e:
-            logger.error(f"Failed to delete file: {e}")
+            logger.error("Failed to delete file: %s", e)
     
     # Delete vector store
     vectorization_service = VectorizationService()
     vector_deleted = vectorization_service.delete_vector_store(session_id)
+    retrieval_cache.invalidate(session_id)
+    
+    # Delete normalized images
+    ImageService.delete_session_images(session_id)
+    IngestionCheckpoint.clear_session(session_id)
+    
+    # Drop chat turns still queued for write-behind
+    await chat_turn_writer.discard_session(session_id)
     
     # Delete session (cascades to documents and messages)
     db.delete(session)
     db.commit()
     
     logger.info(
-        f"Cleared session {session_id}: "
-        f"{document_count} documents, {message_count} messages"
+        "Cleared session %s: %s documents, %s messages", session_id, document_count, message_count
     )
     
     return CleanupResponse(
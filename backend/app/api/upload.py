@@ -1,32 +1,90 @@
 """Upload API endpoints"""
 
+import asyncio
+import time
 import uuid
-import shutil
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, Form, Depends, BackgroundTasks, HTTPException
+from typing import Optional, Set
+from fastapi import APIRouter, Request, Depends, BackgroundTasks, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.api.admin import profiling_requested
 from app.config import settings
 from app.models import Document, DocumentStatus, Session as SessionModel
 from app.schemas import DocumentUploadResponse, DocumentResponse
+from app.services.chat_service import ChatService
 from app.services.document_processor import DocumentProcessor
 from app.services.chunking_service import ChunkingService
+from app.services.summarization_service import SummarizationService
+from app.services.image_service import ImageService
+from app.services.ingestion_checkpoint import IngestionCheckpoint
+from app.services.document_router import DocumentRouter
+from app.services.retrieval_cache import retrieval_cache
+from app.services.storage_service import StorageService
 from app.services.vectorization_service import VectorizationService
-from app.utils.logger import logger
-from app.utils.error_handlers import handle_file_validation_error
+from app.utils.logger import get_logger
+from app.utils.error_handlers import FileValidationError, QuotaExceededError, raise_http_exception
+from app.utils.metrics import INGESTION_DOCUMENTS, INGESTION_IN_PROGRESS, INGESTION_STAGE_SECONDS
+from app.utils.upload_stream import receive_pdf_upload
 from app.utils.progress_tracker import ProgressTracker
+from app.utils.profiler import finish_request_profile, start_request_profile
+from app.utils.tracing import SpanContext, current_context, run_in_executor, set_attribute, span
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
+# Resumed ingestions, referenced until they finish
+_recovery_tasks: Set[asyncio.Task] = set()
+
+
+async def _save_checkpoint(save, *args) -> None:
+    """Run a checkpoint write; a failed write only costs the ability to resume"""
+    try:
+        await run_in_executor(save, *args)
+    except Exception as e:
+        logger.warning("Failed to write ingestion checkpoint: %s", e)
+
 
 async def process_document_background(
     document_id: str,
     file_path: str,
     session_id: str,
-    document_name: str
+    document_name: str,
+    trace_context: Optional[SpanContext] = None,
+    profile: bool = False,
+    resume: bool = False
 ):
     """Background task to process uploaded document"""
+    profiler = start_request_profile() if profile else None
+    try:
+        with span(
+            "ingest.document",
+            parent=trace_context,
+            document_id=document_id,
+            session_id=session_id
+        ):
+            await _process_document(document_id, file_path, session_id, document_name, resume)
+    finally:
+        if profiler:
+            # Stored under the document id: /api/admin/profiles/{document_id}
+            finish_request_profile(profiler, profile_id=document_id)
+
+
+async def _process_document(
+    document_id: str,
+    file_path: str,
+    session_id: str,
+    document_name: str,
+    resume: bool = False
+):
+    """
+    Run the ingestion pipeline for an uploaded document.
+    
+    The output of each stage is checkpointed, and with resume the
+    pipeline continues after the last checkpointed stage.
+    """
     from app.database import SessionLocal
     from app.api.websocket import send_progress_update
     db = SessionLocal()
@@ -58,6 +116,8 @@ async def process_document_background(
                 accumulated_details['filename'] = progress_update.details.filename
             if hasattr(progress_update.details, 'file_size') and progress_update.details.file_size:
                 accumulated_details['file_size'] = progress_update.details.file_size
+            if hasattr(progress_update.details, 'image_bytes_saved') and progress_update.details.image_bytes_saved:
+                accumulated_details['image_bytes_saved'] = progress_update.details.image_bytes_saved
         
         message = (progress_update.details.message if progress_update.details and 
                   hasattr(progress_update.details, 'message') and progress_update.details.message 
@@ -76,7 +136,7 @@ async def process_document_background(
         # Get document
         document = db.query(Document).filter(Document.id == document_id).first()
         if not document:
-            logger.error(f"Document not found: {document_id}")
+            logger.error("Document not found: %s", document_id)
             return
         
         # Initialize services
@@ -91,52 +151,100 @@ async def process_document_background(
         accumulated_details['filename'] = document.filename
         accumulated_details['file_size'] = document.file_size
         
-        # Update status and send immediate progress
-        document.status = DocumentStatus.PARTITIONING
-        db.commit()
-        
-        # Send initial partitioning update with document info
-        await send_progress_update(session_id, {
-            "stage": "partitioning",
-            "status": "processing",
-            "progress": 0,
-            "message": "Starting document analysis...",
-            "details": accumulated_details.copy()
-        })
-        
-        # Step 1: Partition PDF
-        partition_result = await doc_processor.partition_pdf(file_path, progress_tracker)
-        document.element_count = partition_result["total"]
-        document.element_counts = partition_result["counts"]
-        db.commit()
-        
-        # Update accumulated details with partition results
-        accumulated_details['elements_count'] = partition_result['total']
-        accumulated_details['element_types'] = partition_result['counts']
-        
-        # Step 2: Create chunks
-        document.status = DocumentStatus.CHUNKING
-        db.commit()
-        
-        # Send chunking start update with all accumulated details
-        await send_progress_update(session_id, {
-            "stage": "chunking",
-            "status": "processing",
-            "progress": 0,
-            "message": f"Creating chunks from {partition_result['total']} elements...",
-            "details": accumulated_details.copy()
-        })
-        
-        chunks = await chunking_service.create_chunks(
-            partition_result["elements"],
-            progress_tracker
-        )
-        document.chunk_count = len(chunks)
-        db.commit()
+        checkpoint = IngestionCheckpoint(session_id, document_id)
+        state = await run_in_executor(checkpoint.load_state) if resume else {"stage": None, "vector_offset": 0}
+        last_stage = state["stage"]
+        if resume:
+            logger.info("Resuming document %s after stage: %s", document_id, last_stage or 'none')
+            set_attribute("resumed_after", last_stage or "none")
+        
+        if IngestionCheckpoint.reached(last_stage, "chunk"):
+            chunks = await run_in_executor(checkpoint.load_chunks)
+            accumulated_details['elements_count'] = document.element_count
+            accumulated_details['element_types'] = document.element_counts
+        else:
+            if IngestionCheckpoint.reached(last_stage, "partition"):
+                partition_result = await run_in_executor(checkpoint.load_partition)
+            else:
+                # Update status and send immediate progress
+                document.status = DocumentStatus.PARTITIONING
+                db.commit()
+                
+                # Send initial partitioning update with document info
+                await send_progress_update(session_id, {
+                    "stage": "partitioning",
+                    "status": "processing",
+                    "progress": 0,
+                    "message": "Starting document analysis...",
+                    "details": accumulated_details.copy()
+                })
+                
+                # Step 1: Partition PDF
+                stage_started = time.perf_counter()
+                partition_result = await doc_processor.partition_pdf(file_path, progress_tracker)
+                INGESTION_STAGE_SECONDS.labels("partition").observe(time.perf_counter() - stage_started)
+                document.element_count = partition_result["total"]
+                document.element_counts = partition_result["counts"]
+                db.commit()
+                await _save_checkpoint(checkpoint.save_partition, partition_result)
+            
+            # Update accumulated details with partition results
+            accumulated_details['elements_count'] = partition_result['total']
+            accumulated_details['element_types'] = partition_result['counts']
+            
+            # Step 2: Create chunks
+            document.status = DocumentStatus.CHUNKING
+            db.commit()
+            
+            # Send chunking start update with all accumulated details
+            await send_progress_update(session_id, {
+                "stage": "chunking",
+                "status": "processing",
+                "progress": 0,
+                "message": f"Creating chunks from {partition_result['total']} elements...",
+                "details": accumulated_details.copy()
+            })
+            
+            stage_started = time.perf_counter()
+            chunks = await chunking_service.create_chunks(
+                partition_result["elements"],
+                progress_tracker
+            )
+            INGESTION_STAGE_SECONDS.labels("chunk").observe(time.perf_counter() - stage_started)
+            document.chunk_count = len(chunks)
+            db.commit()
+            await _save_checkpoint(checkpoint.save_chunks, chunks, "chunk")
         
         # Update accumulated details with chunk count
         accumulated_details['chunks_count'] = len(chunks)
         
+        if not IngestionCheckpoint.reached(last_stage, "prepare"):
+            # Downscale and transcode images once, keeping thumbnails inline
+            if settings.IMAGE_NORMALIZATION:
+                stage_started = time.perf_counter()
+                image_stats = await ImageService().normalize_chunks(chunks, session_id, progress_tracker)
+                StorageService.add(db, session_id, image=image_stats["stored_bytes"])
+                INGESTION_STAGE_SECONDS.labels("images").observe(time.perf_counter() - stage_started)
+            
+            # Optional: summarize chunks for denser embeddings
+            if settings.SUMMARIZATION_ENABLED:
+                document.status = DocumentStatus.SUMMARIZING
+                db.commit()
+                
+                await send_progress_update(session_id, {
+                    "stage": "summarization",
+                    "status": "processing",
+                    "progress": 0,
+                    "message": f"Summarizing {len(chunks)} chunks...",
+                    "details": accumulated_details.copy()
+                })
+                
+                stage_started = time.perf_counter()
+                chunks = await SummarizationService().summarize_chunks(chunks, progress_tracker)
+                INGESTION_STAGE_SECONDS.labels("summarize").observe(time.perf_counter() - stage_started)
+            
+            await _save_checkpoint(checkpoint.save_chunks, chunks, "prepare")
+        
         # Step 3: Vectorize
         document.status = DocumentStatus.VECTORIZING
         db.commit()
@@ -150,17 +258,42 @@ async def process_document_background(
             "details": accumulated_details.copy()
         })
         
+        async def save_vector_offset(offset: int) -> None:
+            await _save_checkpoint(checkpoint.save_vector_offset, offset)
+        
         await vectorization_service.create_vector_store(
             chunks,
             session_id,
             document_id,
             document_name,
-            progress_tracker
+            progress_tracker,
+            start_offset=state["vector_offset"],
+            on_batch_stored=save_vector_offset
         )
         
+        # Summary embedding for document routing, from the vectors just stored
+        try:
+            document.summary_embedding = await run_in_executor(
+                DocumentRouter.compute_summary,
+                vectorization_service,
+                session_id,
+                document_id
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Failed to compute summary embedding for %s: %s", document_id, e)
+        
+        retrieval_cache.invalidate(session_id)
+        StorageService.set_vector_bytes(db, session_id, StorageService.measure_vector_store(session_id))
+        
         # Complete
         document.status = DocumentStatus.COMPLETED
+        document.ingest_owner = None
         db.commit()
+        await run_in_executor(checkpoint.clear)
+        INGESTION_DOCUMENTS.labels("completed").inc()
+        set_attribute("status", DocumentStatus.COMPLETED.value)
         
         # Update accumulated details with final counts
         accumulated_details['elements_count'] = document.element_count
@@ -176,13 +309,17 @@ async def process_document_background(
             "details": accumulated_details.copy()
         })
         
-        logger.info(f"Document processing completed: {document_id}")
+        logger.info("Document processing completed: %s", document_id)
         
     except Exception as e:
-        logger.error(f"Document processing failed: {e}", exc_info=True)
+        logger.error("Document processing failed: %s", e, exc_info=True)
         document.status = DocumentStatus.FAILED
         document.error_message = str(e)
+        document.ingest_owner = None
         db.commit()
+        await run_in_executor(IngestionCheckpoint(session_id, document_id).clear)
+        INGESTION_DOCUMENTS.labels("failed").inc()
+        set_attribute("status", DocumentStatus.FAILED.value)
         
         # Send error update via WebSocket
         await send_progress_update(session_id, {
@@ -194,77 +331,207 @@ async def process_document_background(
         })
     
     finally:
+        INGESTION_IN_PROGRESS.dec()
         db.close()
 
 
-@router.post("", response_model=DocumentUploadResponse)
+async def resume_interrupted_documents() -> int:
+    """
+    Resume the ingestion of documents whose process died mid-pipeline.
+    
+    Runs at startup. A document still in progress is taken over when its
+    owner is unset, is this process's own identity from before a restart,
+    is a process on this host that no longer exists, or ran under another
+    hostname (a previous container). The claim is a compare-and-set on
+    ingest_owner, so concurrently starting workers never resume the same
+    document twice.
+    
+    Returns:
+        Number of documents resumed
+    """
+    from app.database import SessionLocal
+    from app.services.retention_service import IN_PROGRESS_STATUSES
+    
+    owner = IngestionCheckpoint.owner()
+    resumed = []
+    
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            Document.id,
+            Document.session_id,
+            Document.filename,
+            Document.file_path,
+            Document.ingest_owner
+        ).filter(Document.status.in_(IN_PROGRESS_STATUSES)).all()
+        
+        for row in rows:
+            if row.ingest_owner != owner and IngestionCheckpoint.owner_alive(row.ingest_owner):
+                continue
+            
+            previous_owner = (
+                Document.ingest_owner.is_(None) if row.ingest_owner is None
+                else Document.ingest_owner == row.ingest_owner
+            )
+            claimed = db.query(Document)\
+                .filter(Document.id == row.id, previous_owner)\
+                .update({Document.ingest_owner: owner}, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                continue
+            
+            if not Path(row.file_path).exists():
+                logger.warning("Cannot resume document %s: file %s is missing", row.id, row.file_path)
+                db.query(Document).filter(Document.id == row.id).update({
+                    Document.status: DocumentStatus.FAILED,
+                    Document.error_message: "Processing was interrupted and the uploaded file is missing",
+                    Document.ingest_owner: None
+                }, synchronize_session=False)
+                db.commit()
+                await run_in_executor(IngestionCheckpoint(row.session_id, row.id).clear)
+                INGESTION_DOCUMENTS.labels("failed").inc()
+                continue
+            
+            resumed.append(row)
+    finally:
+        db.close()
+    
+    for row in resumed:
+        INGESTION_IN_PROGRESS.inc()
+        task = asyncio.create_task(process_document_background(
+            row.id,
+            row.file_path,
+            row.session_id,
+            row.filename,
+            resume=True
+        ))
+        _recovery_tasks.add(task)
+        task.add_done_callback(_recovery_tasks.discard)
+    
+    if resumed:
+        logger.info("Resuming %s interrupted document(s)", len(resumed))
+    
+    return len(resumed)
+
+
+def _raise_quota_exceeded(error: QuotaExceededError) -> None:
+    """Map a quota error to 413 (session quota) or 507 (server quota)"""
+    status_code = (
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE if error.scope == "session"
+        else status.HTTP_507_INSUFFICIENT_STORAGE
+    )
+    logger.warning("Upload rejected: %s (%s)", error.message, error.detail)
+    raise_http_exception(status_code, error.message, error.detail)
+
+
+@router.post(
+    "",
+    response_model=DocumentUploadResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {
+                            "file": {"type": "string", "format": "binary"},
+                            "session_id": {"type": "string"}
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
 async def upload_document(
-    file: UploadFile = File(...),
-    session_id: str = Form(None),
-    background_tasks: BackgroundTasks = None,
-    db: Session = Depends(get_db)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    profile: bool = Depends(profiling_requested)
 ):
     """
     Upload a PDF document for processing.
     
+    The multipart body is streamed to disk rather than spooled, so
+    oversized or non-PDF uploads are rejected as soon as they are detected.
+    
     Args:
-        file: PDF file to upload
-        session_id: Session identifier
+        request: Multipart request with a `file` part and optional `session_id` field
         background_tasks: FastAPI background tasks
         db: Database session
+        profile: Profile the processing (admin `X-Profile` header)
         
     Returns:
         Upload response with document ID and status
     """
     try:
+        # Fail fast when the server is already full, before reading the body
+        try:
+            StorageService.check_global_quota(db)
+        except QuotaExceededError as e:
+            _raise_quota_exceeded(e)
+        
+        try:
+            upload = await receive_pdf_upload(
+                request,
+                settings.UPLOAD_DIR,
+                settings.MAX_FILE_SIZE
+            )
+        except FileValidationError as e:
+            raise_http_exception(status.HTTP_400_BAD_REQUEST, e.message, e.detail)
+        
+        document_id = upload["document_id"]
+        file_path = upload["file_path"]
+        file_size = upload["file_size"]
+        filename = upload["filename"]
+        
         # Generate session ID if not provided
-        if not session_id:
-            session_id = str(uuid.uuid4())
+        session_id = upload["fields"].get("session_id") or str(uuid.uuid4())
+        
+        try:
+            StorageService.check_global_quota(db, incoming_bytes=file_size)
+        except QuotaExceededError as e:
+            Path(file_path).unlink(missing_ok=True)
+            _raise_quota_exceeded(e)
         
-        # Ensure session exists
+        # Ensure session exists; a new one is committed with the document
         session = db.query(SessionModel).filter(SessionModel.session_id == session_id).first()
         if not session:
             session = SessionModel(session_id=session_id)
             db.add(session)
-            db.commit()
-        
-        # Validate file
-        if not file.filename.endswith('.pdf'):
-            handle_file_validation_error(file.filename, "Only PDF files are allowed")
-        
-        # Check file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset
-        
-        if file_size > settings.MAX_FILE_SIZE:
-            handle_file_validation_error(
-                file.filename,
-                f"File size exceeds {settings.MAX_FILE_SIZE / (1024*1024)}MB limit"
-            )
-        
-        # Create document record
-        document_id = str(uuid.uuid4())
-        file_path = settings.UPLOAD_DIR / f"{document_id}_{file.filename}"
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            db.flush()
+        else:
+            ChatService.touch_session(db, session_id)
         
         # Create database record
         document = Document(
             id=document_id,
             session_id=session_id,
-            filename=file.filename,
+            filename=filename,
             file_path=str(file_path),
             file_size=file_size,
-            status=DocumentStatus.UPLOADING
+            content_hash=upload["content_hash"],
+            status=DocumentStatus.UPLOADING,
+            ingest_owner=IngestionCheckpoint.owner()
         )
         
         db.add(document)
+        try:
+            StorageService.reserve_upload(db, session_id, file_size)
+        except QuotaExceededError as e:
+            db.rollback()
+            Path(file_path).unlink(missing_ok=True)
+            _raise_quota_exceeded(e)
         db.commit()
         
-        logger.info(f"Document uploaded: {document_id} - {file.filename}")
+        logger.info(
+            "Document uploaded: %s - %s (%s bytes, sha256 %s)",
+            document_id, filename, file_size, upload['content_hash'][:12]
+        )
+        
+        set_attribute("document_id", document_id)
         
         # Send immediate WebSocket update to show upload success
         from app.api.websocket import send_progress_update
@@ -275,27 +542,30 @@ async def upload_document(
                 "stage": "uploading",
                 "status": "processing",
                 "progress": 100,
-                "message": f"File '{file.filename}' uploaded successfully! Starting processing...",
+                "message": f"File '{filename}' uploaded successfully! Starting processing...",
                 "details": {
                     "file_size": file_size,
-                    "filename": file.filename
+                    "filename": filename
                 }
             })
         
         background_tasks.add_task(send_upload_notification)
         
         # Start background processing
+        INGESTION_IN_PROGRESS.inc()
         background_tasks.add_task(
             process_document_background,
             document_id,
             str(file_path),
             session_id,
-            file.filename
+            filename,
+            current_context(),
+            profile
         )
         
         return DocumentUploadResponse(
             document_id=document_id,
-            filename=file.filename,
+            filename=filename,
             status=DocumentStatus.PROCESSING,
             message="Document uploaded successfully and processing started"
         )
@@ -303,7 +573,7 @@ async def upload_document(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Upload failed: {e}", exc_info=True)
+        logger.error("Upload failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
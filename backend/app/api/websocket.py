@@ -4,14 +4,18 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Dict
 import asyncio
 import json
+import time
 from datetime import datetime, timedelta
 
-from app.utils.logger import logger
+from app.utils.logger import get_logger
+from app.utils.metrics import WEBSOCKET_CONNECTIONS, WEBSOCKET_SEND_SECONDS
 
 router = APIRouter(tags=["websocket"])
+logger = get_logger(__name__)
 
 # Store active connections with timestamp
 active_connections: Dict[str, Dict] = {}  # {session_id: {"ws": WebSocket, "connected_at": datetime}}
+WEBSOCKET_CONNECTIONS.set_function(lambda: len(active_connections))
 
 
 async def cleanup_stale_connections():
@@ -29,7 +33,7 @@ async def cleanup_stale_connections():
         except:
             pass
         del active_connections[session_id]
-        logger.info(f"Cleaned up stale WebSocket connection: {session_id}")
+        logger.info("Cleaned up stale WebSocket connection: %s", session_id)
 
 
 @router.websocket("/ws/{session_id}")
@@ -46,7 +50,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         try:
             old_ws = active_connections[session_id]["ws"]
             await old_ws.close()
-            logger.info(f"Closed previous WebSocket connection for session: {session_id}")
+            logger.info("Closed previous WebSocket connection for session: %s", session_id)
         except:
             pass
     
@@ -59,7 +63,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         "connected_at": datetime.now()
     }
     
-    logger.info(f"WebSocket connected: {session_id} (Total active: {len(active_connections)})")
+    logger.info("WebSocket connected: %s (Total active: %d)", session_id, len(active_connections))
     
     try:
         # Send initial connection message
@@ -90,13 +94,13 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                     break
                     
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected: {session_id}")
+        logger.info("WebSocket disconnected: %s", session_id)
     except Exception as e:
-        logger.error(f"WebSocket error for {session_id}: {e}")
+        logger.error("WebSocket error for %s: %s", session_id, e)
     finally:
         if session_id in active_connections:
             del active_connections[session_id]
-            logger.info(f"Removed WebSocket connection: {session_id} (Remaining: {len(active_connections)})")
+            logger.info("Removed WebSocket connection: %s (Remaining: %d)", session_id, len(active_connections))
 
 
 async def send_progress_update(session_id: str, progress_data: dict):
@@ -110,22 +114,25 @@ async def send_progress_update(session_id: str, progress_data: dict):
     if session_id in active_connections:
         try:
             ws = active_connections[session_id]["ws"]
-            logger.info(f"Sending progress update to {session_id}: {progress_data.get('stage')} - {progress_data.get('progress')}%")
+            started = time.perf_counter()
             await ws.send_json({
                 "type": "progress",
                 **progress_data
             })
-            logger.info(f"Progress update sent successfully to {session_id}")
+            WEBSOCKET_SEND_SECONDS.observe(time.perf_counter() - started)
+            logger.debug(
+                "Sent progress update to %s: %s - %s%%",
+                session_id, progress_data.get("stage"), progress_data.get("progress")
+            )
         except Exception as e:
-            logger.error(f"Failed to send progress update to {session_id}: {e}")
+            logger.error("Failed to send progress update to %s: %s", session_id, e)
             # Remove dead connection
             if session_id in active_connections:
                 del active_connections[session_id]
-                logger.info(f"Removed dead WebSocket connection: {session_id}")
+                logger.info("Removed dead WebSocket connection: %s", session_id)
     else:
-        # Only log as debug for the first few seconds (connection might be establishing)
-        active_session_ids = list(active_connections.keys())
-        logger.warning(
-            f"No active WebSocket connection for session {session_id}. "
-            f"Active sessions ({len(active_session_ids)}): {active_session_ids[:5]}"  # Show first 5
+        # Debug only: fires on every update while the client is (re)connecting
+        logger.debug(
+            "No active WebSocket connection for session %s (%d active)",
+            session_id, len(active_connections)
         )
@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     
     # API Keys
     GROQ_API_KEY: str
+    GROQ_BASE_URL: Optional[str] = None  # Override to point at a local OpenAI-compatible server
     
     # Database
     DATABASE_URL: str = "sqlite:///./rag_app.db"
@@ -31,8 +32,18 @@ class Settings(BaseSettings):
     # File Storage
     UPLOAD_DIR: Path = Path("./uploads")
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    SESSION_STORAGE_QUOTA_BYTES: Optional[int] = None  # Per-session disk quota (None for unlimited)
+    GLOBAL_STORAGE_QUOTA_BYTES: Optional[int] = None  # Disk quota across all sessions (None for unlimited)
     ALLOWED_FILE_TYPES: List[str] = [".pdf"]
     
+    # Images
+    IMAGE_DIR: Path = Path("./images")  # Full-size normalized images
+    IMAGE_NORMALIZATION: bool = True  # Downscale and transcode extracted images at ingest
+    IMAGE_FORMAT: str = "WEBP"  # "WEBP" or "JPEG"
+    IMAGE_MAX_DIMENSION: int = 1600  # Longest side of stored images, in pixels
+    IMAGE_QUALITY: int = 80
+    IMAGE_THUMBNAIL_SIZE: int = 320  # Longest side of thumbnails sent inline
+    
     # ChromaDB
     CHROMA_PERSIST_DIR: Path = Path("./chroma_data")
     
@@ -44,16 +55,101 @@ class Settings(BaseSettings):
     CHUNK_MAX_CHARS: int = 3000
     CHUNK_NEW_AFTER_CHARS: int = 2400
     CHUNK_COMBINE_UNDER_CHARS: int = 500
+    CHECKPOINT_DIR: Path = Path("./checkpoints")  # Per-stage ingestion output for resuming interrupted documents
+    INGESTION_RECOVERY_ON_STARTUP: bool = True  # Resume documents whose ingesting process died
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"  # Application log level (DEBUG when DEBUG is set)
+    LOG_FORMAT: str = "text"  # "text" or "json"
+    LOG_LEVELS: Dict[str, str] = {}  # Per-module levels, e.g. {"rag_app.api.websocket": "WARNING"}
+    LOG_RATE_LIMIT_PER_SECOND: float = 20.0  # INFO records per call site per second (0 disables)
+    
+    # Observability
+    METRICS_ENABLED: bool = True  # Expose Prometheus metrics at /metrics
+    TRACING_ENABLED: bool = True  # Record per-request spans
+    TRACE_BUFFER_SIZE: int = 5000  # Finished spans kept in memory for /api/debug/traces
+    TRACE_EXPORT_PATH: Optional[Path] = None  # Also append spans to this JSON lines file
+    PROFILER_INTERVAL_MS: float = 5.0  # Sampling interval of the stack profiler
+    PROFILER_MAX_SECONDS: float = 60.0  # Longest on-demand profile
+    
+    # Admin
+    ADMIN_TOKEN: Optional[str] = None  # X-Admin-Token for /api/admin; admin API disabled when unset
+    
+    # Startup
+    WARMUP_ON_STARTUP: bool = True  # Load models in the background after the port is bound
+    LLM_WARMUP_PING: bool = False  # Send a test completion during warm-up
+    
+    # Serving (python -m app.serve)
+    WORKERS: int = 1  # Worker processes forked after models are preloaded
+    TORCH_THREADS_PER_WORKER: Optional[int] = None  # Intra-op threads per worker (None splits the CPUs evenly)
     
     # Session Management
     SESSION_RETENTION_DAYS: int = 30
+    RETENTION_SWEEP_ENABLED: bool = True  # Periodically delete sessions idle past SESSION_RETENTION_DAYS
+    RETENTION_SWEEP_INTERVAL_MINUTES: float = 60.0
+    RETENTION_BATCH_SIZE: int = 20  # Sessions deleted per batch
+    RETENTION_BATCH_PAUSE: float = 1.0  # Seconds between batches
+    SESSION_TOUCH_INTERVAL_SECONDS: int = 300  # Minimum interval between last_active updates
+    
+    # Chat Persistence
+    CHAT_WRITE_BEHIND: bool = False  # Acknowledge chat responses before turns are committed
+    CHAT_WRITE_BEHIND_BATCH_SIZE: int = 50  # Turns per transaction
+    CHAT_WRITE_BEHIND_FLUSH_INTERVAL: float = 0.5  # Seconds between background flushes
+    CHAT_WRITE_BEHIND_MAX_PENDING: int = 1000  # Queued turns before submitters wait for a flush
     
     # Embeddings
     EMBEDDING_MODEL: str = "BAAI/bge-small-en-v1.5"
+    EMBEDDING_BACKEND: str = "torch"  # "torch" (sentence-transformers) or "onnx" (ONNX Runtime)
+    EMBEDDING_BATCH_SIZE: int = 32
+    ONNX_MODEL_DIR: Path = Path("./models")  # Exported ONNX models
+    ONNX_QUANTIZE: bool = True  # int8 dynamic quantization for the ONNX backend
+    
+    # Query Embedding Batching
+    QUERY_BATCHING: bool = True  # Share forward passes between concurrent chat queries
+    QUERY_BATCH_MAX_WAIT_MS: float = 5.0  # Longest a query waits for its batch to fill
+    QUERY_BATCH_MAX_SIZE: int = 16  # Maximum queries per forward pass
+    
+    # Multi-Vector Indexing
+    MULTI_VECTOR_INDEXING: bool = True  # Also embed tables and image OCR/captions as vectors linked to their chunk
+    MULTI_VECTOR_FETCH_MULTIPLIER: int = 3  # Vectors fetched per chunk returned, leaving room to de-duplicate
+    
+    # Document Routing
+    DOCUMENT_ROUTING: bool = True  # Search chunks only within the documents closest to the query
+    DOCUMENT_ROUTING_TOP_M: int = 4  # Documents searched per query
+    DOCUMENT_ROUTING_MIN_DOCUMENTS: int = 10  # Sessions with at most this many documents search everything
+    
+    # MMR Diversity
+    MMR_ENABLED: bool = False  # Re-rank retrieved chunks with MMR unless a request sets mmr_lambda
+    MMR_LAMBDA: float = 0.5  # 1.0 ranks by relevance only, 0.0 by diversity only
+    MMR_FETCH_K_MULTIPLIER: int = 5  # Candidates fetched per chunk returned
+    
+    # Retrieval Cache
+    RETRIEVAL_CACHE_SIZE: int = 1024  # Cached retrieval results per worker (0 disables)
+    RETRIEVAL_CACHE_TTL_SECONDS: float = 600.0  # Bounds staleness across workers, which invalidate independently
     
     # LLM
     LLM_MODEL: str = "llama-3.3-70b-versatile"
     LLM_TEMPERATURE: float = 0.0
+    LLM_FALLBACK_MODEL: Optional[str] = None  # Used while the circuit breaker is open
+    LLM_CONNECT_TIMEOUT: float = 5.0  # Seconds
+    LLM_READ_TIMEOUT: float = 60.0  # Seconds
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE: int = 10
+    LLM_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection stays pooled
+    LLM_MAX_RETRIES: int = 2  # Retries on 429/5xx/timeouts
+    LLM_RETRY_BASE_DELAY: float = 0.5  # Seconds, doubled per retry with full jitter
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_HEDGING: bool = False  # Send a duplicate request once the first exceeds recent p95
+    LLM_HEDGE_MIN_DELAY: float = 1.0  # Seconds
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open the circuit
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+    
+    # Chunk Summarization
+    SUMMARIZATION_ENABLED: bool = False  # Embed LLM summaries instead of raw chunk text
+    SUMMARY_LLM_MODEL: str = "llama-3.1-8b-instant"
+    SUMMARY_CONCURRENCY: int = 4  # Concurrent summary requests per process, across all documents
+    SUMMARY_REQUESTS_PER_MINUTE: float = 30.0  # Token-bucket limit on summary requests per process
+    SUMMARY_TIMEOUT: float = 30.0  # Seconds before falling back to raw text
     
     class Config:
         # Use root .env file (one level up from backend/)
@@ -69,3 +165,5 @@ settings = Settings()
 # Ensure directories exist
 settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 settings.CHROMA_PERSIST_DIR.mkdir(parents=True, exist_ok=True)
+settings.IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+settings.CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
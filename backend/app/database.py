@@ -1,13 +1,16 @@
 """Database configuration and session management"""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 
 from app.config import settings
+from app.utils.logger import get_logger
 
 
+logger = get_logger(__name__)
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
@@ -39,3 +42,57 @@ def get_db() -> Generator[Session, None, None]:
 def init_db() -> None:
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    _sync_schema()
+    _backfill_last_active()
+
+
+def _sync_schema() -> None:
+    """
+    Add nullable columns and indexes introduced after a table was created.
+    
+    create_all() only creates missing tables, so existing databases would
+    otherwise never pick up new columns or indexes.
+    """
+    inspector = inspect(engine)
+    
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                if not column.nullable:
+                    # Can't be added to existing rows; queries using it will fail
+                    logger.warning(
+                        "Schema drift: table %s is missing non-nullable column %s; "
+                        "migrate the database or recreate it",
+                        table.name, column.name
+                    )
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(
+                    text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+                )
+            
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+
+
+def _backfill_last_active() -> None:
+    """
+    Raise sessions.last_active to the session's latest message or upload.
+    
+    last_active used to be written only when a session was created, so
+    without this the retention sweep would delete long-lived sessions
+    still in daily use. The update only ever moves last_active forward,
+    so running it on every start is safe.
+    """
+    with engine.begin() as connection:
+        for table, column in (("chat_messages", "timestamp"), ("documents", "uploaded_at")):
+            latest = f"(SELECT MAX({column}) FROM {table} WHERE {table}.session_id = sessions.session_id)"
+            connection.execute(text(
+                f"UPDATE sessions SET last_active = {latest} WHERE {latest} > sessions.last_active"
+            ))
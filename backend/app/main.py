@@ -1,14 +1,22 @@
 """FastAPI main application"""
 
+import asyncio
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 
 from app.config import settings
 from app.database import init_db
-from app.api import upload, chat, documents, websocket
-from app.utils.logger import logger
+from app.api import upload, chat, documents, websocket, debug, admin
+from app.services.chat_writer import chat_turn_writer
+from app.services.providers import readiness, warm_up_services
+from app.services.retention_service import retention_sweeper
+from app.utils.logger import get_logger
+from app.utils import metrics
+from app.utils.tracing import span
+
+logger = get_logger(__name__)
 
 
 @asynccontextmanager
@@ -18,9 +26,25 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Multi-Modal RAG API")
     init_db()
     logger.info("Database initialized")
+    if settings.CHAT_WRITE_BEHIND:
+        await chat_turn_writer.start()
+    if settings.RETENTION_SWEEP_ENABLED:
+        await retention_sweeper.start()
+    if settings.INGESTION_RECOVERY_ON_STARTUP:
+        # Picks up documents left half-ingested by a crash or restart
+        await upload.resume_interrupted_documents()
+    
+    # Load models without delaying port binding; /ready reports progress
+    warmup_task = None
+    if settings.WARMUP_ON_STARTUP:
+        warmup_task = asyncio.create_task(warm_up_services())
     yield
     # Shutdown
     logger.info("Shutting down Multi-Modal RAG API")
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    await retention_sweeper.stop()
+    await chat_turn_writer.stop()
 
 
 # Create FastAPI app
@@ -41,11 +65,27 @@ app.add_middleware(
 )
 
 
+# Request tracing
+if settings.TRACING_ENABLED:
+    @app.middleware("http")
+    async def trace_requests(request: Request, call_next):
+        """Open a root span per HTTP request and return its trace id"""
+        with span(
+            f"{request.method} {request.url.path}",
+            method=request.method,
+            path=request.url.path
+        ) as request_span:
+            response = await call_next(request)
+            request_span.set_attribute("status_code", response.status_code)
+            response.headers["X-Trace-Id"] = request_span.trace_id
+            return response
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle all unhandled exceptions"""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={
@@ -60,6 +100,9 @@ app.include_router(upload.router, prefix="/api")
 app.include_router(chat.router, prefix="/api")
 app.include_router(documents.router, prefix="/api")
 app.include_router(websocket.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+if settings.TRACING_ENABLED:
+    app.include_router(debug.router, prefix="/api")
 
 
 @app.get("/")
@@ -79,6 +122,23 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 200 once models are loaded, 503 before"""
+    state = readiness()
+    return JSONResponse(
+        status_code=200 if state["ready"] else 503,
+        content={"status": "ready" if state["ready"] else "starting", **state}
+    )
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        """Prometheus metrics in the text exposition format"""
+        return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
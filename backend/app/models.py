@@ -1,7 +1,7 @@
 """SQLAlchemy database models"""
 
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text, ForeignKey, JSON, Index, LargeBinary, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 import enum
 
@@ -14,6 +14,7 @@ class DocumentStatus(str, enum.Enum):
     PROCESSING = "processing"
     PARTITIONING = "partitioning"
     CHUNKING = "chunking"
+    SUMMARIZING = "summarizing"
     VECTORIZING = "vectorizing"
     COMPLETED = "completed"
     FAILED = "failed"
@@ -32,11 +33,28 @@ class Session(Base):
     
     session_id = Column(String(36), primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    last_active = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    last_active = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     
     # Relationships
     documents = relationship("Document", back_populates="session", cascade="all, delete-orphan")
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
+    storage = relationship("SessionStorage", back_populates="session", cascade="all, delete-orphan", uselist=False)
+
+
+class SessionStorage(Base):
+    """Disk usage of a session, maintained as data is written and deleted"""
+    __tablename__ = "session_storage"
+    
+    session_id = Column(String(36), ForeignKey("sessions.session_id"), primary_key=True)
+    upload_bytes = Column(BigInteger, default=0, nullable=False)  # Uploaded PDFs
+    vector_bytes = Column(BigInteger, default=0, nullable=False)  # Chroma directory
+    image_bytes = Column(BigInteger, default=0, nullable=False)  # Normalized full-size images
+    visual_bytes = Column(BigInteger, default=0, nullable=False)  # Chat message visuals (JSON)
+    total_bytes = Column(BigInteger, default=0, nullable=False, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    session = relationship("Session", back_populates="storage")
 
 
 class Document(Base):
@@ -48,12 +66,15 @@ class Document(Base):
     filename = Column(String(255), nullable=False)
     file_path = Column(String(512), nullable=False)
     file_size = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the uploaded file
     status = Column(SQLEnum(DocumentStatus), default=DocumentStatus.UPLOADING, nullable=False)
     
     # Processing metadata
     element_count = Column(Integer, default=0)
     chunk_count = Column(Integer, default=0)
     element_counts = Column(JSON, default={})  # {"text": 100, "table": 5, "image": 3}
+    summary_embedding = Column(LargeBinary, nullable=True)  # Mean chunk embedding (float32) for document routing
+    ingest_owner = Column(String(64), nullable=True)  # "host:pid" of the process ingesting the document
     
     # Timestamps
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -71,6 +92,10 @@ class Document(Base):
 class ChatMessage(Base):
     """Chat message model"""
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Keyset pagination of a session's history by (timestamp, id)
+        Index("ix_chat_messages_session_timestamp", "session_id", "timestamp", "id"),
+    )
     
     id = Column(String(36), primary_key=True, index=True)
     session_id = Column(String(36), ForeignKey("sessions.session_id"), nullable=False, index=True)
@@ -81,6 +106,7 @@ class ChatMessage(Base):
     
     # Visual content metadata (for assistant messages)
     visuals = Column(JSON, nullable=True)  # {"tables": [...], "images": [...], "chunks": [...]}
+    visual_refs = Column(JSON, nullable=True)  # Same shape without table HTML or image payloads
     
     # Timestamps
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -105,3 +131,13 @@ class ProcessingProgress(Base):
     
     # Relationships
     document = relationship("Document", back_populates="progress_records")
+
+
+class ChunkSummary(Base):
+    """Cached LLM summary of chunk content"""
+    __tablename__ = "chunk_summaries"
+    
+    cache_key = Column(String(64), primary_key=True)  # SHA-256 of model, prompt version and content
+    model = Column(String(100), nullable=False)
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -38,6 +38,7 @@ class DocumentResponse(BaseModel):
     session_id: str
     filename: str
     file_size: int
+    content_hash: Optional[str] = None
     status: DocumentStatus
     element_count: int
     chunk_count: int
@@ -57,6 +58,7 @@ class ProgressDetails(BaseModel):
     chunk_count: Optional[int] = None
     chunk_details: Optional[List[Dict[str, Any]]] = None
     vector_store_status: Optional[str] = None
+    image_bytes_saved: Optional[int] = None
     message: Optional[str] = None
 
 
@@ -76,6 +78,7 @@ class ChatRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=2000)
     document_ids: Optional[List[str]] = None  # Filter by specific documents
     num_chunks: int = Field(default=3, ge=1, le=10)
+    mmr_lambda: Optional[float] = Field(default=None, ge=0.0, le=1.0)  # Diversify chunks with MMR (1.0 = relevance only)
 
 
 class VisualContent(BaseModel):
@@ -111,6 +114,13 @@ class ChatHistoryResponse(BaseModel):
     session_id: str
     messages: List[ChatMessage]
     total_count: int
+    next_cursor: Optional[str] = None  # Pass as `before` to fetch the next older page
+
+
+class MessageVisualsResponse(BaseModel):
+    """Full visual content of a single chat message"""
+    message_id: str
+    visuals: VisualContent
 
 
 # Cleanup Schemas
@@ -0,0 +1,215 @@
+"""
+Preforking multi-worker server.
+
+Loads the embedding model and heavy libraries once in a parent process,
+then forks the uvicorn workers. Model weights are only read after
+loading, so their memory pages stay shared copy-on-write between workers
+instead of being loaded once per worker as with `uvicorn --workers`.
+
+Usage (from backend/):
+    python -m app.serve --workers 4 [--host 0.0.0.0] [--port 8000] [--threads-per-worker 2]
+"""
+
+import argparse
+import gc
+import os
+import signal
+import sys
+import time
+from typing import Dict, Optional
+
+from app.config import settings
+from app.utils.logger import get_logger, stop_logging
+
+# Named explicitly: __name__ is "__main__" under python -m app.serve
+logger = get_logger("app.serve")
+
+
+# Thread pools are not fork-safe, so the parent must stay single-threaded
+# in native code; each worker raises its own thread count after the fork.
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def default_threads_per_worker(workers: int) -> int:
+    """Split the CPUs available to this process evenly between workers"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(1, cpus // workers)
+
+
+def limit_threads(threads: int) -> None:
+    """
+    Set the native thread count of this process.
+
+    Environment variables cover libraries imported later; torch, if already
+    imported, is updated directly.
+
+    Args:
+        threads: Intra-op threads for torch, OpenMP and BLAS
+    """
+    for name in _THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+
+class PreforkServer:
+    """Fork uvicorn workers from a preloaded parent and keep them running"""
+
+    def __init__(self, config, workers: int, threads_per_worker: int):
+        """
+        Initialize server.
+
+        Args:
+            config: uvicorn.Config for the application
+            workers: Number of worker processes
+            threads_per_worker: Torch intra-op threads per worker
+        """
+        self.config = config
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.socket = None
+        self._children: Dict[int, int] = {}
+        self._stopping = False
+
+    def run(self) -> int:
+        """
+        Bind the port, fork the workers and supervise them until signalled.
+
+        Returns:
+            Process exit code
+        """
+        self.socket = self.config.bind_socket()
+
+        # Keep the preloaded heap out of the collector so workers don't
+        # dirty shared pages by walking it
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for index in range(self.workers):
+            self._spawn(index)
+
+        logger.info(
+            "Serving on %s:%s with %s workers, %s threads each",
+            self.config.host, self.config.port, self.workers, self.threads_per_worker
+        )
+
+        while True:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            index = self._children.pop(pid, None)
+            if index is None or self._stopping:
+                continue
+
+            logger.warning("Worker %s (pid %s) exited with status %s, restarting", index, pid, status)
+            time.sleep(1)
+            self._spawn(index)
+
+        logger.info("All workers stopped")
+        return 0
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = index
+            return
+
+        exit_code = 0
+        try:
+            self._run_worker(index)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            exit_code = 1
+            logger.error("Worker %s crashed", index, exc_info=True)
+        finally:
+            # os._exit skips atexit, so flush queued records (shutdown logs, the crash) first
+            stop_logging()
+            os._exit(exit_code)
+
+    def _run_worker(self, index: int) -> None:
+        """Body of a forked worker process"""
+        import uvicorn
+        from app.database import engine
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+        limit_threads(self.threads_per_worker)
+
+        # Connections opened by the parent must not be shared across processes
+        engine.dispose(close=False)
+
+        # One sweeper per deployment is enough
+        if index > 0:
+            settings.RETENTION_SWEEP_ENABLED = False
+
+        uvicorn.Server(self.config).run(sockets=[self.socket])
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0", help="Bind address")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")), help="Bind port")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="Worker processes")
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=settings.TORCH_THREADS_PER_WORKER,
+        help="Torch intra-op threads per worker (default: CPUs / workers)"
+    )
+    parser.add_argument("--no-preload", action="store_true", help="Let each worker load its own models")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        parser.error("preforking needs os.fork; use `uvicorn app.main:app --workers N` on this platform")
+
+    workers = max(1, args.workers)
+    threads_per_worker = args.threads_per_worker or default_threads_per_worker(workers)
+
+    # Must happen before torch is imported by the preload
+    limit_threads(1)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    import uvicorn
+    from app.main import app
+
+    if args.no_preload:
+        logger.info("Preloading disabled: each worker loads its own models")
+    elif settings.EMBEDDING_BACKEND.lower() != "torch":
+        # ONNX Runtime starts its thread pool when a session is created,
+        # which cannot be carried across fork
+        logger.warning(
+            "Preloading skipped for the %s embedding backend: each worker loads its own model",
+            settings.EMBEDDING_BACKEND
+        )
+    else:
+        from app.services.providers import preload_services
+
+        started = time.perf_counter()
+        preload_services()
+        logger.info("Models preloaded in %.1fs", time.perf_counter() - started)
+
+    config = uvicorn.Config(app, host=args.host, port=args.port, lifespan="on")
+    return PreforkServer(config, workers, threads_per_worker).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,27 @@
 """Chat management service"""
 
+import base64
 import uuid
-from datetime import datetime
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, load_only
 
-from app.models import ChatMessage, MessageRole
+from app.config import settings
+from app.models import ChatMessage, MessageRole, Session as SessionModel
 from app.schemas import ChatMessage as ChatMessageSchema
-from app.utils.logger import logger
+from app.services.storage_service import StorageService, visuals_size
+from app.utils.logger import get_logger
+from app.utils.tracing import traced
+
+logger = get_logger(__name__)
 
 
 class ChatService:
     """Service for managing chat messages"""
     
     @staticmethod
+    @traced("chat.create_message")
     def create_message(
         db: Session,
         session_id: str,
@@ -50,9 +58,94 @@ class ChatService:
         db.commit()
         db.refresh(message)
         
-        logger.info(f"Created chat message: {message.id} for session {session_id}")
+        logger.info("Created chat message: %s for session %s", message.id, session_id)
         return message
     
+    @staticmethod
+    def build_turn(
+        session_id: str,
+        query: str,
+        answer: str,
+        document_id: Optional[str] = None,
+        visuals: Optional[dict] = None
+    ) -> Tuple[ChatMessage, ChatMessage]:
+        """
+        Build the user and assistant messages for one chat turn.
+        
+        IDs and timestamps are assigned here so callers can respond
+        before the turn is persisted.
+        
+        Args:
+            session_id: Session identifier
+            query: User query
+            answer: Assistant answer
+            document_id: Optional document identifier
+            visuals: Optional visual content for the assistant message
+            
+        Returns:
+            Tuple of (user message, assistant message)
+        """
+        asked_at = datetime.utcnow()
+        
+        user_message = ChatMessage(
+            id=str(uuid.uuid4()),
+            session_id=session_id,
+            document_id=document_id,
+            role=MessageRole.USER,
+            content=query,
+            timestamp=asked_at
+        )
+        
+        # Keep the assistant message strictly after the user message so
+        # history ordering by timestamp is stable
+        assistant_message = ChatMessage(
+            id=str(uuid.uuid4()),
+            session_id=session_id,
+            document_id=document_id,
+            role=MessageRole.ASSISTANT,
+            content=answer,
+            visuals=visuals,
+            visual_refs=ChatService.build_visual_refs(visuals),
+            timestamp=asked_at + timedelta(microseconds=1)
+        )
+        
+        return user_message, assistant_message
+    
+    @staticmethod
+    @traced("chat.save_turns")
+    def save_turns(
+        db: Session,
+        turns: List[Tuple[ChatMessage, ChatMessage]]
+    ) -> int:
+        """
+        Persist chat turns in a single transaction.
+        
+        Args:
+            db: Database session
+            turns: List of (user message, assistant message) tuples
+            
+        Returns:
+            Number of messages written
+        """
+        messages = [message for turn in turns for message in turn]
+        
+        visual_bytes: Dict[str, int] = {}
+        for message in messages:
+            if message.visuals:
+                visual_bytes[message.session_id] = visual_bytes.get(message.session_id, 0) + visuals_size(message.visuals)
+        
+        try:
+            db.add_all(messages)
+            for session_id, size in visual_bytes.items():
+                StorageService.add(db, session_id, commit=False, visual=size)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        logger.debug("Saved %d chat turn(s) (%d messages)", len(turns), len(messages))
+        return len(messages)
+    
     @staticmethod
     def get_history(
         db: Session,
@@ -71,6 +164,7 @@ class ChatService:
             List of messages
         """
         messages = db.query(ChatMessage)\
+            .options(load_only(ChatMessage.id, ChatMessage.role, ChatMessage.content, ChatMessage.timestamp))\
             .filter(ChatMessage.session_id == session_id)\
             .order_by(ChatMessage.timestamp.desc())\
             .limit(limit)\
@@ -78,6 +172,190 @@ class ChatService:
         
         return list(reversed(messages))
     
+    @staticmethod
+    def get_history_page(
+        db: Session,
+        session_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_visuals: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of chat history, newest page first.
+        
+        Pages are addressed by a (timestamp, id) keyset cursor so each page
+        is an index range scan regardless of how deep the history is.
+        
+        Args:
+            db: Database session
+            session_id: Session identifier
+            limit: Maximum number of messages in the page
+            cursor: Cursor returned with the previous (newer) page
+            include_visuals: Return full visuals instead of lightweight references
+            
+        Returns:
+            Tuple of (messages oldest first, cursor for the next older page or None)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        visuals_column = ChatMessage.visuals if include_visuals else ChatMessage.visual_refs
+        
+        query = db.query(
+            ChatMessage.id,
+            ChatMessage.role,
+            ChatMessage.content,
+            ChatMessage.timestamp,
+            visuals_column.label("visuals")
+        ).filter(ChatMessage.session_id == session_id)
+        
+        if cursor:
+            cursor_timestamp, cursor_id = ChatService.decode_cursor(cursor)
+            query = query.filter(
+                or_(
+                    ChatMessage.timestamp < cursor_timestamp,
+                    and_(ChatMessage.timestamp == cursor_timestamp, ChatMessage.id < cursor_id)
+                )
+            )
+        
+        # Fetch one extra row to know whether an older page exists
+        rows = query\
+            .order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())\
+            .limit(limit + 1)\
+            .all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = ChatService.encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+        
+        # Messages written before visual_refs existed only have full visuals
+        legacy_ids = [
+            row.id for row in rows
+            if not include_visuals and row.visuals is None and row.role == MessageRole.ASSISTANT
+        ]
+        legacy_refs = {}
+        if legacy_ids:
+            legacy_refs = {
+                message_id: ChatService.build_visual_refs(visuals)
+                for message_id, visuals in db.query(ChatMessage.id, ChatMessage.visuals)
+                .filter(ChatMessage.id.in_(legacy_ids))
+            }
+        
+        messages = [
+            {
+                "id": row.id,
+                "role": row.role,
+                "content": row.content,
+                "visuals": legacy_refs.get(row.id, row.visuals),
+                "timestamp": row.timestamp
+            }
+            for row in reversed(rows)
+        ]
+        
+        return messages, next_cursor
+    
+    @staticmethod
+    def get_message_visuals(
+        db: Session,
+        session_id: str,
+        message_id: str
+    ) -> Optional[dict]:
+        """
+        Get the full visual content of a single message.
+        
+        Args:
+            db: Database session
+            session_id: Session identifier
+            message_id: Message identifier
+            
+        Returns:
+            Visual content, or None if the message does not exist
+        """
+        row = db.query(ChatMessage.visuals)\
+            .filter(ChatMessage.id == message_id, ChatMessage.session_id == session_id)\
+            .first()
+        
+        if row is None:
+            return None
+        
+        return row.visuals or {}
+    
+    @staticmethod
+    def build_visual_refs(visuals: Optional[dict]) -> Optional[dict]:
+        """
+        Strip table HTML and image payloads from visual content.
+        
+        Args:
+            visuals: Visual content as stored on assistant messages
+            
+        Returns:
+            Visual references, or None if there is no visual content
+        """
+        if not visuals:
+            return None
+        
+        payload_keys = {"html", "base64"}
+        
+        return {
+            "chunks": visuals.get("chunks", []),
+            "tables": [
+                {key: value for key, value in table.items() if key not in payload_keys}
+                for table in visuals.get("tables", [])
+                if isinstance(table, dict)
+            ],
+            "images": [
+                {key: value for key, value in image.items() if key not in payload_keys}
+                for image in visuals.get("images", [])
+                if isinstance(image, dict)
+            ]
+        }
+    
+    @staticmethod
+    def encode_cursor(timestamp: datetime, message_id: str) -> str:
+        """Encode a (timestamp, id) keyset position as an opaque cursor"""
+        raw = f"{timestamp.isoformat()}|{message_id}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """
+        Decode a cursor produced by encode_cursor.
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            timestamp, message_id = raw.split("|", 1)
+            return datetime.fromisoformat(timestamp), message_id
+        except Exception as e:
+            raise ValueError(f"Invalid history cursor: {cursor}") from e
+    
+    @staticmethod
+    def touch_session(db: Session, session_id: str) -> None:
+        """
+        Record activity on a session for retention purposes.
+        
+        Writes at most once per SESSION_TOUCH_INTERVAL_SECONDS per session,
+        so busy sessions don't turn every chat into an extra UPDATE.
+        
+        Args:
+            db: Database session
+            session_id: Session identifier
+        """
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.SESSION_TOUCH_INTERVAL_SECONDS)
+        
+        updated = db.query(SessionModel)\
+            .filter(
+                SessionModel.session_id == session_id,
+                SessionModel.last_active < stale_before
+            )\
+            .update({SessionModel.last_active: now}, synchronize_session=False)
+        
+        if updated:
+            db.commit()
+    
     @staticmethod
     def clear_history(
         db: Session,
@@ -98,10 +376,12 @@ class ChatService:
             .delete()
         
         db.commit()
-        logger.info(f"Cleared {count} messages for session {session_id}")
+        StorageService.reset_visuals(db, session_id)
+        logger.info("Cleared %s messages for session %s", count, session_id)
         return count
     
     @staticmethod
+    @traced("chat.get_history_for_context")
     def get_history_for_context(
         db: Session,
         session_id: str,
@@ -0,0 +1,217 @@
+"""Write-behind persistence of chat turns"""
+
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import ChatMessage
+from app.services.chat_service import ChatService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+Turn = Tuple[ChatMessage, ChatMessage]
+
+
+class ChatTurnWriter:
+    """Queue chat turns and flush them to the database in background batches"""
+
+    def __init__(
+        self,
+        batch_size: int = settings.CHAT_WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = settings.CHAT_WRITE_BEHIND_FLUSH_INTERVAL,
+        max_pending: int = settings.CHAT_WRITE_BEHIND_MAX_PENDING,
+        max_attempts: int = 3
+    ):
+        """
+        Initialize chat turn writer.
+
+        Args:
+            batch_size: Maximum turns written per transaction
+            flush_interval: Seconds between background flushes
+            max_pending: Queued turns before submitters wait for a flush
+            max_attempts: Write attempts per batch before its turns are written one by one
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+
+        self._turns: Deque[Turn] = deque()
+        self._in_flight: List[Turn] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flusher is active"""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending_count(self) -> int:
+        """Number of turns not yet committed"""
+        return len(self._turns) + len(self._in_flight)
+
+    async def start(self) -> None:
+        """Start the background flusher"""
+        if self.running:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Chat write-behind started (batch_size=%s, flush_interval=%ss)",
+            self.batch_size, self.flush_interval
+        )
+
+    async def stop(self) -> None:
+        """Stop the background flusher and commit every queued turn"""
+        if not self.running:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+        # Drain anything submitted while the loop was exiting
+        await self.flush()
+        logger.info("Chat write-behind stopped, all pending turns flushed")
+
+    async def submit(self, turn: Turn) -> None:
+        """
+        Queue a chat turn for background persistence.
+
+        Args:
+            turn: Tuple of (user message, assistant message)
+        """
+        if len(self._turns) >= self.max_pending:
+            # Backpressure: make the submitter wait rather than grow unbounded
+            await self.flush()
+
+        self._turns.append(turn)
+
+        if len(self._turns) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Commit all queued turns, one transaction per batch"""
+        async with self._flush_lock:
+            loop = asyncio.get_running_loop()
+
+            while self._turns:
+                count = min(self.batch_size, len(self._turns))
+                self._in_flight = [self._turns.popleft() for _ in range(count)]
+                try:
+                    await loop.run_in_executor(None, self._write_batch, self._in_flight)
+                finally:
+                    self._in_flight = []
+
+    def pending_context(self, session_id: str) -> List[Dict[str, str]]:
+        """
+        Get uncommitted messages for a session formatted for LLM context.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            List of message dictionaries, oldest first
+        """
+        return [
+            {
+                "role": message.role.value,
+                "content": message.content
+            }
+            for turn in [*self._in_flight, *self._turns]
+            if turn[0].session_id == session_id
+            for message in turn
+        ]
+
+    async def discard_session(self, session_id: str) -> int:
+        """
+        Drop queued turns for a session and wait for any in-flight batch.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Number of turns dropped
+        """
+        if not self.running:
+            return 0
+
+        async with self._flush_lock:
+            kept = [turn for turn in self._turns if turn[0].session_id != session_id]
+            dropped = len(self._turns) - len(kept)
+            self._turns = deque(kept)
+
+        return dropped
+
+    async def _run(self) -> None:
+        """Flush periodically or whenever a full batch is queued"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Chat write-behind flush failed: %s", e, exc_info=True)
+
+    def _write_batch(self, turns: List[Turn]) -> None:
+        """
+        Write a batch of turns in one transaction (runs in a worker thread).
+
+        When every attempt fails, the turns are written one transaction
+        each, so a turn that can never be stored (e.g. its session was
+        deleted meanwhile) is dropped without the rest of the batch.
+        """
+        if self._try_write(turns, self.max_attempts) or len(turns) == 1:
+            return
+
+        logger.warning("Writing %s chat turn(s) individually after batch failure", len(turns))
+        for turn in turns:
+            self._try_write([turn], 1)
+
+    def _try_write(self, turns: List[Turn], attempts: int) -> bool:
+        """
+        Commit turns in one transaction, retrying on failure.
+
+        Args:
+            turns: Turns to write
+            attempts: Write attempts before the turns are dropped
+
+        Returns:
+            True if the turns were committed
+        """
+        for attempt in range(1, attempts + 1):
+            db = SessionLocal()
+            try:
+                ChatService.save_turns(db, turns)
+                return True
+            except Exception as e:
+                logger.warning(
+                    "Chat write-behind batch of %s turn(s) failed (attempt %s/%s): %s",
+                    len(turns), attempt, attempts, e
+                )
+            finally:
+                db.close()
+
+        # A failed batch of several turns is retried turn by turn instead
+        if len(turns) == 1:
+            logger.error("Dropped chat turn %s after %s attempt(s)", turns[0][1].id, attempts)
+        return False
+
+
+# Global writer instance, started in the application lifespan when enabled
+chat_turn_writer = ChatTurnWriter()
@@ -1,19 +1,24 @@
 """Chunking service"""
 
+import asyncio
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from unstructured.chunking.title import chunk_by_title
 
 from app.config import settings
-from app.utils.logger import logger
+from app.utils.logger import get_logger
 from app.utils.error_handlers import DocumentProcessingError
 from app.utils.progress_tracker import ProgressTracker
+from app.utils.tracing import run_in_executor, traced
+
+logger = get_logger(__name__)
 
 
 class ChunkingService:
     """Service for chunking documents"""
     
+    @traced("ingest.chunk")
     async def create_chunks(
         self,
         elements: List[Any],
@@ -33,7 +38,7 @@ class ChunkingService:
             DocumentProcessingError: If chunking fails
         """
         try:
-            logger.info(f"Starting chunking of {len(elements)} elements")
+            logger.info("Starting chunking of %s elements", len(elements))
             
             if progress_tracker:
                 await progress_tracker.start_stage(
@@ -41,37 +46,42 @@ class ChunkingService:
                     f"Creating chunks from {len(elements)} elements"
                 )
             
-            # Create chunks
-            chunks = chunk_by_title(
-                elements,
-                max_characters=settings.CHUNK_MAX_CHARS,
-                new_after_n_chars=settings.CHUNK_NEW_AFTER_CHARS,
-                combine_text_under_n_chars=settings.CHUNK_COMBINE_UNDER_CHARS
-            )
+            # Chunk on a worker thread; finished chunks stream back through the queue
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue = asyncio.Queue()
+            worker = run_in_executor(self._chunk_sync, elements, loop, queue)
             
-            # Process chunks and extract metadata
             processed_chunks = []
-            total_chunks = len(chunks)
+            total_chunks = 0
             
-            for i, chunk in enumerate(chunks):
-                chunk_data = self._extract_chunk_metadata(chunk, i + 1)
-                processed_chunks.append(chunk_data)
+            while True:
+                kind, value = await queue.get()
+                if kind == "done":
+                    break
+                if kind == "total":
+                    total_chunks = value
+                    continue
+                
+                processed_chunks.append(value)
                 
                 # Update progress more frequently for better UX
                 if progress_tracker:
                     # Calculate progress (10% to 90% range, leaving 0% for start and 100% for completion)
-                    progress = int(10 + ((i + 1) / total_chunks * 80))
+                    progress = int(10 + (len(processed_chunks) / total_chunks * 80))
                     await progress_tracker.update(
                         "chunking",
                         progress,
                         {
-                            "chunks_processed": i + 1, 
+                            "chunks_processed": len(processed_chunks), 
                             "total_chunks": total_chunks,
-                            "message": f"Processing chunk {i + 1} of {total_chunks}..."
+                            "message": f"Processing chunk {len(processed_chunks)} of {total_chunks}..."
                         }
                     )
             
-            logger.info(f"Chunking complete: {len(processed_chunks)} chunks created")
+            # Re-raises anything the worker thread raised
+            await worker
+            
+            logger.info("Chunking complete: %s chunks created", len(processed_chunks))
             
             if progress_tracker:
                 # Create chunk summary with full transparency
@@ -105,7 +115,7 @@ class ChunkingService:
             return processed_chunks
             
         except Exception as e:
-            logger.error(f"Chunking failed: {e}", exc_info=True)
+            logger.error("Chunking failed: %s", e, exc_info=True)
             if progress_tracker:
                 await progress_tracker.error("chunking", str(e))
             raise DocumentProcessingError(
@@ -113,6 +123,40 @@ class ChunkingService:
                 detail=str(e)
             )
     
+    def _chunk_sync(
+        self,
+        elements: List[Any],
+        loop: asyncio.AbstractEventLoop,
+        queue: "asyncio.Queue[Tuple[str, Any]]"
+    ) -> None:
+        """
+        Chunk elements and extract metadata (blocking, runs on a worker thread).
+        
+        Posts ("total", count), then ("chunk", chunk_data) per chunk, and
+        always a final ("done", None) so the consumer never waits forever.
+        
+        Args:
+            elements: List of document elements
+            loop: Event loop the consumer runs on
+            queue: Queue read by the consumer
+        """
+        def post(kind: str, value: Any) -> None:
+            loop.call_soon_threadsafe(queue.put_nowait, (kind, value))
+        
+        try:
+            chunks = chunk_by_title(
+                elements,
+                max_characters=settings.CHUNK_MAX_CHARS,
+                new_after_n_chars=settings.CHUNK_NEW_AFTER_CHARS,
+                combine_text_under_n_chars=settings.CHUNK_COMBINE_UNDER_CHARS
+            )
+            post("total", len(chunks))
+            
+            for i, chunk in enumerate(chunks):
+                post("chunk", self._extract_chunk_metadata(chunk, i + 1))
+        finally:
+            post("done", None)
+    
     def _extract_chunk_metadata(self, chunk: Any, chunk_id: int) -> Dict[str, Any]:
         """
         Extract metadata from a chunk.
@@ -129,8 +173,10 @@ class ChunkingService:
             "text": chunk.text,
             "tables": [],
             "images": [],
+            "image_texts": [],  # OCR text and caption per image, for image vectors
             "metadata": {}
         }
+        captions = []
         
         # Extract tables and images from original elements
         if hasattr(chunk, 'metadata') and hasattr(chunk.metadata, 'orig_elements'):
@@ -146,5 +192,14 @@ class ChunkingService:
                 elif element_type == 'Image':
                     if hasattr(element, 'metadata') and hasattr(element.metadata, 'image_base64'):
                         chunk_data['images'].append(element.metadata.image_base64)
+                        chunk_data['image_texts'].append(element.text or "")
+                
+                # Handle figure captions
+                elif element_type == 'FigureCaption' and element.text:
+                    captions.append(element.text)
+        
+        # Captions follow their figures, so pair them in order
+        for i, caption in enumerate(captions[:len(chunk_data['image_texts'])]):
+            chunk_data['image_texts'][i] = f"{caption}\n{chunk_data['image_texts'][i]}".strip()
         
         return chunk_data
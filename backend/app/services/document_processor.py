@@ -4,12 +4,13 @@ import os
 from typing import Dict, List, Any, Optional, Callable, Awaitable
 from pathlib import Path
 
-from unstructured.partition.pdf import partition_pdf
-
 from app.config import settings
-from app.utils.logger import logger
+from app.utils.logger import get_logger
 from app.utils.error_handlers import DocumentProcessingError
 from app.utils.progress_tracker import ProgressTracker
+from app.utils.tracing import traced
+
+logger = get_logger(__name__)
 
 
 class DocumentProcessor:
@@ -22,6 +23,7 @@ class DocumentProcessor:
         os.environ["TESSDATA_PREFIX"] = f"{settings.TESSERACT_PATH}\\tessdata"
         os.environ["PATH"] = f"{settings.POPPLER_PATH}{os.pathsep}{os.environ.get('PATH', '')}"
     
+    @traced("ingest.partition")
     async def partition_pdf(
         self,
         file_path: str,
@@ -41,7 +43,7 @@ class DocumentProcessor:
             DocumentProcessingError: If processing fails
         """
         try:
-            logger.info(f"Starting PDF partitioning: {file_path}")
+            logger.info("Starting PDF partitioning: %s", file_path)
             
             if progress_tracker:
                 await progress_tracker.start_stage(
@@ -61,6 +63,9 @@ class DocumentProcessor:
                 if progress_tracker:
                     await progress_tracker.update("partitioning", 25, {"message": "Analyzing document structure..."})
                 
+                # Imported here: unstructured's PDF stack is slow to import
+                from unstructured.partition.pdf import partition_pdf
+                
                 # Run the blocking partition_pdf in a thread pool
                 loop = asyncio.get_event_loop()
                 elements = await loop.run_in_executor(
@@ -108,10 +113,8 @@ class DocumentProcessor:
             total_elements = len(elements)
             
             logger.info(
-                f"PDF partitioning complete: {total_elements} elements "
-                f"(text: {element_counts['text']}, "
-                f"tables: {element_counts['table']}, "
-                f"images: {element_counts['image']})"
+                "PDF partitioning complete: %s elements (text: %s, tables: %s, images: %s)",
+                total_elements, element_counts['text'], element_counts['table'], element_counts['image']
             )
             
             if progress_tracker:
@@ -131,7 +134,7 @@ class DocumentProcessor:
             }
             
         except Exception as e:
-            logger.error(f"PDF partitioning failed: {e}", exc_info=True)
+            logger.error("PDF partitioning failed: %s", e, exc_info=True)
             if progress_tracker:
                 await progress_tracker.error("partitioning", str(e))
             raise DocumentProcessingError(
@@ -0,0 +1,181 @@
+"""Document-level routing for two-stage retrieval"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Document
+from app.services.retrieval_cache import retrieval_cache
+from app.services.vectorization_service import VectorizationService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def summary_embedding(vectors: Sequence[Sequence[float]]) -> Optional[bytes]:
+    """
+    Summarize a document as the normalized mean of its chunk embeddings.
+
+    Args:
+        vectors: Chunk embeddings of one document
+
+    Returns:
+        float32 bytes for Document.summary_embedding, or None without vectors
+    """
+    if len(vectors) == 0:
+        return None
+    centroid = np.asarray(vectors, dtype=np.float32).mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    if norm > 0:
+        centroid /= norm
+    return centroid.astype(np.float32).tobytes()
+
+
+# (generation, loaded_at, routed ids, summary matrix, unrouted ids)
+_SessionIndex = Tuple[int, float, List[str], np.ndarray, List[str]]
+
+
+class DocumentRouter:
+    """
+    Pick the documents of a session most relevant to a query.
+
+    The first, coarse stage of retrieval: the query embedding is compared
+    with one summary embedding per document, and the chunk search then runs
+    only within the top-M documents. Documents without a summary embedding
+    (ingested before routing existed) are always searched.
+    """
+
+    def __init__(
+        self,
+        top_m: int = settings.DOCUMENT_ROUTING_TOP_M,
+        min_documents: int = settings.DOCUMENT_ROUTING_MIN_DOCUMENTS,
+        max_sessions: int = 256
+    ):
+        """
+        Initialize document router.
+
+        Args:
+            top_m: Documents searched per query
+            min_documents: Sessions with at most this many documents are not routed
+            max_sessions: Session indexes kept in memory
+        """
+        self.top_m = top_m
+        self.min_documents = min_documents
+        self.max_sessions = max_sessions
+        self._indexes: "OrderedDict[str, _SessionIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def route(
+        self,
+        session_id: str,
+        query_embedding: Sequence[float],
+        document_ids: Optional[List[str]] = None
+    ) -> Optional[List[str]]:
+        """
+        Narrow a retrieval to the documents closest to the query (blocking).
+
+        Args:
+            session_id: Session identifier
+            query_embedding: Embedded query
+            document_ids: Optional filter requested by the caller
+
+        Returns:
+            Document ids to search, or document_ids unchanged when routing
+            would not narrow the search
+        """
+        routed_ids, matrix, unrouted_ids = self._session_index(session_id)
+
+        if document_ids:
+            allowed = set(document_ids)
+            rows = [i for i, document_id in enumerate(routed_ids) if document_id in allowed]
+            unrouted_ids = [document_id for document_id in unrouted_ids if document_id in allowed]
+        else:
+            rows = list(range(len(routed_ids)))
+
+        if len(rows) + len(unrouted_ids) <= self.min_documents or len(rows) <= self.top_m:
+            return document_ids
+
+        scores = matrix[rows] @ np.asarray(query_embedding, dtype=np.float32)
+        top = np.argpartition(-scores, self.top_m - 1)[:self.top_m]
+        top = top[np.argsort(-scores[top])]
+
+        return [routed_ids[rows[i]] for i in top] + unrouted_ids
+
+    def _session_index(self, session_id: str) -> Tuple[List[str], np.ndarray, List[str]]:
+        """Summary matrix of a session, reloaded when its documents change"""
+        generation = retrieval_cache.generation(session_id)
+        ttl = settings.RETRIEVAL_CACHE_TTL_SECONDS
+
+        with self._lock:
+            index = self._indexes.get(session_id)
+            if index and index[0] == generation and not (ttl and time.monotonic() - index[1] > ttl):
+                self._indexes.move_to_end(session_id)
+                return index[2], index[3], index[4]
+
+        db = SessionLocal()
+        try:
+            rows = db.query(Document.id, Document.summary_embedding)\
+                .filter(Document.session_id == session_id)\
+                .order_by(Document.uploaded_at)\
+                .all()
+        finally:
+            db.close()
+
+        routed_ids = [row.id for row in rows if row.summary_embedding]
+        unrouted_ids = [row.id for row in rows if not row.summary_embedding]
+        if routed_ids:
+            matrix = np.stack([
+                np.frombuffer(row.summary_embedding, dtype=np.float32)
+                for row in rows if row.summary_embedding
+            ])
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+
+        with self._lock:
+            self._indexes[session_id] = (generation, time.monotonic(), routed_ids, matrix, unrouted_ids)
+            self._indexes.move_to_end(session_id)
+            while len(self._indexes) > self.max_sessions:
+                self._indexes.popitem(last=False)
+
+        return routed_ids, matrix, unrouted_ids
+
+    @staticmethod
+    def compute_summary(
+        vectorization_service: VectorizationService,
+        session_id: str,
+        document_id: str
+    ) -> Optional[bytes]:
+        """
+        Build a document's summary embedding from its stored chunk vectors (blocking).
+
+        Reads the vectors back from the session's vector store, so no text
+        is embedded twice.
+
+        Args:
+            vectorization_service: Service owning the vector stores
+            session_id: Session identifier
+            document_id: Document identifier
+
+        Returns:
+            Summary embedding bytes, or None if the document has no vectors
+        """
+        vectorstore = vectorization_service.get_vector_store(session_id)
+        if vectorstore is None:
+            return None
+
+        # Chunk vectors only: table and image vectors would pull the centroid towards figures
+        stored = vectorstore.get(
+            where={"$and": [{"document_id": document_id}, {"vector_kind": "chunk"}]},
+            include=["embeddings"]
+        )
+        embeddings = stored.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            logger.warning("No vectors found for document %s; it will not be routed", document_id)
+            return None
+
+        return summary_embedding(embeddings)
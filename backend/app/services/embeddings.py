@@ -0,0 +1,284 @@
+"""Embedding model backends"""
+
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.error_handlers import VectorizationError
+
+logger = get_logger(__name__)
+
+
+EMBEDDING_BACKENDS = ("torch", "onnx")
+
+# Process-wide model shared by every service instance
+_shared_embeddings: Optional[Embeddings] = None
+_shared_lock = threading.Lock()
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Sentence embeddings computed with ONNX Runtime.
+
+    The Hugging Face model is exported to ONNX once, optionally quantized
+    to int8 with dynamic quantization, and cached under ONNX_MODEL_DIR.
+    Pooling (CLS token) and L2 normalization match the BGE models served
+    by sentence-transformers, so vectors are interchangeable with the
+    torch backend.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Path,
+        quantize: bool = True,
+        batch_size: int = 32,
+        max_length: int = 512,
+        num_threads: Optional[int] = None
+    ):
+        """
+        Initialize ONNX embeddings.
+
+        Args:
+            model_name: Hugging Face model identifier
+            cache_dir: Directory for exported ONNX models
+            quantize: Use int8 dynamic quantization
+            batch_size: Texts per inference batch
+            max_length: Maximum tokens per text
+            num_threads: Intra-op threads for ONNX Runtime (None for default)
+        """
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise VectorizationError(
+                "ONNX embedding backend unavailable",
+                detail=f"{e}. Install onnxruntime and onnx to use EMBEDDING_BACKEND=onnx"
+            )
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        self.model_dir = Path(cache_dir) / model_name.replace("/", "__")
+        self.model_path = self._ensure_model()
+
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(
+            str(self.model_path),
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _ensure_model(self) -> Path:
+        """Export (and quantize) the model if it is not cached yet"""
+        fp32_path = self.model_dir / "model.onnx"
+        int8_path = self.model_dir / "model.int8.onnx"
+        target_path = int8_path if self.quantize else fp32_path
+
+        if target_path.exists():
+            return target_path
+
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+
+        if not fp32_path.exists():
+            self._export(fp32_path)
+
+        if self.quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info("Quantizing ONNX model to int8: %s", int8_path)
+            quantize_dynamic(
+                str(fp32_path),
+                str(int8_path),
+                weight_type=QuantType.QInt8
+            )
+
+        return target_path
+
+    def _export(self, output_path: Path) -> None:
+        """Export the Hugging Face model to ONNX"""
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        logger.info("Exporting %s to ONNX: %s", self.model_name, output_path)
+
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModel.from_pretrained(self.model_name)
+        model.eval()
+
+        class _LastHiddenState(torch.nn.Module):
+            def __init__(self, encoder):
+                super().__init__()
+                self.encoder = encoder
+
+            def forward(self, input_ids, attention_mask, token_type_ids):
+                return self.encoder(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    token_type_ids=token_type_ids
+                ).last_hidden_state
+
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        input_names = ["input_ids", "attention_mask", "token_type_ids"]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        with torch.no_grad():
+            torch.onnx.export(
+                _LastHiddenState(model),
+                tuple(sample[name] for name in input_names),
+                str(output_path),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14
+            )
+
+        # Keep the tokenizer next to the model so later loads are offline
+        tokenizer.save_pretrained(str(self.model_dir))
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in batches, returning L2-normalized CLS vectors"""
+        vectors = []
+
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+
+            inputs = {
+                name: encoded[name].astype(np.int64)
+                for name in self._input_names
+                if name in encoded
+            }
+            if "token_type_ids" in self._input_names and "token_type_ids" not in inputs:
+                inputs["token_type_ids"] = np.zeros_like(inputs["input_ids"])
+
+            last_hidden_state = self.session.run(None, inputs)[0]
+            cls = last_hidden_state[:, 0]
+            cls /= np.linalg.norm(cls, axis=1, keepdims=True).clip(min=1e-12)
+            vectors.append(cls)
+
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+
+        return np.concatenate(vectors)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents"""
+        return self._encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self._encode([text])[0].tolist()
+
+
+class TimedEmbeddings(Embeddings):
+    """Embeddings wrapper that accumulates the time spent embedding"""
+
+    def __init__(self, embeddings: Embeddings):
+        """
+        Initialize timed embeddings.
+
+        Args:
+            embeddings: Embeddings to delegate to
+        """
+        self.embeddings = embeddings
+        self.seconds = 0.0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        started = time.perf_counter()
+        try:
+            return self.embeddings.embed_documents(texts)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def embed_query(self, text: str) -> List[float]:
+        started = time.perf_counter()
+        try:
+            return self.embeddings.embed_query(text)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+
+def create_embeddings(backend: Optional[str] = None) -> Embeddings:
+    """
+    Create the configured embedding model.
+
+    Args:
+        backend: "torch" or "onnx" (defaults to settings.EMBEDDING_BACKEND)
+
+    Returns:
+        LangChain embeddings instance
+
+    Raises:
+        VectorizationError: If the backend is unknown or cannot be loaded
+    """
+    backend = (backend or settings.EMBEDDING_BACKEND).lower()
+
+    if backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(
+            model_name=settings.EMBEDDING_MODEL,
+            model_kwargs={'device': 'cpu'},
+            encode_kwargs={
+                'normalize_embeddings': True,
+                'batch_size': settings.EMBEDDING_BATCH_SIZE  # Process in batches for better performance
+            }
+        )
+
+    if backend == "onnx":
+        return OnnxEmbeddings(
+            model_name=settings.EMBEDDING_MODEL,
+            cache_dir=settings.ONNX_MODEL_DIR,
+            quantize=settings.ONNX_QUANTIZE,
+            batch_size=settings.EMBEDDING_BATCH_SIZE
+        )
+
+    raise VectorizationError(
+        "Unknown embedding backend",
+        detail=f"{backend!r} is not one of {EMBEDDING_BACKENDS}"
+    )
+
+
+def get_embeddings() -> Embeddings:
+    """
+    Get the process-wide embedding model, loading it on first use.
+
+    Returns:
+        Shared LangChain embeddings instance
+    """
+    global _shared_embeddings
+
+    if _shared_embeddings is None:
+        with _shared_lock:
+            if _shared_embeddings is None:
+                _shared_embeddings = create_embeddings()
+
+    return _shared_embeddings
+
+
+def embeddings_loaded() -> bool:
+    """Whether the shared embedding model has been loaded"""
+    return _shared_embeddings is not None
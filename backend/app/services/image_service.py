@@ -0,0 +1,202 @@
+"""Image normalization service"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import re
+import shutil
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from PIL import Image
+
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.progress_tracker import ProgressTracker
+from app.utils.tracing import traced
+
+logger = get_logger(__name__)
+
+
+IMAGE_FORMATS = {
+    "WEBP": ("webp", "image/webp"),
+    "JPEG": ("jpg", "image/jpeg"),
+}
+
+IMAGE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ImageService:
+    """Service for normalizing extracted images"""
+
+    def __init__(self):
+        """Initialize image service"""
+        self.format = settings.IMAGE_FORMAT.upper()
+        if self.format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported IMAGE_FORMAT: {settings.IMAGE_FORMAT}")
+        self.extension, self.mime_type = IMAGE_FORMATS[self.format]
+        self.stored_bytes = 0  # Bytes of new image files written by this instance
+
+    @traced("ingest.images")
+    async def normalize_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        session_id: str,
+        progress_tracker: Optional[ProgressTracker] = None
+    ) -> Dict[str, int]:
+        """
+        Normalize the images of every chunk in place.
+
+        Each base64 image is decoded once, downscaled to IMAGE_MAX_DIMENSION,
+        re-encoded at IMAGE_QUALITY and written to IMAGE_DIR. The chunk keeps
+        only a reference with a small thumbnail; undecodable images are left
+        as they were.
+
+        Args:
+            chunks: Chunks from ChunkingService
+            session_id: Session the images belong to
+            progress_tracker: Optional progress tracker
+
+        Returns:
+            Dictionary with image count, payload sizes before and after, and
+            bytes of new image files written
+        """
+        loop = asyncio.get_running_loop()
+        stats = await loop.run_in_executor(None, self._normalize_chunks_sync, chunks, session_id)
+
+        logger.info(
+            "Normalized %s images for session %s: %s -> %s bytes inline (%s saved)",
+            stats['images'], session_id, stats['original_bytes'], stats['thumbnail_bytes'], stats['bytes_saved']
+        )
+
+        if progress_tracker and stats["images"]:
+            await progress_tracker.update(
+                "chunking",
+                95,
+                {
+                    "image_bytes_saved": stats["bytes_saved"],
+                    "message": f"Optimized {stats['images']} images ({stats['bytes_saved'] // 1024} KB saved)"
+                }
+            )
+
+        return stats
+
+    def _normalize_chunks_sync(self, chunks: List[Dict[str, Any]], session_id: str) -> Dict[str, int]:
+        """Normalize images on a worker thread"""
+        stats = {"images": 0, "original_bytes": 0, "thumbnail_bytes": 0, "bytes_saved": 0, "stored_bytes": 0}
+        self.stored_bytes = 0
+        image_dir = settings.IMAGE_DIR / session_id
+
+        for chunk in chunks:
+            normalized = []
+            for image in chunk["images"]:
+                if not isinstance(image, str):
+                    normalized.append(image)
+                    continue
+
+                try:
+                    reference = self.normalize(image, image_dir)
+                except Exception as e:
+                    logger.warning("Failed to normalize image in chunk %s: %s", chunk['chunk_id'], e)
+                    normalized.append(image)
+                    continue
+
+                stats["images"] += 1
+                stats["original_bytes"] += len(image)
+                stats["thumbnail_bytes"] += len(reference["thumbnail_base64"])
+                normalized.append(reference)
+
+            chunk["images"] = normalized
+
+        stats["bytes_saved"] = stats["original_bytes"] - stats["thumbnail_bytes"]
+        stats["stored_bytes"] = self.stored_bytes
+        return stats
+
+    def normalize(self, image_base64: str, image_dir: Path) -> Dict[str, Any]:
+        """
+        Decode, downscale and re-encode one image.
+
+        Args:
+            image_base64: Base64 image as produced by unstructured
+            image_dir: Directory for the full-size image
+
+        Returns:
+            Image reference with id, mime type, dimensions and thumbnail
+        """
+        with Image.open(io.BytesIO(base64.b64decode(image_base64))) as source:
+            image = source.convert("RGBA" if self.format == "WEBP" and source.mode in ("RGBA", "LA", "P") else "RGB")
+
+        image.thumbnail((settings.IMAGE_MAX_DIMENSION, settings.IMAGE_MAX_DIMENSION))
+        full_bytes = self._encode(image)
+
+        thumbnail = image.copy()
+        thumbnail.thumbnail((settings.IMAGE_THUMBNAIL_SIZE, settings.IMAGE_THUMBNAIL_SIZE))
+        thumbnail_bytes = self._encode(thumbnail)
+
+        # Content-addressed, so repeated images are stored once
+        image_id = hashlib.sha256(full_bytes).hexdigest()[:32]
+        image_dir.mkdir(parents=True, exist_ok=True)
+        image_path = image_dir / f"{image_id}.{self.extension}"
+        if not image_path.exists():
+            image_path.write_bytes(full_bytes)
+            self.stored_bytes += len(full_bytes)
+
+        return {
+            "image_id": image_id,
+            "mime_type": self.mime_type,
+            "width": image.width,
+            "height": image.height,
+            "bytes": len(full_bytes),
+            "thumbnail_base64": base64.b64encode(thumbnail_bytes).decode("ascii")
+        }
+
+    def _encode(self, image: Image.Image) -> bytes:
+        """Encode an image in the configured format"""
+        buffer = io.BytesIO()
+        if self.format == "JPEG":
+            image.convert("RGB").save(buffer, format="JPEG", quality=settings.IMAGE_QUALITY, optimize=True)
+        else:
+            image.save(buffer, format="WEBP", quality=settings.IMAGE_QUALITY, method=4)
+        return buffer.getvalue()
+
+    @staticmethod
+    def get_image_path(session_id: str, image_id: str) -> Optional[Path]:
+        """
+        Find the stored full-size image.
+
+        Args:
+            session_id: Session identifier
+            image_id: Image identifier
+
+        Returns:
+            Path to the image, or None if not found
+        """
+        if not IMAGE_ID_PATTERN.match(image_id) or Path(session_id).name != session_id:
+            return None
+
+        for extension, _ in IMAGE_FORMATS.values():
+            path = settings.IMAGE_DIR / session_id / f"{image_id}.{extension}"
+            if path.exists():
+                return path
+
+        return None
+
+    @staticmethod
+    def delete_session_images(session_id: str) -> bool:
+        """
+        Delete all stored images of a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if images were deleted
+        """
+        image_dir = settings.IMAGE_DIR / session_id
+        if Path(session_id).name != session_id or not image_dir.exists():
+            return False
+
+        shutil.rmtree(image_dir, ignore_errors=True)
+        logger.info("Deleted images for session %s", session_id)
+        return True
@@ -0,0 +1,156 @@
+"""On-disk checkpoints of document ingestion"""
+
+import json
+import os
+import shutil
+import socket
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+
+# Stages whose output is checkpointed, in pipeline order
+CHECKPOINT_STAGES = ("partition", "chunk", "prepare")
+
+
+def _write_atomic(path: Path, data: str) -> None:
+    """Write a file so a crash leaves either the old or the new version"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class IngestionCheckpoint:
+    """
+    Persist the output of each ingestion stage of one document.
+
+    - partition: the partitioned elements and their counts
+    - chunk: the chunks
+    - prepare: the chunks after image normalization and summarization
+    - vector offset: how many vectors were stored, updated per batch
+
+    A restarted worker resumes from the last completed stage instead of
+    redoing the hi_res partitioning. All methods block and are meant to
+    run on the default executor.
+    """
+
+    def __init__(self, session_id: str, document_id: str):
+        """
+        Initialize checkpoint.
+
+        Args:
+            session_id: Session identifier
+            document_id: Document identifier
+        """
+        self.directory = settings.CHECKPOINT_DIR / session_id / document_id
+        self._state_path = self.directory / "state.json"
+
+    def load_state(self) -> Dict[str, Any]:
+        """
+        Read the checkpoint state.
+
+        Returns:
+            {"stage": last completed stage or None, "vector_offset": vectors stored}
+        """
+        try:
+            with open(self._state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"stage": None, "vector_offset": 0}
+
+    @staticmethod
+    def reached(last_stage: Optional[str], stage: str) -> bool:
+        """Whether stage is done when last_stage is the last checkpointed one"""
+        return last_stage is not None and CHECKPOINT_STAGES.index(last_stage) >= CHECKPOINT_STAGES.index(stage)
+
+    def _save_state(self, **changes: Any) -> None:
+        state = self.load_state()
+        state.update(changes)
+        _write_atomic(self._state_path, json.dumps(state))
+
+    def save_partition(self, partition_result: Dict[str, Any]) -> None:
+        """Store partitioned elements and counts"""
+        from unstructured.staging.base import elements_to_json
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.directory / "elements.json", elements_to_json(partition_result["elements"], indent=None))
+        _write_atomic(
+            self.directory / "partition.json",
+            json.dumps({"counts": partition_result["counts"], "total": partition_result["total"]})
+        )
+        self._save_state(stage="partition", vector_offset=0)
+
+    def load_partition(self) -> Dict[str, Any]:
+        """Partition result as returned by DocumentProcessor.partition_pdf"""
+        from unstructured.staging.base import elements_from_json
+
+        with open(self.directory / "partition.json", encoding="utf-8") as f:
+            partition_result = json.load(f)
+        partition_result["elements"] = elements_from_json(filename=str(self.directory / "elements.json"))
+        return partition_result
+
+    def save_chunks(self, chunks: List[Dict[str, Any]], stage: str) -> None:
+        """
+        Store chunks at the end of the chunk or prepare stage.
+
+        Args:
+            chunks: Chunks as produced by the stage
+            stage: "chunk" or "prepare"
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.directory / "chunks.json", json.dumps(chunks))
+        self._save_state(stage=stage, vector_offset=0)
+
+        # Elements are no longer needed once chunks exist
+        (self.directory / "elements.json").unlink(missing_ok=True)
+
+    def load_chunks(self) -> List[Dict[str, Any]]:
+        """Chunks of the last completed chunk or prepare stage"""
+        with open(self.directory / "chunks.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_vector_offset(self, offset: int) -> None:
+        """Record that the first `offset` vectors are stored"""
+        self._save_state(vector_offset=offset)
+
+    def clear(self) -> None:
+        """Remove the checkpoint once the document is completed or failed"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def clear_session(session_id: str) -> None:
+        """Remove all checkpoints of a session"""
+        shutil.rmtree(settings.CHECKPOINT_DIR / session_id, ignore_errors=True)
+
+    @staticmethod
+    def owner() -> str:
+        """Identifier of this process, recorded on documents it is ingesting"""
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def owner_alive(owner: Optional[str]) -> bool:
+        """
+        Whether the process that claimed a document may still be ingesting it.
+
+        The database is a local SQLite file, so every process sharing it
+        runs on this host. An owner with another hostname was a previous
+        container (redeploys change the hostname) and is gone.
+        """
+        if not owner:
+            return False
+
+        host, _, pid = owner.rpartition(":")
+        if host != socket.gethostname():
+            return False
+
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, ValueError):
+            return True
+        return True
@@ -0,0 +1,309 @@
+"""Resilient LLM client"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import groq
+import httpx
+from langchain_groq import ChatGroq
+
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.error_handlers import ChatError
+from app.utils.metrics import LLM_SECONDS, LLM_TOKENS
+from app.utils.tracing import traced
+
+logger = get_logger(__name__)
+
+
+class LLMUnavailableError(ChatError):
+    """Raised when the LLM circuit is open and no fallback model is configured"""
+    pass
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open trial"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: Time the circuit stays open before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release(self) -> None:
+        """End a request that says nothing about the provider's health (e.g. a 400)"""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning("LLM circuit opened after %s consecutive failures", self.failures)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an LLM error is worth retrying (429, 5xx, timeouts, connection errors)"""
+    if isinstance(error, (asyncio.TimeoutError, groq.APITimeoutError, groq.APIConnectionError, httpx.TransportError)):
+        return True
+
+    status_code = getattr(error, "status_code", None)
+    return status_code == 429 or (status_code is not None and status_code >= 500)
+
+
+class LLMClient:
+    """
+    Chat model client with pooled connections, retries, hedging and a circuit breaker.
+
+    - Connections are kept alive in an explicitly sized httpx pool with
+      separate connect and read timeouts.
+    - 429/5xx/timeout errors are retried with full-jitter exponential backoff.
+    - With hedging enabled, a duplicate request is sent once the first has
+      taken longer than the recent p95 latency; the first answer wins.
+    - After repeated failures the circuit opens: requests fail fast, or go
+      to the fallback model when one is configured.
+    """
+
+    def __init__(self, model: Optional[str] = None, fallback_model: Optional[str] = None):
+        """
+        Initialize LLM client.
+
+        Args:
+            model: Primary model (defaults to settings.LLM_MODEL)
+            fallback_model: Model used while the circuit is open (defaults to settings.LLM_FALLBACK_MODEL)
+        """
+        self.model = model or settings.LLM_MODEL
+        self.fallback_model = fallback_model or settings.LLM_FALLBACK_MODEL
+
+        timeout = httpx.Timeout(
+            settings.LLM_READ_TIMEOUT,
+            connect=settings.LLM_CONNECT_TIMEOUT
+        )
+        limits = httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY
+        )
+        self.http_client = httpx.Client(timeout=timeout, limits=limits)
+        self.http_async_client = httpx.AsyncClient(timeout=timeout, limits=limits)
+
+        self.primary = self._create_model(self.model)
+        self.fallback = self._create_model(self.fallback_model) if self.fallback_model else None
+
+        self.circuit = CircuitBreaker(
+            settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            settings.LLM_CIRCUIT_RESET_SECONDS
+        )
+        self._latencies: Deque[float] = deque(maxlen=200)
+        self.metrics: Dict[str, int] = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "attempts": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "hedges_sent": 0,
+            "hedges_won": 0,
+            "circuit_rejections": 0,
+            "fallbacks": 0,
+        }
+
+    def _create_model(self, model: str) -> ChatGroq:
+        """Create a chat model sharing this client's connection pools"""
+        return ChatGroq(
+            model=model,
+            api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL,
+            temperature=settings.LLM_TEMPERATURE,
+            max_retries=0,  # Retries are handled here
+            http_client=self.http_client,
+            http_async_client=self.http_async_client
+        )
+
+    @traced("llm.ainvoke")
+    async def ainvoke(self, prompt: Any) -> Any:
+        """
+        Invoke the chat model.
+
+        Args:
+            prompt: Prompt or messages
+
+        Returns:
+            Model response
+
+        Raises:
+            LLMUnavailableError: If the circuit is open and there is no fallback
+            ChatError: If every attempt fails
+        """
+        self.metrics["requests"] += 1
+
+        if not self.circuit.allow():
+            self.metrics["circuit_rejections"] += 1
+            if self.fallback:
+                self.metrics["fallbacks"] += 1
+                return await self._invoke_with_retries(self.fallback, prompt, track=False)
+            raise LLMUnavailableError(
+                "LLM temporarily unavailable",
+                detail=f"Circuit open after repeated failures; retrying in {self.circuit.reset_seconds:.0f}s"
+            )
+
+        started = time.perf_counter()
+        try:
+            response = await self._invoke_with_retries(self.primary, prompt, track=True)
+        except Exception as e:
+            # Client errors (400, 413, context length) are the request's fault,
+            # so one user's oversized prompts can't open the circuit for everyone
+            if is_retryable(e):
+                self.circuit.record_failure()
+            else:
+                self.circuit.release()
+            self.metrics["failures"] += 1
+            raise
+
+        self.circuit.record_success()
+        self.metrics["successes"] += 1
+        LLM_SECONDS.labels(self.model).observe(time.perf_counter() - started)
+        self._record_tokens(response)
+        return response
+
+    async def _invoke_with_retries(self, model: ChatGroq, prompt: Any, track: bool) -> Any:
+        """Invoke with jittered exponential backoff on retryable errors"""
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            started = time.perf_counter()
+            try:
+                response = await self._invoke_hedged(model, prompt)
+            except Exception as e:
+                self._count_error(e)
+                if attempt >= settings.LLM_MAX_RETRIES or not is_retryable(e):
+                    raise
+
+                self.metrics["retries"] += 1
+                delay = random.uniform(0, min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * 2 ** attempt))
+                logger.warning("LLM request failed (%s), retry %s in %.2fs", e, attempt + 1, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            if track:
+                self._latencies.append(time.perf_counter() - started)
+            return response
+
+    async def _invoke_hedged(self, model: ChatGroq, prompt: Any) -> Any:
+        """Send the request, plus a hedge if it is slower than recent p95"""
+        self.metrics["attempts"] += 1
+        primary = asyncio.ensure_future(model.ainvoke(prompt))
+
+        hedge_delay = self.hedge_delay()
+        if hedge_delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        self.metrics["hedges_sent"] += 1
+        self.metrics["attempts"] += 1
+        hedge = asyncio.ensure_future(model.ainvoke(prompt))
+        pending = {primary, hedge}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.metrics["hedges_won"] += 1
+                        return task.result()
+            # Both failed: surface the primary's error
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Delay before hedging, or None when hedging is off or there is too little data"""
+        if not settings.LLM_HEDGING or len(self._latencies) < 20:
+            return None
+
+        ordered = sorted(self._latencies)
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        return max(settings.LLM_HEDGE_MIN_DELAY, p95)
+
+    @staticmethod
+    def _record_tokens(response: Any) -> None:
+        """Export token usage reported by the provider"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage:
+            LLM_TOKENS.labels("prompt").inc(usage.get("input_tokens", 0))
+            LLM_TOKENS.labels("completion").inc(usage.get("output_tokens", 0))
+            return
+
+        token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        LLM_TOKENS.labels("prompt").inc(token_usage.get("prompt_tokens", 0))
+        LLM_TOKENS.labels("completion").inc(token_usage.get("completion_tokens", 0))
+
+    def _count_error(self, error: BaseException) -> None:
+        if isinstance(error, (asyncio.TimeoutError, groq.APITimeoutError, httpx.TimeoutException)):
+            self.metrics["timeouts"] += 1
+            return
+
+        status_code = getattr(error, "status_code", None)
+        if status_code == 429:
+            self.metrics["rate_limited"] += 1
+        elif status_code is not None and status_code >= 500:
+            self.metrics["server_errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters, circuit state and latency summary"""
+        ordered = sorted(self._latencies)
+        return {
+            "model": self.model,
+            "fallback_model": self.fallback_model,
+            "circuit_state": self.circuit.state,
+            "circuit_opened": self.circuit.times_opened,
+            "latency_p50": ordered[len(ordered) // 2] if ordered else None,
+            "latency_p95": ordered[int(0.95 * (len(ordered) - 1))] if ordered else None,
+            "hedge_delay": self.hedge_delay(),
+            **self.metrics
+        }
@@ -0,0 +1,111 @@
+"""Lazily constructed shared services"""
+
+import asyncio
+import threading
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.services.embeddings import embeddings_loaded
+from app.services.rag_service import RAGService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+_rag_service: Optional[RAGService] = None
+_lock = threading.Lock()
+
+warmup_state: Dict[str, Any] = {
+    "started": False,
+    "completed": False,
+    "error": None
+}
+
+
+def _build_rag_service() -> RAGService:
+    """Construct the shared RAG service once (blocking)"""
+    global _rag_service
+
+    with _lock:
+        if _rag_service is None:
+            _rag_service = RAGService()
+
+    return _rag_service
+
+
+async def get_rag_service() -> RAGService:
+    """
+    Dependency returning the shared RAG service.
+
+    The service is built on first use in a worker thread so model loading
+    never blocks the event loop.
+
+    Returns:
+        Shared RAG service
+    """
+    if _rag_service is not None:
+        return _rag_service
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _build_rag_service)
+
+
+def preload_services() -> None:
+    """
+    Load models in the current process before workers are forked.
+
+    Used by app.serve: the embedding weights and imported libraries end up
+    in memory pages the forked workers share copy-on-write. No LLM request
+    is made, so no network connection is inherited by the workers.
+    """
+    rag_service = _build_rag_service()
+    rag_service.vectorization_service.embeddings.embed_query("warm-up")
+
+    # Import the PDF stack too, so workers share its modules
+    from unstructured.partition.pdf import partition_pdf  # noqa: F401
+
+    logger.info("Services preloaded")
+
+
+def peek_rag_service() -> Optional[RAGService]:
+    """Get the shared RAG service only if it has already been built"""
+    return _rag_service
+
+
+async def warm_up_services() -> None:
+    """Build services and load models in the background"""
+    warmup_state["started"] = True
+
+    try:
+        rag_service = await get_rag_service()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, rag_service.warm_up)
+        warmup_state["completed"] = True
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        warmup_state["error"] = str(e)
+        logger.error("Service warm-up failed: %s", e, exc_info=True)
+
+
+def readiness() -> Dict[str, Any]:
+    """
+    Report whether models are loaded and requests can be served quickly.
+
+    Without WARMUP_ON_STARTUP nothing loads the models until the first
+    request, so the process reports ready as soon as it is up; that
+    request pays the loading time.
+
+    Returns:
+        Dictionary with a ready flag and per-component state
+    """
+    components = {
+        "rag_service": _rag_service is not None,
+        "embeddings": embeddings_loaded()
+    }
+
+    return {
+        "ready": all(components.values()) or not settings.WARMUP_ON_STARTUP,
+        "components": components,
+        "warmup": dict(warmup_state)
+    }
@@ -0,0 +1,118 @@
+"""Micro-batching of query embeddings across concurrent requests"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class QueryEmbeddingBatcher:
+    """
+    Collect concurrent query embeddings into batched forward passes.
+
+    The first query of a batch waits at most max_wait_ms for others to
+    arrive; a batch is dispatched early once it holds max_batch queries.
+    Batches run one at a time on a dedicated thread so they don't compete
+    with each other for the model's intra-op threads.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_wait_ms: float = 5.0,
+        max_batch: int = 16
+    ):
+        """
+        Initialize query embedding batcher.
+
+        Args:
+            embeddings: Embedding model used for the batched passes
+            max_wait_ms: Longest time a query waits for its batch to fill
+            max_batch: Maximum queries per forward pass
+        """
+        self.embeddings = embeddings
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max_batch
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-embed")
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Running batches, referenced so they can't be garbage-collected mid-flight
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.queries = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average number of queries per forward pass"""
+        return self.queries / self.batches if self.batches else 0.0
+
+    async def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, sharing a forward pass with concurrent callers.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Query embedding
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch)
+
+        return await future
+
+    def _dispatch(self) -> None:
+        """Send the pending queries to the embedding thread"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Run one forward pass and resolve each caller's future"""
+        texts = [text for text, _ in batch]
+        loop = asyncio.get_running_loop()
+
+        try:
+            # embed_documents is the batched entry point; the configured
+            # models embed queries and documents identically
+            vectors = await loop.run_in_executor(
+                self._executor,
+                self.embeddings.embed_documents,
+                texts
+            )
+        except Exception as e:
+            logger.error("Batched query embedding failed for %s queries: %s", len(texts), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.queries += len(batch)
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def shutdown(self) -> None:
+        """Stop the embedding thread"""
+        self._executor.shutdown(wait=False)
@@ -4,12 +4,21 @@ import json
 import time
 from typing import List, Dict, Any, Optional
 
-from langchain_groq import ChatGroq
+from langchain_core.documents import Document
 
 from app.config import settings
 from app.services.vectorization_service import VectorizationService
-from app.utils.logger import logger
+from app.services.document_router import DocumentRouter
+from app.services.query_batcher import QueryEmbeddingBatcher
+from app.services.llm_client import LLMClient
+from app.services.retrieval_cache import retrieval_cache
+from app.utils.logger import get_logger
 from app.utils.error_handlers import ChatError
+from app.utils.metrics import PROMPT_CHARS, RETRIEVAL_SECONDS
+from app.utils.mmr import mmr_select
+from app.utils.tracing import run_in_executor, set_attribute, span, traced
+
+logger = get_logger(__name__)
 
 
 class RAGService:
@@ -18,32 +27,47 @@ class RAGService:
     def __init__(self):
         """Initialize RAG service"""
         self.vectorization_service = VectorizationService()
+        self.query_batcher = None
+        if settings.QUERY_BATCHING:
+            self.query_batcher = QueryEmbeddingBatcher(
+                self.vectorization_service.embeddings,
+                max_wait_ms=settings.QUERY_BATCH_MAX_WAIT_MS,
+                max_batch=settings.QUERY_BATCH_MAX_SIZE
+            )
+        self.document_router = DocumentRouter() if settings.DOCUMENT_ROUTING else None
         self.llm = None
         self._initialize_llm()
     
     def _initialize_llm(self) -> None:
         """Initialize LLM"""
         try:
-            logger.info(f"Initializing LLM: {settings.LLM_MODEL}")
-            self.llm = ChatGroq(
-                model=settings.LLM_MODEL,
-                api_key=settings.GROQ_API_KEY,
-                temperature=settings.LLM_TEMPERATURE
-            )
-            # Test connection
-            self.llm.invoke("test")
+            logger.info("Initializing LLM: %s", settings.LLM_MODEL)
+            # No network here: the first request (or warm_up) opens connections
+            self.llm = LLMClient()
             logger.info("LLM initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize LLM: {e}")
+            logger.error("Failed to initialize LLM: %s", e)
             raise ChatError("Failed to initialize LLM", detail=str(e))
     
+    def warm_up(self) -> None:
+        """Load models ahead of the first request (blocking)"""
+        self.vectorization_service.embeddings.embed_query("warm-up")
+        
+        if settings.LLM_WARMUP_PING:
+            # Also opens a pooled keep-alive connection to the provider
+            self.llm.primary.invoke("test")
+        
+        logger.info("RAG service warmed up")
+    
+    @traced("rag.query_with_history")
     async def query_with_history(
         self,
         query: str,
         session_id: str,
         chat_history: List[Dict[str, str]],
         num_chunks: int = 3,
-        document_ids: Optional[List[str]] = None
+        document_ids: Optional[List[str]] = None,
+        mmr_lambda: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Query RAG system with chat history context.
@@ -54,6 +78,7 @@ class RAGService:
             chat_history: Previous chat messages
             num_chunks: Number of chunks to retrieve
             document_ids: Optional filter by document IDs
+            mmr_lambda: MMR relevance/diversity trade-off (None for the configured default)
             
         Returns:
             Dictionary with answer and visual content
@@ -63,26 +88,10 @@ class RAGService:
         """
         try:
             start_time = time.time()
-            logger.info(f"Processing query for session {session_id}: {query[:100]}")
-            
-            # Get vector store
-            vectorstore = self.vectorization_service.get_vector_store(session_id)
-            if not vectorstore:
-                raise ChatError(
-                    "No documents found",
-                    detail="Please upload a document first"
-                )
+            logger.info("Processing query for session %s: %.100s", session_id, query)
             
             # Retrieve relevant chunks
-            retriever = vectorstore.as_retriever(search_kwargs={"k": num_chunks})
-            
-            # Add document filter if specified
-            if document_ids:
-                retriever.search_kwargs["filter"] = {
-                    "document_id": {"$in": document_ids}
-                }
-            
-            chunks = retriever.invoke(query)
+            chunks = await self.retrieve(session_id, query, num_chunks, document_ids, mmr_lambda)
             
             if not chunks:
                 return {
@@ -95,16 +104,17 @@ class RAGService:
             
             # Build context with chat history
             prompt = self._build_prompt_with_history(query, chunks, chat_history)
+            PROMPT_CHARS.observe(len(prompt))
             
             # Generate answer
-            response = self.llm.invoke(prompt)
+            response = await self.llm.ainvoke(prompt)
             answer = response.content if hasattr(response, 'content') else str(response)
             
             # Extract visual content
             visuals = self._extract_visuals(chunks)
             
             processing_time = time.time() - start_time
-            logger.info(f"Query processed in {processing_time:.2f}s")
+            logger.info("Query processed in %.2fs", processing_time)
             
             return {
                 "answer": answer,
@@ -124,9 +134,200 @@ class RAGService:
         except ChatError:
             raise
         except Exception as e:
-            logger.error(f"Query failed: {e}", exc_info=True)
+            logger.error("Query failed: %s", e, exc_info=True)
             raise ChatError("Failed to process query", detail=str(e))
     
+    @traced("rag.retrieve")
+    async def retrieve(
+        self,
+        session_id: str,
+        query: str,
+        num_chunks: int = 3,
+        document_ids: Optional[List[str]] = None,
+        mmr_lambda: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Retrieve the chunks of a session most relevant to a query.
+        
+        Args:
+            session_id: Session identifier
+            query: User query
+            num_chunks: Number of chunks to retrieve
+            document_ids: Optional filter by document IDs
+            mmr_lambda: Select diverse chunks with MMR using this trade-off
+                (None uses MMR_LAMBDA when MMR_ENABLED, else plain similarity)
+            
+        Returns:
+            Retrieved chunks, most relevant first
+            
+        Raises:
+            ChatError: If the session has no vector store
+        """
+        if mmr_lambda is None and settings.MMR_ENABLED:
+            mmr_lambda = settings.MMR_LAMBDA
+        
+        # Retries and re-sends of the same question skip embedding and search
+        cache_key = None
+        if retrieval_cache.enabled:
+            cache_key = retrieval_cache.key(session_id, query, num_chunks, document_ids, mmr_lambda)
+            cached = retrieval_cache.get(cache_key)
+            if cached is not None:
+                set_attribute("cache_hit", True)
+                return cached
+        
+        # Get vector store
+        vectorstore = self.vectorization_service.get_vector_store(session_id)
+        if not vectorstore:
+            raise ChatError(
+                "No documents found",
+                detail="Please upload a document first"
+            )
+        
+        with RETRIEVAL_SECONDS.time():
+            chunks = await self._retrieve(vectorstore, query, num_chunks, document_ids, session_id, mmr_lambda)
+        
+        if cache_key is not None:
+            retrieval_cache.put(cache_key, chunks)
+        return chunks
+    
+    async def _retrieve(
+        self,
+        vectorstore: Any,
+        query: str,
+        num_chunks: int,
+        document_ids: Optional[List[str]] = None,
+        session_id: Optional[str] = None,
+        mmr_lambda: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Retrieve the chunks most similar to a query.
+        
+        The query is embedded through the micro-batcher when enabled, and
+        the vector search runs in the default executor so neither step
+        blocks the event loop. With document routing and a session id, the
+        search is limited to the documents whose summary embeddings are
+        closest to the query. With mmr_lambda, extra candidates are fetched
+        and re-ranked with Maximal Marginal Relevance to drop near-duplicates.
+        
+        Args:
+            vectorstore: Session vector store
+            query: User query
+            num_chunks: Number of chunks to retrieve
+            document_ids: Optional filter by document IDs
+            session_id: Session identifier, enables document routing
+            mmr_lambda: MMR relevance/diversity trade-off (None disables MMR)
+            
+        Returns:
+            Retrieved chunks
+        """
+        with span("retrieval.embed_query", batched=bool(self.query_batcher)):
+            if self.query_batcher:
+                query_embedding = await self.query_batcher.embed_query(query)
+            else:
+                query_embedding = await run_in_executor(
+                    self.vectorization_service.embeddings.embed_query,
+                    query
+                )
+        
+        if self.document_router and session_id:
+            with span("retrieval.route_documents"):
+                document_ids = await run_in_executor(
+                    self.document_router.route,
+                    session_id,
+                    query_embedding,
+                    document_ids
+                )
+                set_attribute("documents", len(document_ids) if document_ids else None)
+        
+        # Add document filter if specified
+        search_filter = {"document_id": {"$in": document_ids}} if document_ids else None
+        
+        if mmr_lambda is not None:
+            with span("retrieval.mmr_search", k=num_chunks, lambda_mult=mmr_lambda):
+                return await run_in_executor(
+                    self._mmr_search,
+                    vectorstore,
+                    query_embedding,
+                    num_chunks,
+                    search_filter,
+                    mmr_lambda
+                )
+        
+        # Table and image vectors share the collection, so over-fetch and fold them into chunks
+        fetch_k = num_chunks * settings.MULTI_VECTOR_FETCH_MULTIPLIER if settings.MULTI_VECTOR_INDEXING else num_chunks
+        
+        with span("retrieval.vector_search", k=num_chunks, fetch_k=fetch_k):
+            hits = await run_in_executor(
+                lambda: vectorstore.similarity_search_by_vector(
+                    query_embedding,
+                    k=fetch_k,
+                    filter=search_filter
+                )
+            )
+            return await run_in_executor(
+                VectorizationService.resolve_parents,
+                vectorstore,
+                hits,
+                num_chunks
+            )
+    
+    def _mmr_search(
+        self,
+        vectorstore: Any,
+        query_embedding: List[float],
+        num_chunks: int,
+        search_filter: Optional[Dict[str, Any]],
+        lambda_mult: float
+    ) -> List[Any]:
+        """
+        Over-fetch candidates with their embeddings and pick diverse ones (blocking).
+        
+        Args:
+            vectorstore: Session vector store
+            query_embedding: Embedded query
+            num_chunks: Number of chunks to return
+            search_filter: Optional Chroma metadata filter
+            lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+            
+        Returns:
+            Selected chunks in selection order
+        """
+        fetch_k = num_chunks * settings.MMR_FETCH_K_MULTIPLIER
+        if settings.MULTI_VECTOR_INDEXING:
+            fetch_k *= settings.MULTI_VECTOR_FETCH_MULTIPLIER
+        
+        # LangChain's Chroma has no public query returning embeddings
+        results = vectorstore._collection.query(
+            query_embeddings=[query_embedding],
+            n_results=fetch_k,
+            where=search_filter,
+            include=["documents", "metadatas", "embeddings"]
+        )
+        
+        embeddings = results["embeddings"][0] if results.get("embeddings") is not None else []
+        if len(embeddings) == 0:
+            return []
+        
+        # Keep the best vector of each chunk so diversity is measured between chunks
+        candidates = []
+        seen = set()
+        for i, metadata in enumerate(results["metadatas"][0]):
+            key = (metadata.get("document_id"), metadata.get("chunk_id"))
+            if key not in seen:
+                seen.add(key)
+                candidates.append(i)
+        
+        selected = mmr_select(query_embedding, [embeddings[i] for i in candidates], num_chunks, lambda_mult)
+        hits = [
+            Document(
+                page_content=results["documents"][0][candidates[i]],
+                metadata=results["metadatas"][0][candidates[i]]
+            )
+            for i in selected
+        ]
+        return VectorizationService.resolve_parents(vectorstore, hits, num_chunks)
+    
+    @traced("rag.build_prompt")
     def _build_prompt_with_history(
         self,
         query: str,
@@ -227,13 +428,25 @@ ANSWER:"""
                         "html": table
                     })
                 
-                # Extract images
+                # Extract images (thumbnails; full images are served on demand)
                 images_base64 = original_data.get("images_base64", [])
                 for j, image in enumerate(images_base64):
-                    images.append({
+                    image_data = {
                         "document_name": chunk.metadata.get("document_name"),
-                        "image_index": j + 1,
-                        "base64": image
-                    })
+                        "image_index": j + 1
+                    }
+                    if isinstance(image, dict):
+                        session_id = chunk.metadata.get("session_id")
+                        image_data.update({
+                            "base64": image["thumbnail_base64"],
+                            "mime_type": image["mime_type"],
+                            "image_id": image["image_id"],
+                            "width": image["width"],
+                            "height": image["height"],
+                            "url": f"/api/documents/images/{session_id}/{image['image_id']}"
+                        })
+                    else:
+                        image_data["base64"] = image
+                    images.append(image_data)
         
         return {"tables": tables, "images": images}
@@ -0,0 +1,245 @@
+"""Session retention sweeper"""
+
+import asyncio
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Document, DocumentStatus, Session as SessionModel
+from app.services.chat_writer import chat_turn_writer
+from app.services.retrieval_cache import retrieval_cache
+from app.services.storage_service import directory_size
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Sessions with a document in one of these states are never swept
+IN_PROGRESS_STATUSES = [
+    DocumentStatus.UPLOADING,
+    DocumentStatus.PROCESSING,
+    DocumentStatus.PARTITIONING,
+    DocumentStatus.CHUNKING,
+    DocumentStatus.SUMMARIZING,
+    DocumentStatus.VECTORIZING,
+]
+
+
+class RetentionService:
+    """Delete sessions idle for longer than SESSION_RETENTION_DAYS"""
+
+    def __init__(
+        self,
+        retention_days: int = settings.SESSION_RETENTION_DAYS,
+        batch_size: int = settings.RETENTION_BATCH_SIZE,
+        batch_pause: float = settings.RETENTION_BATCH_PAUSE
+    ):
+        """
+        Initialize retention service.
+
+        Args:
+            retention_days: Idle days after which a session expires
+            batch_size: Sessions deleted per batch
+            batch_pause: Seconds to yield to request traffic between batches
+        """
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+
+    def cutoff(self) -> datetime:
+        """Sessions last active before this time are expired"""
+        return datetime.utcnow() - timedelta(days=self.retention_days)
+
+    async def sweep(self, dry_run: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Find expired sessions and delete their files, vector stores and rows.
+
+        Work happens in batches on the default executor with a pause in
+        between, so a large backlog never monopolizes the database or disk.
+
+        Args:
+            dry_run: Only report what would be deleted
+            limit: Optional maximum number of sessions to process
+
+        Returns:
+            Report with session, document and message counts and bytes reclaimed
+        """
+        loop = asyncio.get_running_loop()
+        cutoff = self.cutoff()
+        report = {
+            "dry_run": dry_run,
+            "cutoff": cutoff.isoformat(),
+            "sessions": 0,
+            "documents": 0,
+            "messages": 0,
+            "bytes_reclaimed": {"uploads": 0, "vector_stores": 0, "images": 0, "total": 0},
+            "session_ids": []
+        }
+
+        # Keyset over session ids so each batch query stays cheap and dry runs terminate
+        after = ""
+        while limit is None or report["sessions"] < limit:
+            batch_size = self.batch_size if limit is None else min(self.batch_size, limit - report["sessions"])
+            session_ids = await loop.run_in_executor(None, self._find_expired, cutoff, after, batch_size)
+            if not session_ids:
+                break
+            after = session_ids[-1]
+
+            batch = await loop.run_in_executor(None, self._process_batch, session_ids, cutoff, dry_run)
+            self._merge(report, batch)
+
+            if not dry_run:
+                for session_id in batch["session_ids"]:
+                    await chat_turn_writer.discard_session(session_id)
+
+            if len(session_ids) < batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)
+
+        bytes_reclaimed = report["bytes_reclaimed"]
+        bytes_reclaimed["total"] = bytes_reclaimed["uploads"] + bytes_reclaimed["vector_stores"] + bytes_reclaimed["images"]
+
+        logger.info(
+            "Retention sweep%s: %s sessions idle since %s, %s documents, %s messages, %s bytes",
+            " (dry run)" if dry_run else "", report["sessions"], f"{cutoff:%Y-%m-%d}",
+            report["documents"], report["messages"], bytes_reclaimed["total"]
+        )
+        return report
+
+    def _find_expired(self, cutoff: datetime, after: str, limit: int) -> List[str]:
+        """Ids of expired sessions without in-flight documents"""
+        db = SessionLocal()
+        try:
+            busy = db.query(Document.session_id)\
+                .filter(Document.status.in_(IN_PROGRESS_STATUSES))
+            rows = db.query(SessionModel.session_id)\
+                .filter(
+                    SessionModel.last_active < cutoff,
+                    SessionModel.session_id > after,
+                    ~SessionModel.session_id.in_(busy)
+                )\
+                .order_by(SessionModel.session_id)\
+                .limit(limit)\
+                .all()
+            return [row.session_id for row in rows]
+        finally:
+            db.close()
+
+    def _process_batch(self, session_ids: List[str], cutoff: datetime, dry_run: bool) -> Dict[str, Any]:
+        """Measure, and unless dry_run delete, a batch of sessions"""
+        batch = {
+            "sessions": 0,
+            "documents": 0,
+            "messages": 0,
+            "bytes_reclaimed": {"uploads": 0, "vector_stores": 0, "images": 0},
+            "session_ids": []
+        }
+
+        db = SessionLocal()
+        try:
+            for session_id in session_ids:
+                session = db.query(SessionModel).filter(SessionModel.session_id == session_id).first()
+                # Re-check: the session may have been used since it was selected
+                if not session or session.last_active >= cutoff:
+                    continue
+
+                file_paths = [Path(document.file_path) for document in session.documents]
+                vector_dir = settings.CHROMA_PERSIST_DIR / f"session_{session_id}"
+                image_dir = settings.IMAGE_DIR / session_id
+
+                batch["sessions"] += 1
+                batch["documents"] += len(session.documents)
+                batch["messages"] += len(session.messages)
+                batch["session_ids"].append(session_id)
+                batch["bytes_reclaimed"]["uploads"] += sum(path.stat().st_size for path in file_paths if path.exists())
+                batch["bytes_reclaimed"]["vector_stores"] += directory_size(vector_dir)
+                batch["bytes_reclaimed"]["images"] += directory_size(image_dir)
+
+                if dry_run:
+                    continue
+
+                # Rows first: a failure leaves files behind, never rows pointing at missing files
+                db.delete(session)
+                db.commit()
+                retrieval_cache.invalidate(session_id)
+
+                for path in file_paths:
+                    try:
+                        path.unlink(missing_ok=True)
+                    except OSError as e:
+                        logger.warning("Failed to delete upload %s: %s", path, e)
+                shutil.rmtree(vector_dir, ignore_errors=True)
+                shutil.rmtree(image_dir, ignore_errors=True)
+                shutil.rmtree(settings.CHECKPOINT_DIR / session_id, ignore_errors=True)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        return batch
+
+    @staticmethod
+    def _merge(report: Dict[str, Any], batch: Dict[str, Any]) -> None:
+        for key in ("sessions", "documents", "messages"):
+            report[key] += batch[key]
+        for key, value in batch["bytes_reclaimed"].items():
+            report["bytes_reclaimed"][key] += value
+        report["session_ids"].extend(batch["session_ids"])
+
+
+class RetentionSweeper:
+    """Run the retention sweep periodically in the background"""
+
+    def __init__(self, interval_minutes: float = settings.RETENTION_SWEEP_INTERVAL_MINUTES):
+        """
+        Initialize sweeper.
+
+        Args:
+            interval_minutes: Minutes between sweeps
+        """
+        self.interval = interval_minutes * 60
+        self.service = RetentionService()
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start sweeping in the background"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                "Retention sweeper started: sessions idle for %s days, every %.0f minutes",
+                self.service.retention_days, self.interval / 60
+            )
+
+    async def stop(self) -> None:
+        """Stop sweeping, abandoning the current batch between steps"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        # Let startup traffic settle before the first sweep
+        await asyncio.sleep(min(self.interval, 60))
+        while True:
+            try:
+                self.last_report = await self.service.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Retention sweep failed: %s", e, exc_info=True)
+            await asyncio.sleep(self.interval)
+
+
+retention_sweeper = RetentionSweeper()
@@ -0,0 +1,161 @@
+"""In-process cache of retrieval results"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.metrics import RETRIEVAL_CACHE_REQUESTS
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query used in cache keys"""
+    return " ".join(query.casefold().split())
+
+
+class RetrievalCache:
+    """
+    LRU cache of retrieved chunks keyed by session, query, k, document filter and MMR lambda.
+
+    Every key includes the session's generation counter. Bumping the counter
+    when a session's documents change makes all its cached results
+    unreachable at once; they then age out of the LRU order.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.RETRIEVAL_CACHE_SIZE,
+        ttl: float = settings.RETRIEVAL_CACHE_TTL_SECONDS
+    ):
+        """
+        Initialize retrieval cache.
+
+        Args:
+            max_entries: Maximum cached results (0 disables the cache)
+            ttl: Seconds a result stays valid (0 for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[Any]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key(
+        self,
+        session_id: str,
+        query: str,
+        k: int,
+        document_ids: Optional[List[str]] = None,
+        mmr_lambda: Optional[float] = None
+    ) -> Hashable:
+        """
+        Build the cache key for a retrieval.
+
+        Args:
+            session_id: Session identifier
+            query: User query
+            k: Number of chunks retrieved
+            document_ids: Optional document filter
+            mmr_lambda: MMR trade-off, None for plain similarity search
+
+        Returns:
+            Hashable key including the session's current generation
+        """
+        generation = self.generation(session_id)
+        documents = tuple(sorted(set(document_ids))) if document_ids else None
+        return (session_id, generation, normalize_query(query), k, documents, mmr_lambda)
+
+    def generation(self, session_id: str) -> int:
+        """Current generation of a session, bumped by invalidate()"""
+        with self._lock:
+            return self._generations.get(session_id, 0)
+
+    def get(self, key: Hashable) -> Optional[List[Any]]:
+        """
+        Look up cached chunks, counting the hit or miss.
+
+        Args:
+            key: Key from key()
+
+        Returns:
+            Copy of the cached chunk list, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                RETRIEVAL_CACHE_REQUESTS.labels("miss").inc()
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            RETRIEVAL_CACHE_REQUESTS.labels("hit").inc()
+            return list(entry[1])
+
+    def put(self, key: Hashable, chunks: List[Any]) -> None:
+        """
+        Store retrieved chunks.
+
+        Results computed under an older generation are dropped, so a
+        retrieval racing an invalidation cannot repopulate stale data.
+
+        Args:
+            key: Key from key(), taken before retrieving
+            chunks: Retrieved chunks
+        """
+        session_id, generation = key[0], key[1]
+        with self._lock:
+            if self._generations.get(session_id, 0) != generation:
+                return
+
+            self._entries[key] = (time.monotonic(), list(chunks))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: str) -> None:
+        """
+        Invalidate a session's cached results after its documents change.
+
+        Args:
+            session_id: Session identifier
+        """
+        with self._lock:
+            self._generations[session_id] = self._generations.get(session_id, 0) + 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache counters.
+
+        Returns:
+            Hits, misses, hit rate, entries and invalidations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations
+            }
+
+
+retrieval_cache = RetrievalCache()
@@ -0,0 +1,302 @@
+"""Per-session storage accounting"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import ChatMessage, Document, SessionStorage, Session as SessionModel
+from app.utils.logger import get_logger
+from app.utils.error_handlers import QuotaExceededError
+
+logger = get_logger(__name__)
+
+
+STORAGE_KINDS = ("upload", "vector", "image", "visual")
+
+
+def directory_size(path: Path) -> int:
+    """Total size in bytes of the files under a directory"""
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += directory_size(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    except FileNotFoundError:
+        pass
+    return total
+
+
+def visuals_size(visuals: Optional[dict]) -> int:
+    """Stored size of a chat message's visuals JSON"""
+    if not visuals:
+        return 0
+    return len(json.dumps(visuals, separators=(",", ":")).encode("utf-8"))
+
+
+class StorageService:
+    """
+    Track disk usage per session.
+
+    Counters are updated by the code that writes or deletes data, so usage
+    and quota checks are single-row reads rather than directory walks.
+    """
+
+    @staticmethod
+    def add(
+        db: Session,
+        session_id: str,
+        commit: bool = True,
+        **deltas: int
+    ) -> None:
+        """
+        Adjust a session's usage counters.
+
+        Args:
+            db: Database session
+            session_id: Session identifier
+            commit: Commit immediately (False to join the caller's transaction)
+            deltas: Byte deltas per kind, e.g. upload=1024 or visual=-512
+        """
+        deltas = {kind: int(value) for kind, value in deltas.items() if value}
+        if not deltas:
+            return
+
+        unknown = set(deltas) - set(STORAGE_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown storage kinds: {sorted(unknown)}")
+
+        # Increment in SQL so concurrent writers don't lose updates
+        values = {
+            getattr(SessionStorage, f"{kind}_bytes"): getattr(SessionStorage, f"{kind}_bytes") + delta
+            for kind, delta in deltas.items()
+        }
+        values[SessionStorage.total_bytes] = SessionStorage.total_bytes + sum(deltas.values())
+
+        updated = db.query(SessionStorage)\
+            .filter(SessionStorage.session_id == session_id)\
+            .update(values, synchronize_session=False)
+
+        if not updated:
+            db.add(SessionStorage(
+                session_id=session_id,
+                total_bytes=sum(deltas.values()),
+                **{f"{kind}_bytes": delta for kind, delta in deltas.items()}
+            ))
+
+        if commit:
+            db.commit()
+
+    @staticmethod
+    def set_vector_bytes(db: Session, session_id: str, size: int) -> None:
+        """
+        Record the current size of a session's vector store.
+
+        Args:
+            db: Database session
+            session_id: Session identifier
+            size: Size of the session's Chroma directory in bytes
+        """
+        updated = db.query(SessionStorage)\
+            .filter(SessionStorage.session_id == session_id)\
+            .update(
+                {
+                    SessionStorage.vector_bytes: size,
+                    SessionStorage.total_bytes: SessionStorage.total_bytes - SessionStorage.vector_bytes + size
+                },
+                synchronize_session=False
+            )
+
+        if not updated:
+            db.add(SessionStorage(session_id=session_id, vector_bytes=size, total_bytes=size))
+
+        db.commit()
+
+    @staticmethod
+    def measure_vector_store(session_id: str) -> int:
+        """Size of one session's Chroma directory, measured after it changes"""
+        return directory_size(settings.CHROMA_PERSIST_DIR / f"session_{session_id}")
+
+    @staticmethod
+    def reset_visuals(db: Session, session_id: str) -> None:
+        """Zero the visuals counter after a session's chat history is cleared"""
+        db.query(SessionStorage)\
+            .filter(SessionStorage.session_id == session_id)\
+            .update(
+                {
+                    SessionStorage.total_bytes: SessionStorage.total_bytes - SessionStorage.visual_bytes,
+                    SessionStorage.visual_bytes: 0
+                },
+                synchronize_session=False
+            )
+        db.commit()
+
+    @staticmethod
+    def get_usage(db: Session, session_id: str) -> int:
+        """Total bytes used by a session"""
+        total = db.query(SessionStorage.total_bytes)\
+            .filter(SessionStorage.session_id == session_id)\
+            .scalar()
+        return total or 0
+
+    @staticmethod
+    def get_global_usage(db: Session) -> int:
+        """Total bytes used by all sessions"""
+        return db.query(func.coalesce(func.sum(SessionStorage.total_bytes), 0)).scalar()
+
+    @staticmethod
+    def check_global_quota(db: Session, incoming_bytes: int = 0) -> None:
+        """
+        Ensure storing incoming_bytes more keeps total usage within the server quota.
+
+        This is a soft limit: it is checked before the data is counted,
+        so concurrent uploads may overshoot it by at most their combined size.
+
+        Args:
+            db: Database session
+            incoming_bytes: Size of the data about to be stored
+
+        Raises:
+            QuotaExceededError: If the global quota would be exceeded
+        """
+        if not settings.GLOBAL_STORAGE_QUOTA_BYTES:
+            return
+
+        usage = StorageService.get_global_usage(db)
+        if usage + incoming_bytes > settings.GLOBAL_STORAGE_QUOTA_BYTES:
+            raise QuotaExceededError(
+                "Server storage quota exceeded",
+                detail="The server is out of document storage, please try again later",
+                scope="global"
+            )
+
+    @staticmethod
+    def reserve_upload(db: Session, session_id: str, size: int) -> None:
+        """
+        Count an upload against the session quota, atomically.
+
+        The quota check and the increment are a single conditional UPDATE,
+        so concurrent uploads to one session cannot both fit into the space
+        left for one. Joins the caller's transaction; nothing is committed.
+
+        Args:
+            db: Database session
+            session_id: Session identifier
+            size: Upload size in bytes
+
+        Raises:
+            QuotaExceededError: If the upload does not fit the session quota
+        """
+        quota = settings.SESSION_STORAGE_QUOTA_BYTES
+        values = {
+            SessionStorage.upload_bytes: SessionStorage.upload_bytes + size,
+            SessionStorage.total_bytes: SessionStorage.total_bytes + size
+        }
+
+        for _ in range(2):
+            query = db.query(SessionStorage).filter(SessionStorage.session_id == session_id)
+            if quota:
+                query = query.filter(SessionStorage.total_bytes + size <= quota)
+            if query.update(values, synchronize_session=False):
+                return
+
+            usage = db.query(SessionStorage.total_bytes)\
+                .filter(SessionStorage.session_id == session_id)\
+                .scalar()
+            if usage is not None or (quota and size > quota):
+                break
+
+            # First data of the session; a concurrent upload may insert the row first
+            try:
+                with db.begin_nested():
+                    db.add(SessionStorage(session_id=session_id, upload_bytes=size, total_bytes=size))
+                return
+            except IntegrityError:
+                continue
+
+        raise QuotaExceededError(
+            "Session storage quota exceeded",
+            detail=f"Session uses {usage or 0} of {quota} bytes; {size} more bytes do not fit",
+            scope="session"
+        )
+
+    @staticmethod
+    def top_consumers(db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Sessions using the most storage.
+
+        Args:
+            db: Database session
+            limit: Maximum number of sessions
+
+        Returns:
+            Usage breakdown per session, largest first
+        """
+        rows = db.query(SessionStorage, SessionModel.last_active)\
+            .join(SessionModel, SessionModel.session_id == SessionStorage.session_id)\
+            .order_by(SessionStorage.total_bytes.desc())\
+            .limit(limit)\
+            .all()
+
+        return [
+            {
+                "session_id": storage.session_id,
+                "total_bytes": storage.total_bytes,
+                "upload_bytes": storage.upload_bytes,
+                "vector_bytes": storage.vector_bytes,
+                "image_bytes": storage.image_bytes,
+                "visual_bytes": storage.visual_bytes,
+                "last_active": last_active
+            }
+            for storage, last_active in rows
+        ]
+
+    @staticmethod
+    def reconcile(db: Session) -> Dict[str, int]:
+        """
+        Rebuild every session's counters from disk and the database.
+
+        Only needed once for sessions created before accounting existed, or
+        after files were changed outside the application; it walks each
+        session's directories.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of sessions reconciled and the new global total
+        """
+        upload_bytes = dict(
+            db.query(Document.session_id, func.coalesce(func.sum(Document.file_size), 0))
+            .group_by(Document.session_id)
+            .all()
+        )
+
+        sessions = 0
+        for (session_id,) in db.query(SessionModel.session_id).all():
+            visual_bytes = sum(
+                visuals_size(visuals)
+                for (visuals,) in db.query(ChatMessage.visuals).filter(ChatMessage.session_id == session_id)
+            )
+            usage = {
+                "upload_bytes": int(upload_bytes.get(session_id, 0)),
+                "vector_bytes": StorageService.measure_vector_store(session_id),
+                "image_bytes": directory_size(settings.IMAGE_DIR / session_id),
+                "visual_bytes": visual_bytes
+            }
+            usage["total_bytes"] = sum(usage.values())
+            db.merge(SessionStorage(session_id=session_id, **usage))
+            sessions += 1
+
+        db.commit()
+        total = StorageService.get_global_usage(db)
+        logger.info("Reconciled storage for %s sessions: %s bytes", sessions, total)
+        return {"sessions": sessions, "total_bytes": total}
@@ -0,0 +1,231 @@
+"""Chunk summarization service"""
+
+import asyncio
+import hashlib
+import weakref
+from typing import List, Dict, Any, NamedTuple, Optional
+
+from langchain_groq import ChatGroq
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import ChunkSummary
+from app.utils.logger import get_logger
+from app.utils.progress_tracker import ProgressTracker
+from app.utils.rate_limiter import TokenBucket
+from app.utils.tracing import traced
+
+logger = get_logger(__name__)
+
+
+# Bump when the prompt changes so cached summaries are regenerated
+PROMPT_VERSION = "1"
+
+
+class _SharedClient(NamedTuple):
+    """Groq client and limits shared by every document being summarized"""
+    llm: Any
+    semaphore: asyncio.Semaphore
+    rate_limiter: TokenBucket
+
+
+# One per event loop, i.e. one per process in the server
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _SharedClient]" = weakref.WeakKeyDictionary()
+
+
+def _shared_client() -> _SharedClient:
+    """
+    Get the client and limits shared across documents.
+
+    SUMMARY_CONCURRENCY and SUMMARY_REQUESTS_PER_MINUTE bound the process
+    as a whole, however many documents are summarized at once.
+    """
+    loop = asyncio.get_running_loop()
+    shared = _shared_clients.get(loop)
+    if shared is None:
+        shared = _SharedClient(
+            llm=ChatGroq(
+                model=settings.SUMMARY_LLM_MODEL,
+                api_key=settings.GROQ_API_KEY,
+                base_url=settings.GROQ_BASE_URL,
+                temperature=0.0,
+                max_retries=0  # Timeouts and failures fall back to raw text
+            ),
+            semaphore=asyncio.Semaphore(settings.SUMMARY_CONCURRENCY),
+            rate_limiter=TokenBucket(
+                rate=settings.SUMMARY_REQUESTS_PER_MINUTE / 60,
+                capacity=settings.SUMMARY_CONCURRENCY
+            )
+        )
+        _shared_clients[loop] = shared
+    return shared
+
+
+class SummarizationService:
+    """Service for creating searchable AI summaries of chunks"""
+
+    def __init__(self, llm: Optional[Any] = None):
+        """
+        Initialize summarization service.
+
+        The Groq client, concurrency limit and rate limit are shared
+        by all instances; an injected llm still goes through the limits.
+
+        Args:
+            llm: Optional chat model (defaults to the shared ChatGroq with SUMMARY_LLM_MODEL)
+        """
+        self.model_name = settings.SUMMARY_LLM_MODEL
+        self._llm = llm
+
+    @traced("ingest.summarize")
+    async def summarize_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        progress_tracker: Optional[ProgressTracker] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Add an AI-enhanced summary to each chunk.
+
+        Cached summaries are reused; the rest are generated concurrently
+        under the rate limit. A chunk whose summary times out or fails
+        keeps its raw text (no "summary" key) and is not cached.
+
+        Args:
+            chunks: Chunks from ChunkingService
+            progress_tracker: Optional progress tracker
+
+        Returns:
+            The same chunks, with "summary" set where one was produced
+        """
+        total_chunks = len(chunks)
+        logger.info("Starting summarization of %s chunks", total_chunks)
+
+        if progress_tracker:
+            await progress_tracker.start_stage(
+                "summarization",
+                f"Summarizing {total_chunks} chunks"
+            )
+
+        loop = asyncio.get_running_loop()
+        cache_keys = [self._cache_key(chunk) for chunk in chunks]
+        cached = await loop.run_in_executor(None, self._load_cached, cache_keys)
+
+        done = 0
+        stats = {"cached": 0, "generated": 0, "fallback": 0}
+
+        async def summarize(chunk: Dict[str, Any], cache_key: str) -> None:
+            nonlocal done
+
+            if cache_key in cached:
+                chunk["summary"] = cached[cache_key]
+                stats["cached"] += 1
+            else:
+                summary = await self._generate(chunk)
+                if summary:
+                    chunk["summary"] = summary
+                    stats["generated"] += 1
+                    await loop.run_in_executor(None, self._store_cached, cache_key, summary)
+                else:
+                    stats["fallback"] += 1
+
+            done += 1
+            if progress_tracker:
+                await progress_tracker.update(
+                    "summarization",
+                    int(10 + done / total_chunks * 80),
+                    {"message": f"Summarized {done} of {total_chunks} chunks..."}
+                )
+
+        await asyncio.gather(*(summarize(chunk, key) for chunk, key in zip(chunks, cache_keys)))
+
+        logger.info(
+            "Summarization complete: %s generated, %s cached, %s fell back to raw text",
+            stats['generated'], stats['cached'], stats['fallback']
+        )
+
+        if progress_tracker:
+            await progress_tracker.complete_stage(
+                "summarization",
+                {"message": f"Summarized {total_chunks - stats['fallback']} of {total_chunks} chunks"}
+            )
+
+        return chunks
+
+    async def _generate(self, chunk: Dict[str, Any]) -> Optional[str]:
+        """Generate a summary, returning None on timeout or failure"""
+        shared = _shared_client()
+        async with shared.semaphore:
+            await shared.rate_limiter.acquire()
+            try:
+                response = await asyncio.wait_for(
+                    (self._llm or shared.llm).ainvoke(self._build_prompt(chunk)),
+                    timeout=settings.SUMMARY_TIMEOUT
+                )
+                summary = response.content if hasattr(response, 'content') else str(response)
+                return summary.strip() or None
+            except asyncio.TimeoutError:
+                logger.warning("Summary of chunk %s timed out, using raw text", chunk['chunk_id'])
+            except Exception as e:
+                logger.warning("Summary of chunk %s failed, using raw text: %s", chunk['chunk_id'], e)
+            return None
+
+    def _build_prompt(self, chunk: Dict[str, Any]) -> str:
+        """Build the summarization prompt for a chunk"""
+        prompt = f"""Create a detailed, searchable summary of this document content.
+
+TEXT CONTENT:
+{chunk["text"]}
+
+"""
+
+        if chunk["tables"]:
+            prompt += "\nTABLES:\n"
+            for i, table in enumerate(chunk["tables"], 1):
+                prompt += f"\nTable {i}:\n{table}\n"
+
+        if chunk["images"]:
+            prompt += f"\n[This section also contains {len(chunk['images'])} image(s)]\n"
+
+        prompt += """
+
+Generate a comprehensive summary that:
+1. Extracts key facts, numbers, and data points
+2. Identifies main topics and concepts
+3. Lists questions this content could answer
+4. Describes visual elements (charts, diagrams, patterns)
+5. Suggests alternative search terms
+
+Keep it detailed and searchable."""
+
+        return prompt
+
+    def _cache_key(self, chunk: Dict[str, Any]) -> str:
+        """Hash of everything that determines a chunk's summary"""
+        hasher = hashlib.sha256()
+        for part in [self.model_name, PROMPT_VERSION, chunk["text"], *chunk["tables"], str(len(chunk["images"]))]:
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def _load_cached(self, cache_keys: List[str]) -> Dict[str, str]:
+        """Look up cached summaries in one query"""
+        db = SessionLocal()
+        try:
+            rows = db.query(ChunkSummary.cache_key, ChunkSummary.summary)\
+                .filter(ChunkSummary.cache_key.in_(set(cache_keys)))\
+                .all()
+            return {row.cache_key: row.summary for row in rows}
+        finally:
+            db.close()
+
+    def _store_cached(self, cache_key: str, summary: str) -> None:
+        """Persist a generated summary"""
+        db = SessionLocal()
+        try:
+            db.merge(ChunkSummary(cache_key=cache_key, model=self.model_name, summary=summary))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Failed to cache chunk summary: %s", e)
+        finally:
+            db.close()
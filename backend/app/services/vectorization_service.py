@@ -1,16 +1,28 @@
 """Vectorization service"""
 
 import json
-from typing import List, Dict, Any, Optional
+import time
+import weakref
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Tuple
 
 from langchain_core.documents import Document
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 
 from app.config import settings
-from app.utils.logger import logger
+from app.services.embeddings import TimedEmbeddings, get_embeddings
+from app.utils.logger import get_logger
 from app.utils.error_handlers import VectorizationError
+from app.utils.metrics import INGESTION_STAGE_SECONDS, VECTOR_STORE_HANDLES
 from app.utils.progress_tracker import ProgressTracker
+from app.utils.table_text import linearize_table
+from app.utils.tracing import traced
+
+logger = get_logger(__name__)
+
+
+# Vector store handles still referenced somewhere in the process
+_open_vector_stores: "weakref.WeakSet[Chroma]" = weakref.WeakSet()
+VECTOR_STORE_HANDLES.set_function(lambda: len(_open_vector_stores))
 
 
 class VectorizationService:
@@ -18,43 +30,56 @@ class VectorizationService:
     
     def __init__(self):
         """Initialize vectorization service"""
-        self.embeddings = None
-        self._initialize_embeddings()
+        self._embeddings = None
+    
+    @property
+    def embeddings(self):
+        """Embedding model, loaded on first use and shared across instances"""
+        if self._embeddings is None:
+            self._initialize_embeddings()
+        return self._embeddings
     
     def _initialize_embeddings(self) -> None:
         """Initialize embedding model"""
         try:
-            logger.info(f"Initializing embeddings model: {settings.EMBEDDING_MODEL}")
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name=settings.EMBEDDING_MODEL,
-                model_kwargs={'device': 'cpu'},
-                encode_kwargs={
-                    'normalize_embeddings': True,
-                    'batch_size': 32  # Process in batches for better performance
-                }
+            logger.info(
+                "Initializing embeddings model: %s (backend: %s)",
+                settings.EMBEDDING_MODEL, settings.EMBEDDING_BACKEND
             )
+            self._embeddings = get_embeddings()
             logger.info("Embeddings model initialized successfully")
+        except VectorizationError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to initialize embeddings: {e}")
+            logger.error("Failed to initialize embeddings: %s", e)
             raise VectorizationError("Failed to initialize embeddings", detail=str(e))
     
+    @traced("ingest.vectorize")
     async def create_vector_store(
         self,
         chunks: List[Dict[str, Any]],
         session_id: str,
         document_id: str,
         document_name: str,
-        progress_tracker: Optional[ProgressTracker] = None
+        progress_tracker: Optional[ProgressTracker] = None,
+        start_offset: int = 0,
+        on_batch_stored: Optional[Callable[[int], Awaitable[None]]] = None
     ) -> str:
         """
         Create vector store from chunks.
         
+        Vector ids are deterministic and Chroma upserts by id, so storing
+        a batch again after an interruption replaces it rather than
+        duplicating it.
+        
         Args:
             chunks: List of processed chunks
             session_id: Session identifier
             document_id: Document identifier
             document_name: Document filename
             progress_tracker: Optional progress tracker
+            start_offset: Number of vectors already stored by an interrupted run
+            on_batch_stored: Awaited with the number of vectors stored after each batch
             
         Returns:
             Collection name
@@ -63,7 +88,10 @@ class VectorizationService:
             VectorizationError: If vectorization fails
         """
         try:
-            logger.info(f"Creating vector store for session {session_id}, document {document_id}")
+            started = time.perf_counter()
+            # Separates embedding time from Chroma write time in metrics
+            timed_embeddings = TimedEmbeddings(self.embeddings)
+            logger.info("Creating vector store for session %s, document %s", session_id, document_id)
             
             if progress_tracker:
                 await progress_tracker.start_stage(
@@ -71,13 +99,14 @@ class VectorizationService:
                     f"Creating vector store with {len(chunks)} chunks"
                 )
             
-            # Create LangChain documents
+            # Create LangChain documents; ids link table and image vectors to their chunk
             documents = []
+            ids = []
             total_chunks = len(chunks)
             
             for i, chunk in enumerate(chunks):
-                # Create enhanced content for embedding
-                enhanced_content = chunk["text"]
+                # Create enhanced content for embedding (AI summary when available)
+                enhanced_content = chunk.get("summary") or chunk["text"]
                 
                 # Add table information
                 if chunk["tables"]:
@@ -87,22 +116,35 @@ class VectorizationService:
                 if chunk["images"]:
                     enhanced_content += f"\n[Contains {len(chunk['images'])} image(s)]"
                 
+                base_metadata = {
+                    "session_id": session_id,
+                    "document_id": document_id,
+                    "document_name": document_name,
+                    "chunk_id": chunk["chunk_id"]
+                }
+                parent_id = f"{document_id}:{chunk['chunk_id']}"
+                
                 # Create document with rich metadata
                 doc = Document(
                     page_content=enhanced_content,
                     metadata={
-                        "session_id": session_id,
-                        "document_id": document_id,
-                        "document_name": document_name,
-                        "chunk_id": chunk["chunk_id"],
+                        **base_metadata,
+                        "vector_kind": "chunk",
                         "original_content": json.dumps({
                             "raw_text": chunk["text"],
                             "tables_html": chunk["tables"],
+                            # Image references with thumbnails, or raw base64 if not normalized
                             "images_base64": chunk["images"]
                         })
                     }
                 )
                 documents.append(doc)
+                ids.append(parent_id)
+                
+                if settings.MULTI_VECTOR_INDEXING:
+                    for child_id, child in self._child_documents(chunk, parent_id, base_metadata):
+                        documents.append(child)
+                        ids.append(child_id)
                 
                 # Update progress more frequently (10% to 50% range for document creation)
                 if progress_tracker:
@@ -133,7 +175,7 @@ class VectorizationService:
             
             # Process in batches for better performance
             batch_size = 50  # Process 50 documents at a time
-            if len(documents) <= batch_size:
+            if len(documents) <= batch_size and start_offset == 0:
                 # Small batch - process all at once
                 if progress_tracker:
                     await progress_tracker.update(
@@ -144,7 +186,8 @@ class VectorizationService:
                 
                 vectorstore = Chroma.from_documents(
                     documents=documents,
-                    embedding=self.embeddings,
+                    ids=ids,
+                    embedding=timed_embeddings,
                     persist_directory=persist_directory,
                     collection_name=collection_name,
                     collection_metadata={"hnsw:space": "cosine"}
@@ -156,13 +199,23 @@ class VectorizationService:
                         90,
                         {"message": "Storing vectors..."}
                     )
+                
+                if on_batch_stored:
+                    await on_batch_stored(len(documents))
             else:
                 # Large batch - process incrementally
                 vectorstore = None
                 total_batches = (len(documents) + batch_size - 1) // batch_size
                 
+                if start_offset:
+                    logger.info("Resuming vectorization of document %s at vector %s", document_id, start_offset)
+                
                 for batch_idx, i in enumerate(range(0, len(documents), batch_size)):
+                    if i + batch_size <= start_offset:
+                        continue
+                    
                     batch = documents[i:i + batch_size]
+                    batch_ids = ids[i:i + batch_size]
                     
                     # Update progress (50% to 90% range for batch processing)
                     if progress_tracker:
@@ -176,13 +229,17 @@ class VectorizationService:
                     if vectorstore is None:
                         vectorstore = Chroma.from_documents(
                             documents=batch,
-                            embedding=self.embeddings,
+                            ids=batch_ids,
+                            embedding=timed_embeddings,
                             persist_directory=persist_directory,
                             collection_name=collection_name,
                             collection_metadata={"hnsw:space": "cosine"}
                         )
                     else:
-                        vectorstore.add_documents(batch)
+                        vectorstore.add_documents(batch, ids=batch_ids)
+                    
+                    if on_batch_stored:
+                        await on_batch_stored(min(i + batch_size, len(documents)))
                     
                     # Update progress
                     if progress_tracker:
@@ -192,10 +249,24 @@ class VectorizationService:
                             progress,
                             {"vectors_stored": min(i + batch_size, len(documents)), "total_chunks": len(documents)}
                         )
+                
+                # Every batch was stored before the interruption
+                if vectorstore is None:
+                    vectorstore = Chroma(
+                        collection_name=collection_name,
+                        embedding_function=timed_embeddings,
+                        persist_directory=persist_directory,
+                        collection_metadata={"hnsw:space": "cosine"}
+                    )
+            
+            _open_vector_stores.add(vectorstore)
+            
+            total_seconds = time.perf_counter() - started
+            INGESTION_STAGE_SECONDS.labels("embed").observe(timed_embeddings.seconds)
+            INGESTION_STAGE_SECONDS.labels("store").observe(max(0.0, total_seconds - timed_embeddings.seconds))
             
             logger.info(
-                f"Vector store created successfully: {collection_name}, "
-                f"{len(documents)} vectors"
+                "Vector store created successfully: %s, %s vectors", collection_name, len(documents)
             )
             
             if progress_tracker:
@@ -212,7 +283,7 @@ class VectorizationService:
             return collection_name
             
         except Exception as e:
-            logger.error(f"Vectorization failed: {e}", exc_info=True)
+            logger.error("Vectorization failed: %s", e, exc_info=True)
             if progress_tracker:
                 await progress_tracker.error("vectorization", str(e))
             raise VectorizationError(
@@ -220,6 +291,102 @@ class VectorizationService:
                 detail=str(e)
             )
     
+    def _child_documents(
+        self,
+        chunk: Dict[str, Any],
+        parent_id: str,
+        metadata: Dict[str, Any]
+    ) -> List[Tuple[str, Document]]:
+        """
+        Build the extra vectors of a chunk: one per table and per described image.
+        
+        Children carry only the parent's identifiers; retrieval maps them
+        back to the parent chunk, which holds the original content.
+        
+        Args:
+            chunk: Processed chunk
+            parent_id: Vector id of the chunk
+            metadata: Identifying metadata shared with the parent
+            
+        Returns:
+            (vector id, document) pairs
+        """
+        children = []
+        
+        for i, table in enumerate(chunk["tables"]):
+            table_text = linearize_table(table or "")
+            if table_text:
+                children.append((
+                    f"{parent_id}:table:{i}",
+                    Document(
+                        page_content=table_text,
+                        metadata={**metadata, "vector_kind": "table", "parent_id": parent_id}
+                    )
+                ))
+        
+        # Images without OCR text or a caption have nothing to embed
+        for i, image_text in enumerate(chunk.get("image_texts", [])):
+            if image_text and image_text.strip():
+                children.append((
+                    f"{parent_id}:image:{i}",
+                    Document(
+                        page_content=image_text,
+                        metadata={**metadata, "vector_kind": "image", "parent_id": parent_id}
+                    )
+                ))
+        
+        return children
+    
+    @staticmethod
+    def resolve_parents(vectorstore: Chroma, documents: List[Document], limit: int) -> List[Document]:
+        """
+        De-duplicate search hits to their parent chunks (blocking).
+        
+        Hits keep their order; a chunk found through several of its vectors
+        appears once, and table or image hits are replaced by the chunk
+        they belong to.
+        
+        Args:
+            vectorstore: Vector store the hits came from
+            documents: Search hits, best first
+            limit: Maximum number of chunks to return
+            
+        Returns:
+            Parent chunks, best first
+        """
+        selected = []
+        seen = set()
+        for doc in documents:
+            key = (doc.metadata.get("document_id"), doc.metadata.get("chunk_id"))
+            if key in seen:
+                continue
+            seen.add(key)
+            selected.append(doc)
+            if len(selected) == limit:
+                break
+        
+        parent_ids = [doc.metadata["parent_id"] for doc in selected if doc.metadata.get("parent_id")]
+        if not parent_ids:
+            return selected
+        
+        stored = vectorstore.get(ids=parent_ids, include=["documents", "metadatas"])
+        parents = {
+            vector_id: Document(page_content=text, metadata=metadata)
+            for vector_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        }
+        
+        resolved = []
+        for doc in selected:
+            parent_id = doc.metadata.get("parent_id")
+            if not parent_id:
+                resolved.append(doc)
+            elif parent_id in parents:
+                resolved.append(parents[parent_id])
+            else:
+                logger.warning("Parent chunk %s not found, dropping its table/image hit", parent_id)
+        return resolved
+    
+    @traced("vectorstore.get")
     def get_vector_store(self, session_id: str) -> Optional[Chroma]:
         """
         Get existing vector store for a session.
@@ -239,11 +406,12 @@ class VectorizationService:
                 embedding_function=self.embeddings,
                 collection_name=collection_name
             )
+            _open_vector_stores.add(vectorstore)
             
             return vectorstore
             
         except Exception as e:
-            logger.error(f"Failed to load vector store: {e}")
+            logger.error("Failed to load vector store: %s", e)
             return None
     
     def delete_vector_store(self, session_id: str) -> bool:
@@ -263,11 +431,11 @@ class VectorizationService:
             if persist_directory.exists():
                 import shutil
                 shutil.rmtree(persist_directory)
-                logger.info(f"Deleted vector store: {collection_name}")
+                logger.info("Deleted vector store: %s", collection_name)
                 return True
             
             return False
             
         except Exception as e:
-            logger.error(f"Failed to delete vector store: {e}")
+            logger.error("Failed to delete vector store: %s", e)
             return False
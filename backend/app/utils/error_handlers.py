@@ -43,6 +43,14 @@ class FileValidationError(RAGException):
     pass
 
 
+class QuotaExceededError(RAGException):
+    """Exception raised when a storage quota would be exceeded"""
+    
+    def __init__(self, message: str, detail: Optional[str] = None, scope: str = "session"):
+        super().__init__(message, detail)
+        self.scope = scope
+
+
 def raise_http_exception(
     status_code: int,
     message: str,
@@ -1,9 +1,17 @@
 """Logging configuration"""
 
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Optional, Tuple
 
 from app.config import settings
 
@@ -12,52 +20,219 @@ from app.config import settings
 LOGS_DIR = Path("./logs")
 LOGS_DIR.mkdir(exist_ok=True)
 
+ROOT_LOGGER_NAME = "rag_app"
 
-def setup_logger(name: str) -> logging.Logger:
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.utcfromtimestamp(record.created).isoformat(timespec="milliseconds") + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "func": record.funcName,
+            "line": record.lineno,
+        }
+
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
     """
-    Setup logger with console and file handlers.
-    
-    Args:
-        name: Logger name
-        
-    Returns:
-        Configured logger instance
+    Limit how often a single call site may log at INFO or below.
+
+    Each source line gets `per_second` records per one-second window;
+    the rest are dropped and counted, and the next record that gets
+    through carries the count as `suppressed`. Warnings and errors are
+    never dropped.
     """
-    logger = logging.getLogger(name)
-    
-    # Set level based on debug mode
-    level = logging.DEBUG if settings.DEBUG else logging.INFO
-    logger.setLevel(level)
-    
-    # Avoid duplicate handlers
-    if logger.handlers:
-        return logger
-    
-    # Create formatters
+
+    def __init__(self, per_second: float):
+        super().__init__()
+        self.per_second = per_second
+        self._windows: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or self.per_second <= 0:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 1.0:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+
+            if window[1] < self.per_second:
+                window[1] += 1
+                return True
+
+            window[2] += 1
+            return False
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that defers formatting to the writer thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the message and exception text, keep structured extras intact
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def stop_logging() -> None:
+    """
+    Write every queued record and stop the writer thread.
+
+    Registered with atexit; processes that leave through os._exit (e.g.
+    forked workers) must call it themselves or lose queued records.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    """
+    Give a forked worker its own writer thread.
+
+    Threads do not survive fork, so without this records enqueued by a
+    preforked worker (see app.serve) would never be written.
+    """
+    global _listener
+    if _listener is not None:
+        _listener = logging.handlers.QueueListener(
+            _listener.queue,
+            *_listener.handlers,
+            respect_handler_level=_listener.respect_handler_level
+        )
+        _listener.start()
+
+
+def _build_handlers(level: int) -> list:
+    """Console and file handlers run by the background writer thread"""
     detailed_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
+
     simple_formatter = logging.Formatter(
         '%(levelname)s - %(message)s'
     )
-    
+
+    json_output = settings.LOG_FORMAT.lower() == "json"
+
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
-    console_handler.setFormatter(simple_formatter if not settings.DEBUG else detailed_formatter)
-    logger.addHandler(console_handler)
-    
+    if json_output:
+        console_handler.setFormatter(JsonFormatter())
+    else:
+        console_handler.setFormatter(simple_formatter if not settings.DEBUG else detailed_formatter)
+
     # File handler
     log_file = LOGS_DIR / f"app_{datetime.now().strftime('%Y%m%d')}.log"
     file_handler = logging.FileHandler(log_file, encoding='utf-8')
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(detailed_formatter)
-    logger.addHandler(file_handler)
-    
+    file_handler.setFormatter(JsonFormatter() if json_output else detailed_formatter)
+
+    return [console_handler, file_handler]
+
+
+def setup_logger(name: str) -> logging.Logger:
+    """
+    Setup logger with a queue handler feeding a background writer thread.
+
+    Callers only enqueue records; console and file output (plain text or
+    JSON, per LOG_FORMAT) happens on the writer thread, so logging never
+    blocks the event loop on I/O.
+
+    Args:
+        name: Logger name
+
+    Returns:
+        Configured logger instance
+    """
+    global _listener
+
+    logger = logging.getLogger(name)
+
+    # Set level based on debug mode
+    level = logging.DEBUG if settings.DEBUG else logging.getLevelName(settings.LOG_LEVEL.upper())
+    logger.setLevel(level)
+    logger.propagate = False
+
+    # Avoid duplicate handlers
+    if logger.handlers:
+        return logger
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _LazyQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMIT_PER_SECOND))
+    logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue,
+        *_build_handlers(level),
+        respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+
+    # Per-module overrides, e.g. {"rag_app.api.websocket": "WARNING"}
+    for module_name, module_level in settings.LOG_LEVELS.items():
+        logging.getLogger(module_name).setLevel(module_level.upper())
+
     return logger
 
 
+def get_logger(module_name: str) -> logging.Logger:
+    """
+    Get a child of the application logger for a module.
+
+    Records go through the application logger's queue handler; the child's
+    level can be tuned independently with LOG_LEVELS.
+
+    Args:
+        module_name: Module name, usually __name__ (e.g. "app.api.websocket")
+
+    Returns:
+        Logger named "rag_app.api.websocket" for "app.api.websocket"
+    """
+    suffix = module_name[len("app."):] if module_name.startswith("app.") else module_name
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{suffix}")
+
+
 # Create default logger
-logger = setup_logger("rag_app")
+logger = setup_logger(ROOT_LOGGER_NAME)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
@@ -0,0 +1,295 @@
+"""Prometheus-style metrics"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds, from sub-millisecond lookups to multi-minute ingestion
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+
+SIZE_BUCKETS = (
+    64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a label set as {a="x",b="y"}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for a metric family with optional labels"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+        # Children render with their parent's label names
+        self._parent_labelnames = self.labelnames
+
+    def labels(self, *values: str) -> "_Metric":
+        """
+        Get the child metric for a label combination.
+
+        Args:
+            values: Label values, in labelnames order
+
+        Returns:
+            Child metric (cached, so hot paths can hold on to it)
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    child._parent_labelnames = self.labelnames
+                    self._children[key] = child
+        return child
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def _series(self) -> List[Tuple[Tuple[str, ...], "_Metric"]]:
+        if self.labelnames:
+            return sorted(self._children.items())
+        return [((), self)]
+
+    def _samples(self, label_values: Tuple[str, ...]) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render the family in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}"
+        ]
+        for label_values, child in self._series():
+            lines.extend(child._samples(label_values))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def _samples(self, label_values: Tuple[str, ...]) -> List[str]:
+        labels = _format_labels(self._parent_labelnames, label_values)
+        return [f"{self.name}_total{labels} {_format_value(self._value)}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or is read from a callback at scrape time"""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        function: Optional[Callable[[], float]] = None
+    ):
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._function = function
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from a callback at scrape time"""
+        self._function = function
+
+    def _samples(self, label_values: Tuple[str, ...]) -> List[str]:
+        value = self._value
+        if self._function is not None:
+            try:
+                value = self._function()
+            except Exception:
+                value = float("nan")
+        return [f"{self.name} {_format_value(value) if value == value else 'NaN'}"]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed bucket bounds"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record one observation (a bisect and two additions under a lock)"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of a block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def _samples(self, label_values: Tuple[str, ...]) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(self._parent_labelnames, label_values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+        labels = _format_labels(self._parent_labelnames, label_values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Ingestion
+INGESTION_STAGE_SECONDS = registry.register(Histogram(
+    "rag_ingestion_stage_seconds",
+    "Duration of document ingestion stages",
+    ["stage"]
+))
+INGESTION_IN_PROGRESS = registry.register(Gauge(
+    "rag_ingestion_in_progress",
+    "Documents queued or being processed"
+))
+INGESTION_DOCUMENTS = registry.register(Counter(
+    "rag_ingestion_documents",
+    "Documents processed by final status",
+    ["status"]
+))
+
+# Query path
+RETRIEVAL_SECONDS = registry.register(Histogram(
+    "rag_retrieval_seconds",
+    "Query embedding plus vector search latency"
+))
+RETRIEVAL_CACHE_REQUESTS = registry.register(Counter(
+    "rag_retrieval_cache_requests",
+    "Retrieval cache lookups by result",
+    ["result"]
+))
+LLM_SECONDS = registry.register(Histogram(
+    "rag_llm_seconds",
+    "LLM request latency including retries",
+    ["model"]
+))
+LLM_TOKENS = registry.register(Counter(
+    "rag_llm_tokens",
+    "LLM tokens used",
+    ["kind"]
+))
+PROMPT_CHARS = registry.register(Histogram(
+    "rag_prompt_chars",
+    "Size of prompts sent to the LLM in characters",
+    buckets=SIZE_BUCKETS
+))
+
+# Transport and resources
+WEBSOCKET_SEND_SECONDS = registry.register(Histogram(
+    "rag_websocket_send_seconds",
+    "Latency of WebSocket progress sends",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+))
+WEBSOCKET_CONNECTIONS = registry.register(Gauge(
+    "rag_websocket_connections",
+    "Active WebSocket connections"
+))
+VECTOR_STORE_HANDLES = registry.register(Gauge(
+    "rag_vector_store_handles",
+    "Open vector store handles"
+))
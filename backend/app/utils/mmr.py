@@ -0,0 +1,62 @@
+"""Maximal Marginal Relevance selection"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+
+def mmr_select(
+    query_embedding: Sequence[float],
+    candidate_embeddings: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = 0.5
+) -> List[int]:
+    """
+    Pick k diverse, relevant candidates with Maximal Marginal Relevance.
+
+    Each step selects the candidate maximizing
+    lambda * sim(query, c) - (1 - lambda) * max(sim(c, selected)).
+    The largest similarity of every candidate to the selection is kept
+    as a vector and updated with one matrix-vector product per step, so
+    the work is O(k * n * d) in NumPy with no per-pair Python loops.
+
+    Args:
+        query_embedding: Query vector
+        candidate_embeddings: Candidate vectors, most relevant first or in any order
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+
+    Returns:
+        Indices into candidate_embeddings in selection order
+    """
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    if candidates.ndim != 2 or len(candidates) == 0 or k <= 0:
+        return []
+
+    query = np.asarray(query_embedding, dtype=np.float32)
+
+    # Cosine similarity via normalized dot products
+    candidates = candidates / np.linalg.norm(candidates, axis=1, keepdims=True).clip(min=1e-12)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+    relevance = candidates @ query
+    k = min(k, len(candidates))
+
+    selected = [int(np.argmax(relevance))]
+    if k == 1:
+        return selected
+
+    max_similarity = candidates @ candidates[selected[0]]
+    chosen = np.zeros(len(candidates), dtype=bool)
+    chosen[selected[0]] = True
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[chosen] = -np.inf
+        best = int(np.argmax(scores))
+
+        selected.append(best)
+        chosen[best] = True
+        np.maximum(max_similarity, candidates @ candidates[best], out=max_similarity)
+
+    return selected
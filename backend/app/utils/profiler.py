@@ -0,0 +1,166 @@
+"""Sampling profiler producing collapsed stacks"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running"""
+    pass
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread at a fixed interval.
+
+    Sampling happens on its own daemon thread via sys._current_frames(), so
+    the event loop thread and executor threads are captured without being
+    instrumented, and nothing runs when no profile is active.
+    """
+
+    # One sampler at a time keeps overhead bounded and profiles unambiguous
+    _active_lock = threading.Lock()
+
+    def __init__(self, interval: float):
+        """
+        Initialize profiler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Start sampling.
+
+        Raises:
+            ProfilerBusyError: If another profile is running
+        """
+        if not self._active_lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """
+        Stop sampling.
+
+        Returns:
+            Collapsed stacks, one "frame;frame;frame count" line per stack
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+            self.duration = time.perf_counter() - self.started_at
+            self._active_lock.release()
+        return self.collapsed()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                self._stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        """Render a stack root-first, prefixed with the thread name"""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name.replace(";", ":"))
+        return ";".join(reversed(frames))
+
+    def collapsed(self) -> str:
+        """Collapsed stacks accepted by flamegraph.pl and speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+
+class ProfileStore:
+    """Most recent per-request profiles, kept in memory"""
+
+    def __init__(self, max_profiles: int = 20):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, collapsed: str, profile_id: Optional[str] = None) -> str:
+        profile_id = profile_id or uuid.uuid4().hex
+        with self._lock:
+            self._profiles[profile_id] = collapsed
+            self._profiles.move_to_end(profile_id)
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[str]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> Dict[str, int]:
+        """Profile ids with their number of distinct stacks"""
+        with self._lock:
+            return {profile_id: collapsed.count("\n") for profile_id, collapsed in self._profiles.items()}
+
+
+profile_store = ProfileStore()
+
+
+def start_request_profile() -> Optional[SamplingProfiler]:
+    """
+    Start profiling for a single request.
+
+    Returns:
+        Running profiler, or None if another profile is already running
+    """
+    profiler = SamplingProfiler(settings.PROFILER_INTERVAL_MS / 1000)
+    try:
+        profiler.start()
+    except ProfilerBusyError:
+        logger.warning("Request profiling skipped: another profile is running")
+        return None
+    return profiler
+
+
+def finish_request_profile(profiler: SamplingProfiler, profile_id: Optional[str] = None) -> str:
+    """
+    Stop a request profile and store its collapsed stacks.
+
+    Args:
+        profiler: Profiler from start_request_profile
+        profile_id: Optional id to store the profile under
+
+    Returns:
+        Profile id for /api/admin/profiles/{profile_id}
+    """
+    collapsed = profiler.stop()
+    profile_id = profile_store.add(collapsed, profile_id)
+    logger.info(
+        "Stored profile %s: %s samples over %.2fs", profile_id, profiler.samples, profiler.duration
+    )
+    return profile_id
@@ -4,7 +4,9 @@ from typing import Dict, Any, Optional, Callable, Awaitable
 from datetime import datetime
 
 from app.schemas import ProgressUpdate, ProgressDetails
-from app.utils.logger import logger
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class ProgressTracker:
@@ -54,9 +56,9 @@ class ProgressTracker:
         )
         
         # Log progress
-        logger.info(
-            f"Progress update - Document: {self.document_id}, "
-            f"Stage: {stage}, Progress: {progress}%"
+        logger.debug(
+            "Progress update - Document: %s, Stage: %s, Progress: %s%%",
+            self.document_id, stage, progress
         )
         
         # Call callback if provided
@@ -64,7 +66,7 @@ class ProgressTracker:
             try:
                 await self.callback(progress_update)
             except Exception as e:
-                logger.error(f"Progress callback error: {e}")
+                logger.error("Progress callback error: %s", e)
     
     async def start_stage(self, stage: str, message: Optional[str] = None) -> None:
         """Start a new processing stage"""
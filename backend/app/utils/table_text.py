@@ -0,0 +1,62 @@
+"""Plain-text rendering of HTML tables for embedding"""
+
+from html.parser import HTMLParser
+from typing import List
+
+
+class _TableParser(HTMLParser):
+    """Collect the cell texts of each table row"""
+
+    def __init__(self):
+        super().__init__()
+        self.rows: List[List[str]] = []
+        self._row: List[str] = []
+        self._cell: List[str] = []
+        self._in_cell = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row = []
+        elif tag in ("td", "th"):
+            self._cell = []
+            self._in_cell = True
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th"):
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._in_cell = False
+        elif tag == "tr":
+            if any(self._row):
+                self.rows.append(self._row)
+            self._row = []
+
+    def handle_data(self, data):
+        if self._in_cell:
+            self._cell.append(data)
+
+
+def linearize_table(html: str) -> str:
+    """
+    Render an HTML table as one line per row with " | " between cells.
+
+    Embedding models read this far better than markup. Input that is not
+    table HTML (e.g. plain text from unstructured) is returned with its
+    whitespace collapsed.
+
+    Args:
+        html: Table HTML, as in chunk["tables"]
+
+    Returns:
+        Linearized table text
+    """
+    parser = _TableParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        parser.rows = []
+
+    if not parser.rows:
+        return " ".join(html.split())
+
+    return "\n".join(" | ".join(row) for row in parser.rows)
@@ -0,0 +1,300 @@
+"""Lightweight request tracing"""
+
+import asyncio
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "attributes",
+        "start_time", "_started", "duration_ms", "status", "error"
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def context(self) -> "SpanContext":
+        """Reference for continuing this trace elsewhere (e.g. a background task)"""
+        return SpanContext(self.trace_id, self.span_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class SpanContext:
+    """Trace and span identifiers a child span attaches to"""
+
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id: str, span_id: Optional[str]):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+class TraceExporter:
+    """
+    Keeps finished spans in an in-memory ring buffer, grouped by trace,
+    and optionally appends them to a JSON lines file.
+
+    File export happens on a writer thread, which appends every span
+    queued since its last write in one go; finishing a span only
+    enqueues it.
+    """
+
+    def __init__(self, max_spans: int, export_path: Optional[Path] = None):
+        """
+        Initialize exporter.
+
+        Args:
+            max_spans: Spans kept in memory; the oldest are dropped first
+            export_path: Optional JSON lines file every span is appended to
+        """
+        self.max_spans = max_spans
+        self.export_path = Path(export_path) if export_path else None
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._export_queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid: Optional[int] = None
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+        if self.export_path:
+            self._ensure_writer()
+            self._export_queue.put(span)
+
+    def _ensure_writer(self) -> None:
+        """Start the writer thread, again in a forked worker (threads don't survive fork)"""
+        if self._writer_pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._writer_pid != os.getpid():
+                self._writer = threading.Thread(target=self._write_spans, name="trace-export", daemon=True)
+                self._writer.start()
+                self._writer_pid = os.getpid()
+
+    def _write_spans(self) -> None:
+        """Writer thread: append queued spans to the export file, a batch per open"""
+        while True:
+            batch = [self._export_queue.get()]
+            while True:
+                try:
+                    batch.append(self._export_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = None in batch
+            lines = [json.dumps(span.to_dict(), default=str) + "\n" for span in batch if span is not None]
+            if lines:
+                try:
+                    with open(self.export_path, "a", encoding="utf-8") as f:
+                        f.writelines(lines)
+                except OSError as e:
+                    logger.warning("Failed to export %d span(s): %s", len(lines), e)
+
+            if stopping:
+                return
+
+    def stop(self) -> None:
+        """Write the spans still queued and stop the writer thread"""
+        if self._writer is not None and self._writer_pid == os.getpid():
+            self._export_queue.put(None)
+            self._writer.join(timeout=5)
+            self._writer_pid = None
+
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """All buffered spans of a trace, in start order"""
+        with self._lock:
+            spans = [span for span in self._spans if span.trace_id == trace_id]
+        return [span.to_dict() for span in sorted(spans, key=lambda span: span.start_time)]
+
+    def recent_traces(self, limit: int = 50, attribute: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """
+        Summaries of the most recent traces.
+
+        Args:
+            limit: Maximum traces returned
+            attribute: Optional (key, value) a span of the trace must carry
+
+        Returns:
+            Newest first: trace id, root span name, span count, duration and errors
+        """
+        with self._lock:
+            spans = list(self._spans)
+
+        traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        for span in reversed(spans):
+            traces.setdefault(span.trace_id, []).append(span)
+
+        summaries = []
+        for trace_id, trace_spans in traces.items():
+            if attribute and not any(span.attributes.get(attribute[0]) == attribute[1] for span in trace_spans):
+                continue
+
+            root = min(trace_spans, key=lambda span: span.start_time)
+            end = max(span.start_time + (span.duration_ms or 0) / 1000 for span in trace_spans)
+            summaries.append({
+                "trace_id": trace_id,
+                "root": root.name,
+                "start_time": root.start_time,
+                "duration_ms": round((end - root.start_time) * 1000, 3),
+                "spans": len(trace_spans),
+                "errors": sum(1 for span in trace_spans if span.status == "error")
+            })
+            if len(summaries) >= limit:
+                break
+
+        return summaries
+
+
+exporter = TraceExporter(settings.TRACE_BUFFER_SIZE, settings.TRACE_EXPORT_PATH)
+atexit.register(exporter.stop)
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """Span active in this context, if any"""
+    return _current_span.get()
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Set an attribute on the active span, if any"""
+    span = _current_span.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+
+def current_context() -> Optional[SpanContext]:
+    """Context of the active span, for handing to a background task"""
+    span = _current_span.get()
+    return span.context() if span else None
+
+
+@contextmanager
+def span(name: str, parent: Optional[SpanContext] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a block as a span.
+
+    The span is a child of `parent` when given, else of the span active in
+    this context; with neither it starts a new trace.
+
+    Args:
+        name: Span name
+        parent: Explicit parent, e.g. captured with current_context()
+        attributes: Span attributes
+
+    Yields:
+        The span, or None when tracing is disabled
+    """
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+
+    if parent is None:
+        parent = current_context()
+
+    if parent is not None:
+        new_span = Span(name, parent.trace_id, parent.span_id, attributes)
+    else:
+        new_span = Span(name, os.urandom(16).hex(), None, attributes)
+
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.status = "error"
+        new_span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span.duration_ms = round((time.perf_counter() - new_span._started) * 1000, 3)
+        exporter.export(new_span)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator running a sync or async function inside a span.
+
+    Args:
+        name: Span name (defaults to the function's qualified name)
+    """
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def run_in_executor(function: Callable, *args: Any) -> "asyncio.Future":
+    """
+    Run a blocking function in the default executor, keeping the trace context.
+
+    Unlike loop.run_in_executor, spans opened by the function become children
+    of the caller's span.
+
+    Args:
+        function: Blocking callable
+        args: Positional arguments
+
+    Returns:
+        Awaitable result
+    """
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(None, functools.partial(context.run, function, *args))
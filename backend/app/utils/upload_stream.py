@@ -0,0 +1,241 @@
+"""Streaming multipart upload handling"""
+
+import asyncio
+import hashlib
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+from app.utils.error_handlers import FileValidationError
+
+
+PDF_MAGIC = b"%PDF-"
+MULTIPART_OVERHEAD = 64 * 1024  # Allowance for boundaries, headers and form fields
+MAX_FIELD_SIZE = 1024  # Plain form fields are short identifiers
+
+
+class _FilePart:
+    """State of the file part being received"""
+
+    def __init__(self, filename: str, file_path: Path):
+        self.filename = filename
+        self.file_path = file_path
+        self.handle = None
+        self.size = 0
+        self.hasher = hashlib.sha256()
+        self.head = b""  # First bytes, kept until the magic number is checked
+
+
+async def _open_for_write(path: Path):
+    """
+    Open a file for writing on the default executor.
+
+    If the caller is cancelled while the open is in flight, the file is
+    closed and removed once the open completes instead of leaking its fd.
+    """
+    loop = asyncio.get_running_loop()
+    opening = loop.run_in_executor(None, open, path, "wb")
+
+    try:
+        return await asyncio.shield(opening)
+    except asyncio.CancelledError:
+        def discard(future: asyncio.Future) -> None:
+            if not future.cancelled() and future.exception() is None:
+                future.result().close()
+                path.unlink(missing_ok=True)
+
+        opening.add_done_callback(discard)
+        raise
+
+
+async def receive_pdf_upload(
+    request: Request,
+    upload_dir: Path,
+    max_size: int,
+    file_field: str = "file"
+) -> Dict[str, Any]:
+    """
+    Stream a multipart PDF upload straight to disk.
+
+    The body is parsed as it arrives: the PDF magic bytes are checked on the
+    first chunk, size and SHA-256 are computed incrementally, and the upload
+    is aborted as soon as it exceeds max_size. Memory use is bounded by the
+    size of one network chunk.
+
+    Args:
+        request: Incoming request with a multipart/form-data body
+        upload_dir: Directory the file is written to
+        max_size: Maximum file size in bytes
+        file_field: Name of the form field carrying the file
+
+    Returns:
+        Dictionary with document_id, filename, file_path, file_size,
+        content_hash and the remaining form fields
+
+    Raises:
+        FileValidationError: If the body is not a valid PDF upload
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise FileValidationError("Invalid upload", detail="Expected multipart/form-data")
+
+    # Reject honest-but-oversized requests before reading any body
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise FileValidationError(
+            "Invalid upload",
+            detail=f"File size exceeds {max_size / (1024*1024)}MB limit"
+        )
+
+    document_id = str(uuid.uuid4())
+    fields: Dict[str, str] = {}
+    file_part: Optional[_FilePart] = None
+
+    # Parser callbacks are synchronous; they only record events, which are
+    # applied (with async file I/O) after each network chunk is parsed
+    events: List[tuple] = []
+    header_field = bytearray()
+    header_value = bytearray()
+    headers: Dict[bytes, bytes] = {}
+
+    def on_part_begin() -> None:
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        filename = options.get(b"filename")
+        events.append(("begin", name, filename.decode("utf-8", errors="replace") if filename is not None else None))
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        events.append(("data", bytes(data[start:end])))
+
+    def on_part_end() -> None:
+        events.append(("end",))
+
+    parser = MultipartParser(
+        boundary,
+        callbacks={
+            "on_part_begin": on_part_begin,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+        }
+    )
+
+    loop = asyncio.get_running_loop()
+    current: Optional[str] = None  # "file", "field" or "skip"
+    field_name = ""
+    field_value = bytearray()
+
+    async def write(data: bytes) -> None:
+        file_part.size += len(data)
+        if file_part.size > max_size:
+            raise FileValidationError(
+                f"Invalid file: {file_part.filename}",
+                detail=f"File size exceeds {max_size / (1024*1024)}MB limit"
+            )
+        file_part.hasher.update(data)
+        await loop.run_in_executor(None, file_part.handle.write, data)
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+
+            for event in events:
+                kind = event[0]
+
+                if kind == "begin":
+                    _, name, filename = event
+                    if name == file_field and filename is not None and file_part is None:
+                        if not filename.lower().endswith(".pdf"):
+                            raise FileValidationError(
+                                f"Invalid file: {filename}",
+                                detail="Only PDF files are allowed"
+                            )
+                        safe_name = Path(filename).name
+                        file_path = upload_dir / f"{document_id}_{safe_name}"
+                        handle = await _open_for_write(file_path)
+                        # Only set once the file is open, so cleanup never sees a part without a handle
+                        file_part = _FilePart(safe_name, file_path)
+                        file_part.handle = handle
+                        current = "file"
+                    elif filename is None:
+                        current = "field"
+                        field_name = name
+                        field_value.clear()
+                    else:
+                        current = "skip"
+
+                elif kind == "data":
+                    data = event[1]
+                    if current == "file":
+                        if len(file_part.head) < len(PDF_MAGIC):
+                            # Hold bytes back until the magic number can be checked
+                            file_part.head += data
+                            if len(file_part.head) < len(PDF_MAGIC):
+                                continue
+                            if not file_part.head.startswith(PDF_MAGIC):
+                                raise FileValidationError(
+                                    f"Invalid file: {file_part.filename}",
+                                    detail="File content is not a PDF"
+                                )
+                            data, file_part.head = file_part.head, PDF_MAGIC
+                        await write(data)
+                    elif current == "field":
+                        field_value.extend(data)
+                        if len(field_value) > MAX_FIELD_SIZE:
+                            raise FileValidationError("Invalid upload", detail=f"Form field '{field_name}' is too large")
+
+                elif kind == "end":
+                    if current == "field":
+                        fields[field_name] = field_value.decode("utf-8", errors="replace")
+                    elif current == "file" and len(file_part.head) < len(PDF_MAGIC):
+                        raise FileValidationError(
+                            f"Invalid file: {file_part.filename}",
+                            detail="File content is not a PDF"
+                        )
+                    current = None
+
+            events.clear()
+
+        parser.finalize()
+
+        if file_part is None:
+            raise FileValidationError("Invalid upload", detail=f"Missing '{file_field}' file field")
+
+        await loop.run_in_executor(None, file_part.handle.close)
+
+    except BaseException:
+        # Never leave partial uploads behind
+        if file_part is not None:
+            await loop.run_in_executor(None, file_part.handle.close)
+            file_part.file_path.unlink(missing_ok=True)
+        raise
+
+    return {
+        "document_id": document_id,
+        "filename": file_part.filename,
+        "file_path": file_part.file_path,
+        "file_size": file_part.size,
+        "content_hash": file_part.hasher.hexdigest(),
+        "fields": fields
+    }
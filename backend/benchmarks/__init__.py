@@ -0,0 +1,10 @@
+"""
+Offline benchmarks for the backend.
+
+Run from the backend/ directory, e.g. `python -m benchmarks.embedding_backends`.
+Benchmarks never call Groq; a placeholder key satisfies settings validation.
+"""
+
+import os
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
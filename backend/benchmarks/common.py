@@ -0,0 +1,76 @@
+"""Shared helpers for benchmarks"""
+
+import json
+import math
+import platform
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SAMPLE_PDF = REPO_ROOT / "docs" / "attention-is-all-you-need.pdf"
+SAMPLE_CHUNKS = REPO_ROOT / "chunks_export.json"
+SAMPLE_RESULTS = REPO_ROOT / "rag_results.json"
+
+
+def load_sample_chunks() -> List[Dict[str, Any]]:
+    """
+    Load the exported sample PDF chunks in ChunkingService format.
+
+    Returns:
+        List of chunks with chunk_id, text, tables and images
+    """
+    with open(SAMPLE_CHUNKS, encoding="utf-8") as f:
+        exported = json.load(f)
+
+    chunks = []
+    for item in exported:
+        original = item["metadata"]["original_content"]
+        chunks.append({
+            "chunk_id": item["chunk_id"],
+            "text": original.get("raw_text", ""),
+            "tables": original.get("tables_html", []),
+            "images": original.get("images_base64", []),
+            "metadata": {}
+        })
+
+    return chunks
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Summarize latencies in seconds as milliseconds"""
+    return {
+        "count": len(latencies),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0
+    }
+
+
+def write_results(path: Path, name: str, results: Dict[str, Any]) -> None:
+    """Write benchmark results as JSON with environment metadata"""
+    payload = {
+        "benchmark": name,
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {path}")
@@ -0,0 +1,220 @@
+"""
+Two-stage retrieval benchmark: document routing vs. searching every chunk.
+
+Indexes the sample PDF chunks as the target document alongside a growing
+number of distractor documents in one session. Each distractor is built
+from one of several topic vocabularies, unless real PDFs are given with
+--pdf. Every question of the retrieval question set is then asked with
+and without routing. The benchmark reports recall@k of the target
+document's relevant chunks, how often routing kept the target document,
+and p50/p95 retrieval latency.
+
+Usage:
+    python -m benchmarks.document_routing [--documents 1 10 25 50] [--top-m 4] [--k 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+QUESTIONS = Path(__file__).parent / "data" / "retrieval_questions.json"
+
+TOPICS = {
+    "biology": "cell protein enzyme membrane gene mutation organism tissue receptor pathway metabolism",
+    "finance": "market equity bond yield portfolio liquidity dividend valuation risk hedge capital",
+    "law": "contract statute liability plaintiff court jurisdiction clause appeal tort evidence",
+    "astronomy": "galaxy orbit telescope nebula redshift star planet luminosity cosmic gravity",
+    "cooking": "recipe oven flour butter simmer sauce garlic roast dough seasoning whisk",
+    "climate": "emission carbon temperature ocean glacier rainfall drought aerosol forcing",
+    "medicine": "patient dose trial symptom diagnosis therapy clinical infection vaccine cohort",
+    "networking": "router packet latency bandwidth protocol switch firewall congestion socket",
+}
+FILLER = "the a of and in to is that for with as on by this are from which results shows".split()
+
+
+def distractor_chunks(topic: str, count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Chunks of plausible prose about one topic"""
+    words = TOPICS[topic].split()
+    chunks = []
+    for i in range(count):
+        sentences = []
+        for _ in range(rng.randint(8, 16)):
+            sentence = rng.choices(words, k=rng.randint(4, 8)) + rng.choices(FILLER, k=rng.randint(4, 8))
+            rng.shuffle(sentence)
+            sentences.append(" ".join(sentence).capitalize() + ".")
+        chunks.append({"chunk_id": i + 1, "text": " ".join(sentences), "tables": [], "images": [], "metadata": {}})
+    return chunks
+
+
+async def build_session(document_count: int, args, services: Dict[str, Any]) -> Dict[str, Any]:
+    """Index the target document and document_count - 1 distractors into a fresh session"""
+    from benchmarks.common import load_sample_chunks
+    from app.database import SessionLocal
+    from app.models import Document, DocumentStatus, Session as SessionModel
+    from app.services.document_router import DocumentRouter
+
+    rng = random.Random(document_count)
+    session_id = str(uuid.uuid4())
+    vectorization_service = services["vectorization"]
+
+    corpora = [("target", load_sample_chunks())]
+    pdf_chunks = services.get("pdf_chunks", [])
+    for i in range(document_count - 1):
+        if pdf_chunks:
+            name, chunks = pdf_chunks[i % len(pdf_chunks)]
+            corpora.append((f"{name}#{i}", chunks))
+        else:
+            topic = list(TOPICS)[i % len(TOPICS)]
+            corpora.append((f"{topic}-{i}", distractor_chunks(topic, rng.randint(10, 40), rng)))
+
+    db = SessionLocal()
+    try:
+        db.add(SessionModel(session_id=session_id))
+        db.commit()
+
+        target_id = None
+        total_chunks = 0
+        for name, chunks in corpora:
+            document_id = str(uuid.uuid4())
+            target_id = target_id or document_id
+            await vectorization_service.create_vector_store(chunks, session_id, document_id, name)
+            db.add(Document(
+                id=document_id,
+                session_id=session_id,
+                filename=name,
+                file_path=name,
+                file_size=0,
+                status=DocumentStatus.COMPLETED,
+                chunk_count=len(chunks),
+                summary_embedding=DocumentRouter.compute_summary(vectorization_service, session_id, document_id)
+            ))
+            db.commit()
+            total_chunks += len(chunks)
+    finally:
+        db.close()
+
+    return {"session_id": session_id, "target_id": target_id, "chunks": total_chunks}
+
+
+async def evaluate(session: Dict[str, Any], questions: List[Dict[str, Any]], rag_service, router, args) -> Dict[str, Any]:
+    """Ask every question, with routing when router is set"""
+    from benchmarks.common import latency_summary
+
+    rag_service.document_router = router
+    session_id = session["session_id"]
+
+    # Warm-up so model and store loading don't count towards latency
+    await rag_service.retrieve(session_id, questions[0]["query"], args.k)
+
+    recalls, latencies, target_kept = [], [], []
+    for question in questions:
+        relevant = set(question["relevant_chunk_ids"])
+
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            chunks = await rag_service.retrieve(session_id, question["query"], args.k)
+            latencies.append(time.perf_counter() - started)
+
+        retrieved = {
+            chunk.metadata.get("chunk_id") for chunk in chunks
+            if chunk.metadata.get("document_id") == session["target_id"]
+        }
+        recalls.append(len(relevant & retrieved) / len(relevant))
+
+        if router:
+            embedding = rag_service.vectorization_service.embeddings.embed_query(question["query"])
+            routed = router.route(session_id, embedding) or [session["target_id"]]
+            target_kept.append(session["target_id"] in routed)
+
+    latency = latency_summary(latencies)
+    return {
+        f"recall@{args.k}": round(sum(recalls) / len(recalls), 4),
+        "target_routed": round(sum(target_kept) / len(target_kept), 4) if target_kept else None,
+        "p50_ms": round(latency["p50_ms"], 2),
+        "p95_ms": round(latency["p95_ms"], 2)
+    }
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    from app.database import init_db
+    from app.services.document_router import DocumentRouter
+    from app.services.rag_service import RAGService
+    from app.services.vectorization_service import VectorizationService
+
+    init_db()
+
+    with open(QUESTIONS, encoding="utf-8") as f:
+        questions = json.load(f)["questions"]
+
+    services: Dict[str, Any] = {"vectorization": VectorizationService()}
+    if args.pdf:
+        from app.services.document_processor import DocumentProcessor
+        from app.services.chunking_service import ChunkingService
+
+        services["pdf_chunks"] = []
+        for pdf in args.pdf:
+            partition_result = await DocumentProcessor().partition_pdf(pdf)
+            chunks = await ChunkingService().create_chunks(partition_result["elements"])
+            services["pdf_chunks"].append((Path(pdf).name, chunks))
+
+    rag_service = RAGService()
+    router = DocumentRouter(top_m=args.top_m, min_documents=0)
+
+    rows = []
+    for document_count in args.documents:
+        session = await build_session(document_count, args, services)
+        row = {"documents": document_count, "chunks": session["chunks"]}
+        row["all_chunks"] = await evaluate(session, questions, rag_service, None, args)
+        row["routed"] = await evaluate(session, questions, rag_service, router, args)
+        rows.append(row)
+
+        print(
+            f"{document_count:>4} docs / {session['chunks']:>5} chunks  "
+            f"all: recall {row['all_chunks'][f'recall@{args.k}']:.3f} p50 {row['all_chunks']['p50_ms']}ms  "
+            f"routed: recall {row['routed'][f'recall@{args.k}']:.3f} "
+            f"(target kept {row['routed']['target_routed']:.2f}) p50 {row['routed']['p50_ms']}ms"
+        )
+
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, nargs="+", default=[1, 10, 25, 50], help="Documents per session")
+    parser.add_argument("--top-m", type=int, default=4, help="Documents kept by routing")
+    parser.add_argument("--k", type=int, default=5, help="Chunks retrieved per question")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed retrievals per question")
+    parser.add_argument("--pdf", nargs="*", help="Use these PDFs as distractor documents")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="document-routing-")
+
+    # Configure before app modules read settings
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/routing.db"
+    os.environ["CHROMA_PERSIST_DIR"] = f"{workdir}/chroma"
+    os.environ["IMAGE_DIR"] = f"{workdir}/images"
+    os.environ["RETRIEVAL_CACHE_SIZE"] = "0"
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    from benchmarks.common import write_results
+
+    rows = asyncio.run(run(args))
+
+    if args.output:
+        write_results(args.output, "document_routing", {"top_m": args.top_m, "k": args.k, "runs": rows})
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
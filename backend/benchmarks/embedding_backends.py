@@ -0,0 +1,102 @@
+"""
+Embedding backend parity check and throughput benchmark.
+
+Embeds the sample PDF chunks with the torch (sentence-transformers) and
+ONNX Runtime backends, then reports:
+
+- parity: per-chunk cosine similarity between the two backends' vectors
+  and the largest difference between their chunk-to-chunk similarity
+  matrices (what retrieval ranking actually depends on)
+- throughput: chunks/sec for each backend
+
+Exits non-zero if parity falls below --min-cosine.
+
+Usage:
+    python -m benchmarks.embedding_backends [--repeat 3] [--output results.json]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import load_sample_chunks, write_results
+from app.services.embeddings import create_embeddings
+
+
+def embed_texts(backend: str, texts, repeat: int):
+    """Embed texts with a backend, returning vectors and timing"""
+    started = time.perf_counter()
+    embeddings = create_embeddings(backend)
+    load_seconds = time.perf_counter() - started
+
+    # Warm-up pass so lazy initialization doesn't count towards throughput
+    embeddings.embed_documents(texts[:2])
+
+    timings = []
+    vectors = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    return vectors, {
+        "load_seconds": round(load_seconds, 3),
+        "best_seconds": round(best, 4),
+        "chunks_per_second": round(len(texts) / best, 2)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per backend")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Minimum per-chunk cosine for parity")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    chunks = load_sample_chunks()
+    texts = [chunk["text"] for chunk in chunks]
+    print(f"Embedding {len(texts)} sample chunks")
+
+    torch_vectors, torch_stats = embed_texts("torch", texts, args.repeat)
+    onnx_vectors, onnx_stats = embed_texts("onnx", texts, args.repeat)
+
+    # Vectors are L2-normalized, so dot products are cosines
+    pairwise = np.sum(torch_vectors * onnx_vectors, axis=1)
+    similarity_drift = np.abs(torch_vectors @ torch_vectors.T - onnx_vectors @ onnx_vectors.T)
+
+    results = {
+        "chunks": len(texts),
+        "torch": torch_stats,
+        "onnx": onnx_stats,
+        "speedup": round(onnx_stats["chunks_per_second"] / torch_stats["chunks_per_second"], 2),
+        "parity": {
+            "min_cosine": round(float(pairwise.min()), 5),
+            "mean_cosine": round(float(pairwise.mean()), 5),
+            "max_similarity_drift": round(float(similarity_drift.max()), 5)
+        }
+    }
+
+    print(f"torch: {torch_stats['chunks_per_second']} chunks/sec")
+    print(f"onnx:  {onnx_stats['chunks_per_second']} chunks/sec ({results['speedup']}x)")
+    print(
+        f"parity: min cosine {results['parity']['min_cosine']}, "
+        f"mean cosine {results['parity']['mean_cosine']}, "
+        f"max similarity drift {results['parity']['max_similarity_drift']}"
+    )
+
+    if args.output:
+        write_results(args.output, "embedding_backends", results)
+
+    if results["parity"]["min_cosine"] < args.min_cosine:
+        print(f"FAIL: min cosine below {args.min_cosine}")
+        return 1
+
+    print("OK: backends agree")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Event-loop lag during chunking.
+
+Chunks a synthetic document (titles, paragraphs, tables and images, as
+produced by partitioning) while a probe coroutine measures how late its
+short sleeps wake up. Late wake-ups are the delay every chat request and
+WebSocket ping would see during ingestion.
+
+- inline: chunk_by_title and metadata extraction on the event loop, as
+  ChunkingService.create_chunks did before
+- threaded: the current ChunkingService, chunking on a worker thread and
+  streaming chunks back to the coroutine
+
+Usage:
+    python -m benchmarks.event_loop_lag [--elements 20000] [--probe-interval-ms 5]
+"""
+
+import argparse
+import asyncio
+import base64
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from unstructured.chunking.title import chunk_by_title
+from unstructured.documents.elements import ElementMetadata, Image, NarrativeText, Table, Title
+
+from benchmarks.common import latency_summary, write_results
+from app.config import settings
+from app.services.chunking_service import ChunkingService
+
+
+def synthetic_elements(count: int, seed: int = 0) -> List[Any]:
+    """Elements resembling a long partitioned PDF"""
+    rng = random.Random(seed)
+    words = "attention encoder decoder layer head token sequence model training translation".split()
+    image_base64 = base64.b64encode(bytes(rng.getrandbits(8) for _ in range(4096))).decode()
+
+    elements = []
+    for i in range(count):
+        kind = i % 20
+        if kind == 0:
+            elements.append(Title(f"Section {i // 20}: {' '.join(rng.choices(words, k=4))}"))
+        elif kind == 7:
+            html = "<table>" + "".join(
+                f"<tr><td>{rng.choice(words)}</td><td>{rng.random():.3f}</td></tr>" for _ in range(8)
+            ) + "</table>"
+            elements.append(Table("table", metadata=ElementMetadata(text_as_html=html)))
+        elif kind == 13:
+            elements.append(Image("figure", metadata=ElementMetadata(image_base64=image_base64)))
+        else:
+            elements.append(NarrativeText(" ".join(rng.choices(words, k=rng.randint(20, 80))) + "."))
+    return elements
+
+
+async def chunk_inline(elements: List[Any]) -> int:
+    """The previous implementation: everything on the event loop"""
+    service = ChunkingService()
+    chunks = chunk_by_title(
+        elements,
+        max_characters=settings.CHUNK_MAX_CHARS,
+        new_after_n_chars=settings.CHUNK_NEW_AFTER_CHARS,
+        combine_text_under_n_chars=settings.CHUNK_COMBINE_UNDER_CHARS
+    )
+    processed = [service._extract_chunk_metadata(chunk, i + 1) for i, chunk in enumerate(chunks)]
+    return len(processed)
+
+
+async def chunk_threaded(elements: List[Any]) -> int:
+    chunks = await ChunkingService().create_chunks(elements)
+    return len(chunks)
+
+
+async def measure(chunker, elements: List[Any], interval: float) -> Dict[str, Any]:
+    """Run a chunker while probing how late the event loop wakes up"""
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - started - interval))
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(interval * 2)
+
+    started = time.perf_counter()
+    chunks = await chunker(elements)
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    await probe_task
+
+    return {
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "lag": {key: round(value, 2) for key, value in latency_summary(lags).items()}
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--elements", type=int, default=20000, help="Synthetic elements to chunk")
+    parser.add_argument("--probe-interval-ms", type=float, default=5.0, help="Sleep of the lag probe")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    elements = synthetic_elements(args.elements)
+    interval = args.probe_interval_ms / 1000
+
+    results = {"elements": args.elements, "probe_interval_ms": args.probe_interval_ms}
+    for name, chunker in (("inline", chunk_inline), ("threaded", chunk_threaded)):
+        results[name] = asyncio.run(measure(chunker, elements, interval))
+        lag = results[name]["lag"]
+        print(
+            f"{name:<9} {results[name]['chunks']} chunks in {results[name]['seconds']}s, "
+            f"loop lag p50 {lag['p50_ms']} ms, p99 {lag['p99_ms']} ms, max {lag['max_ms']} ms"
+        )
+
+    if args.output:
+        write_results(args.output, "event_loop_lag", results)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Local OpenAI-compatible stand-in for the Groq API.
+
+Serves /openai/v1/chat/completions (the path the Groq SDK calls) with a
+configurable latency, jitter, failure rate and per-token delay, including
+server-sent-event streaming for `stream: true` requests, so LLM-dependent
+code can be exercised without network access. Point the app at it with
+GROQ_BASE_URL=http://127.0.0.1:<port>.
+
+Usage:
+    python -m benchmarks.fake_groq [--port 8765] [--latency-ms 200] [--fail-rate 0.0]
+                                   [--completion-tokens 150 --token-delay-ms 5]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def create_app(
+    latency_ms: float = 200.0,
+    jitter_ms: float = 0.0,
+    fail_rate: float = 0.0,
+    completion_tokens: Optional[int] = None,
+    token_delay_ms: float = 0.0
+) -> FastAPI:
+    """
+    Create the fake completion server.
+
+    Args:
+        latency_ms: Base latency before the first token
+        jitter_ms: Uniform random latency added on top
+        fail_rate: Fraction of requests answered with HTTP 503
+        completion_tokens: Fixed answer length in tokens (default: echo the prompt)
+        token_delay_ms: Generation time per completion token
+
+    Returns:
+        FastAPI application
+    """
+    app = FastAPI(title="Fake Groq")
+    app.state.requests = 0
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+
+        await asyncio.sleep((latency_ms + random.uniform(0, jitter_ms)) / 1000)
+
+        if random.random() < fail_rate:
+            return JSONResponse(status_code=503, content={"error": {"message": "fake overload"}})
+
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        if completion_tokens is None:
+            tokens = f"Fake summary of {len(prompt)} characters: {prompt[:200]}".split(" ")
+        else:
+            tokens = [f"token{i}" for i in range(completion_tokens)]
+        tokens = [token + " " for token in tokens[:-1]] + tokens[-1:]
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "fake")
+        prompt_tokens = len(prompt) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens)
+        }
+
+        if body.get("stream"):
+            async def events():
+                for token in tokens:
+                    await asyncio.sleep(token_delay_ms / 1000)
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                    "x_groq": {"usage": usage}
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(len(tokens) * token_delay_ms / 1000)
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        }
+
+    app.post("/openai/v1/chat/completions")(chat_completions)
+    app.post("/v1/chat/completions")(chat_completions)
+    return app
+
+
+class FakeGroqServer:
+    """Run the fake server on a background thread"""
+
+    def __init__(self, port: int = 8765, **options):
+        self.port = port
+        self.app = create_app(**options)
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "FakeGroqServer":
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--completion-tokens", type=int, default=None)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app = create_app(
+        args.latency_ms,
+        args.jitter_ms,
+        args.fail_rate,
+        args.completion_tokens,
+        args.token_delay_ms
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
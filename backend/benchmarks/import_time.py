@@ -0,0 +1,120 @@
+"""
+Startup budget check.
+
+Imports app.main in fresh interpreters and fails when the median import
+time exceeds the budget, or when importing pulled in heavy model
+libraries (torch, sentence-transformers, unstructured's PDF stack) that
+should only load lazily on first use.
+
+Usage:
+    python -m benchmarks.import_time [--budget 3.0] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import write_results
+
+
+HEAVY_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "transformers",
+    "onnxruntime",
+    "unstructured.partition.pdf",
+]
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+}}))
+"""
+
+
+def measure_once() -> dict:
+    """Import app.main in a fresh interpreter"""
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["slowest"] = slowest_imports(completed.stderr)
+    return result
+
+
+def slowest_imports(importtime_log: str, top: int = 10) -> list:
+    """Top-level packages by cumulative import time from -X importtime"""
+    cumulative = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+            cumulative_us = int(cumulative_us)
+        except ValueError:
+            continue
+        if "." not in name:
+            cumulative[name] = max(cumulative.get(name, 0), cumulative_us)
+
+    ordered = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"module": name, "ms": round(us / 1000, 1)} for name, us in ordered]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=3.0, help="Maximum median import time in seconds")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    timings = [run["seconds"] for run in runs]
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+
+    results = {
+        "runs": args.runs,
+        "budget_seconds": args.budget,
+        "median_seconds": round(statistics.median(timings), 3),
+        "max_seconds": round(max(timings), 3),
+        "heavy_modules_loaded": loaded,
+        "slowest_imports": runs[-1]["slowest"]
+    }
+
+    print(f"import app.main: median {results['median_seconds']}s, max {results['max_seconds']}s")
+    for entry in results["slowest_imports"]:
+        print(f"  {entry['module']:<30} {entry['ms']:>8} ms")
+
+    if args.output:
+        write_results(args.output, "import_time", results)
+
+    failed = False
+    if loaded:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(loaded)}")
+        failed = True
+    if results["median_seconds"] > args.budget:
+        print(f"FAIL: median import time above {args.budget}s budget")
+        failed = True
+
+    if failed:
+        return 1
+
+    print("OK: startup within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
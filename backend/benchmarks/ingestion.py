@@ -0,0 +1,221 @@
+"""
+Offline ingestion benchmark with per-stage timing and memory profiles.
+
+Runs the backend pipeline (partition -> chunk -> images -> vectorize) on
+the sample PDF and on synthetic multi-page PDFs, recording for each stage
+wall time, CPU time, peak RSS and items/sec. Results are written as JSON
+and can be compared against a stored baseline; the run fails when a stage
+regresses by more than --tolerance.
+
+Everything runs against temporary directories with Hugging Face in
+offline mode, so the embedding and layout models must already be cached.
+
+Usage:
+    python -m benchmarks.ingestion [--pages 5 20] [--output results.json]
+    python -m benchmarks.ingestion --baseline baseline.json [--tolerance 0.15]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+STAGES = ("partition", "chunk", "images", "vectorize")
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is the lifetime peak (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageProfiler:
+    """Measure wall time, CPU time and peak RSS of a block"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop = threading.Event()
+
+    def _sample(self) -> None:
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, current_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "StageProfiler":
+        self.start_rss = current_rss()
+        self.peak_rss = self.start_rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.process_time() - self._cpu
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+    def result(self, items: Optional[int] = None, unit: Optional[str] = None) -> Dict[str, Any]:
+        result = {
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "peak_rss_mb": round(self.peak_rss / 2**20, 1),
+            "rss_growth_mb": round((self.peak_rss - self.start_rss) / 2**20, 1)
+        }
+        if items is not None:
+            result[unit] = items
+            result[f"{unit}_per_second"] = round(items / self.wall_seconds, 2) if self.wall_seconds else None
+        return result
+
+
+async def run_pipeline(pdf_path: Path, services: Dict[str, Any]) -> Dict[str, Any]:
+    """Run every ingestion stage on one PDF"""
+    session_id = str(uuid.uuid4())
+    document_id = str(uuid.uuid4())
+    stages = {}
+
+    with StageProfiler() as profiler:
+        partition_result = await services["processor"].partition_pdf(str(pdf_path))
+    stages["partition"] = profiler.result(partition_result["total"], "elements")
+
+    with StageProfiler() as profiler:
+        chunks = await services["chunking"].create_chunks(partition_result["elements"])
+    stages["chunk"] = profiler.result(len(chunks), "chunks")
+
+    with StageProfiler() as profiler:
+        image_stats = await services["images"].normalize_chunks(chunks, session_id)
+    stages["images"] = profiler.result(image_stats["images"], "images")
+    stages["images"]["bytes_saved"] = image_stats["bytes_saved"]
+
+    # Chunks plus their table and image vectors, as reported by the store
+    vectors_stored = 0
+
+    async def count_vectors(stored: int) -> None:
+        nonlocal vectors_stored
+        vectors_stored = stored
+
+    with StageProfiler() as profiler:
+        await services["vectorization"].create_vector_store(
+            chunks, session_id, document_id, pdf_path.name, on_batch_stored=count_vectors
+        )
+    stages["vectorize"] = profiler.result(vectors_stored, "vectors")
+
+    return {
+        "file": pdf_path.name,
+        "file_size": pdf_path.stat().st_size,
+        "total_wall_seconds": round(sum(stage["wall_seconds"] for stage in stages.values()), 4),
+        "stages": stages
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> int:
+    """Print per-stage wall time changes; return the number of regressions"""
+    baseline_runs = {run["file"]: run for run in baseline["results"]["runs"]}
+    regressions = 0
+
+    print(f"\n{'file':<36} {'stage':<10} {'baseline s':>11} {'current s':>10} {'change':>8}")
+    for run in results["runs"]:
+        reference = baseline_runs.get(run["file"])
+        if not reference:
+            continue
+        for stage in STAGES:
+            before = reference["stages"][stage]["wall_seconds"]
+            after = run["stages"][stage]["wall_seconds"]
+            change = (after - before) / before if before else 0.0
+            flag = ""
+            if change > tolerance:
+                regressions += 1
+                flag = "  REGRESSION"
+            print(f"{run['file']:<36} {stage:<10} {before:>11.3f} {after:>10.3f} {change:>+8.1%}{flag}")
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="*", default=[5, 20], help="Synthetic PDF page counts")
+    parser.add_argument("--no-sample", action="store_true", help="Skip the sample PDF")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--baseline", help="Compare against a stored results file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed wall-time regression per stage")
+    parser.add_argument("--online", action="store_true", help="Allow Hugging Face downloads")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="ingestion-bench-"))
+
+    # Configure before app modules read settings
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["UPLOAD_DIR"] = str(workdir / "uploads")
+    os.environ["CHROMA_PERSIST_DIR"] = str(workdir / "chroma")
+    os.environ["IMAGE_DIR"] = str(workdir / "images")
+    if not args.online:
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+    from benchmarks.common import SAMPLE_PDF, write_results
+    from benchmarks.synthetic_pdf import write_synthetic_pdf
+    from app.services.document_processor import DocumentProcessor
+    from app.services.chunking_service import ChunkingService
+    from app.services.image_service import ImageService
+    from app.services.vectorization_service import VectorizationService
+
+    pdfs = [] if args.no_sample else [SAMPLE_PDF]
+    pdfs += [write_synthetic_pdf(workdir / f"synthetic_{pages}p.pdf", pages, seed=pages) for pages in args.pages]
+
+    with StageProfiler() as profiler:
+        services = {
+            "processor": DocumentProcessor(),
+            "chunking": ChunkingService(),
+            "images": ImageService(),
+            "vectorization": VectorizationService()
+        }
+    startup = profiler.result()
+
+    runs = []
+    for pdf in pdfs:
+        print(f"Ingesting {pdf.name}...")
+        run = asyncio.run(run_pipeline(pdf, services))
+        runs.append(run)
+        for stage in STAGES:
+            metrics = run["stages"][stage]
+            print(
+                f"  {stage:<10} wall {metrics['wall_seconds']:>8.3f}s  cpu {metrics['cpu_seconds']:>8.3f}s  "
+                f"peak rss {metrics['peak_rss_mb']:>7.1f} MB"
+            )
+
+    results = {"startup": startup, "runs": runs}
+
+    if args.output:
+        write_results(args.output, "ingestion", results)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nFAIL: {regressions} stage(s) regressed by more than {args.tolerance:.0%}")
+            return 1
+        print("\nOK: no regressions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
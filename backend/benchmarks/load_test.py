@@ -0,0 +1,269 @@
+"""
+End-to-end load test against the FastAPI app and a local fake Groq server.
+
+Each virtual user opens a progress WebSocket, uploads a PDF, waits for
+ingestion to complete over the socket, then sends chat queries. The app
+runs in-process on its own event loop (or elsewhere via --url) with
+ChatGroq pointed at the fake server, whose latency and token streaming
+are configurable.
+
+Reports per-endpoint throughput, error rate and latency percentiles, plus
+the app's event-loop lag sampled while under load, to help size a worker.
+
+Usage:
+    python -m benchmarks.load_test [--users 8] [--queries 5] [--llm-latency-ms 300]
+    python -m benchmarks.load_test --url http://localhost:8000 --users 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class EndpointStats:
+    """Latencies and errors per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, started: float, ok: bool) -> None:
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self, duration: float) -> Dict[str, Dict[str, float]]:
+        from benchmarks.common import latency_summary
+
+        return {
+            endpoint: {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / duration, 3),
+                "error_rate": round(self.errors[endpoint] / len(latencies), 4),
+                **{key: round(value, 1) for key, value in latency_summary(latencies).items() if key != "count"}
+            }
+            for endpoint, latencies in sorted(self.latencies.items())
+        }
+
+
+async def probe_loop_lag(samples: List[float], stop: threading.Event, interval: float = 0.05) -> None:
+    """Record how late the event loop wakes from a fixed sleep"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+class InProcessApp:
+    """Serve app.main:app on a background thread with its own event loop"""
+
+    def __init__(self, port: int):
+        import uvicorn
+        from app.main import app
+
+        self.port = port
+        self.loop = asyncio.new_event_loop()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(self.server.serve(),), daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def virtual_user(
+    client,
+    base_url: str,
+    pdf_path: Path,
+    queries: int,
+    ingest_timeout: float,
+    stats: EndpointStats
+) -> None:
+    """Connect, upload, wait for ingestion, then chat"""
+    import websockets
+
+    session_id = str(uuid.uuid4())
+    ws_url = base_url.replace("http", "ws", 1) + f"/api/ws/{session_id}"
+    completed = asyncio.Event()
+
+    started = time.perf_counter()
+    try:
+        websocket = await websockets.connect(ws_url, ping_interval=None)
+        await websocket.recv()
+        stats.record("ws_connect", started, True)
+    except Exception:
+        stats.record("ws_connect", started, False)
+        return
+
+    async def listen():
+        try:
+            async for raw in websocket:
+                message = json.loads(raw) if raw.startswith("{") else {}
+                if message.get("type") == "progress":
+                    stats.latencies["ws_progress_messages"].append(0.0)
+                    if message.get("status") in ("completed", "error"):
+                        completed.set()
+        except Exception:
+            completed.set()
+
+    listener = asyncio.create_task(listen())
+
+    try:
+        started = time.perf_counter()
+        with open(pdf_path, "rb") as f:
+            response = await client.post(
+                f"{base_url}/api/upload",
+                files={"file": (pdf_path.name, f.read(), "application/pdf")},
+                data={"session_id": session_id}
+            )
+        stats.record("upload", started, response.status_code == 200)
+        if response.status_code != 200:
+            return
+
+        try:
+            await asyncio.wait_for(completed.wait(), timeout=ingest_timeout)
+            stats.record("ingestion", started, True)
+        except asyncio.TimeoutError:
+            stats.record("ingestion", started, False)
+            return
+
+        for i in range(queries):
+            started = time.perf_counter()
+            response = await client.post(
+                f"{base_url}/api/chat",
+                json={"session_id": session_id, "query": f"What is the main topic of section {i + 1}?"}
+            )
+            stats.record("chat", started, response.status_code == 200)
+
+        started = time.perf_counter()
+        response = await client.get(f"{base_url}/api/chat/history/{session_id}")
+        stats.record("history", started, response.status_code == 200)
+    finally:
+        listener.cancel()
+        await websocket.close()
+
+
+async def run_load(args, base_url: str, pdf_path: Path, stats: EndpointStats) -> float:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.users * 2)
+    async with httpx.AsyncClient(timeout=args.request_timeout, limits=limits) as client:
+        started = time.perf_counter()
+
+        async def staggered(i: int):
+            await asyncio.sleep(i * args.ramp_up / max(1, args.users))
+            await virtual_user(client, base_url, pdf_path, args.queries, args.ingest_timeout, stats)
+
+        await asyncio.gather(*(staggered(i) for i in range(args.users)))
+        return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target an already running server instead of starting one")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent virtual users")
+    parser.add_argument("--queries", type=int, default=5, help="Chat queries per user")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="Seconds over which users start")
+    parser.add_argument("--pdf", help="PDF to upload (default: small synthetic PDF)")
+    parser.add_argument("--pages", type=int, default=2, help="Pages of the synthetic PDF")
+    parser.add_argument("--port", type=int, default=8100, help="Port for the in-process app")
+    parser.add_argument("--llm-port", type=int, default=8765, help="Port for the fake Groq server")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--llm-fail-rate", type=float, default=0.0)
+    parser.add_argument("--llm-tokens", type=int, default=150, help="Completion tokens per answer")
+    parser.add_argument("--llm-token-delay-ms", type=float, default=5.0)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--ingest-timeout", type=float, default=600.0)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="load-test-"))
+
+    from benchmarks.common import write_results, latency_summary
+    from benchmarks.fake_groq import FakeGroqServer
+    from benchmarks.synthetic_pdf import write_synthetic_pdf
+
+    pdf_path = Path(args.pdf) if args.pdf else write_synthetic_pdf(workdir / "load.pdf", args.pages)
+    stats = EndpointStats()
+    lag_samples: List[float] = []
+    stop_probe = threading.Event()
+
+    fake_groq = FakeGroqServer(
+        port=args.llm_port,
+        latency_ms=args.llm_latency_ms,
+        jitter_ms=args.llm_jitter_ms,
+        fail_rate=args.llm_fail_rate,
+        completion_tokens=args.llm_tokens,
+        token_delay_ms=args.llm_token_delay_ms
+    )
+
+    app_server: Optional[InProcessApp] = None
+    with fake_groq:
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            # Configure before app modules read settings
+            os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/load.db"
+            os.environ["UPLOAD_DIR"] = str(workdir / "uploads")
+            os.environ["CHROMA_PERSIST_DIR"] = str(workdir / "chroma")
+            os.environ["IMAGE_DIR"] = str(workdir / "images")
+            os.environ["GROQ_BASE_URL"] = fake_groq.base_url
+
+            app_server = InProcessApp(args.port)
+            app_server.start()
+            base_url = f"http://127.0.0.1:{args.port}"
+            asyncio.run_coroutine_threadsafe(probe_loop_lag(lag_samples, stop_probe), app_server.loop)
+
+        print(f"Running {args.users} users x {args.queries} queries against {base_url}")
+        try:
+            duration = asyncio.run(run_load(args, base_url, pdf_path, stats))
+        finally:
+            stop_probe.set()
+            if app_server:
+                app_server.stop()
+
+    progress_messages = len(stats.latencies.pop("ws_progress_messages", []))
+    results = {
+        "users": args.users,
+        "queries_per_user": args.queries,
+        "duration_seconds": round(duration, 2),
+        "llm_requests": fake_groq.app.state.requests,
+        "ws_progress_messages": progress_messages,
+        "endpoints": stats.summary(duration),
+        "event_loop_lag": {key: round(value, 2) for key, value in latency_summary(lag_samples).items()} if lag_samples else None
+    }
+
+    print(f"\n{'endpoint':<12} {'reqs':>6} {'rps':>8} {'err':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, summary in results["endpoints"].items():
+        print(
+            f"{endpoint:<12} {summary['requests']:>6} {summary['throughput_rps']:>8} {summary['error_rate']:>7.1%} "
+            f"{summary['p50_ms']:>9} {summary['p95_ms']:>9} {summary['p99_ms']:>9}"
+        )
+    if results["event_loop_lag"]:
+        lag = results["event_loop_lag"]
+        print(f"\nevent loop lag: p50={lag['p50_ms']}ms p99={lag['p99_ms']}ms max={lag['max_ms']}ms")
+
+    if args.output:
+        write_results(args.output, "load_test", results)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Benchmark of logging cost on the request thread.
+
+Replays the log calls of a chat request and of a document's progress
+updates against two pipelines writing to temporary files:
+
+- legacy: synchronous StreamHandler + FileHandler with eager f-strings at
+  INFO, as app/utils/logger.py was configured before
+- queued: the current queue handler, JSON formatting on the writer
+  thread, rate limiting and lazy %-style messages (per-update progress
+  logs at DEBUG)
+
+Reports microseconds spent by the caller per request, which is the time
+the event loop is blocked.
+
+Usage:
+    python -m benchmarks.logging_overhead [--requests 2000] [--progress-updates 40]
+"""
+
+import argparse
+import logging
+import logging.handlers
+import queue
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import write_results
+from app.utils.logger import JsonFormatter, RateLimitFilter, _LazyQueueHandler
+
+
+def legacy_logger(log_dir: Path) -> logging.Logger:
+    logger = logging.getLogger("bench.legacy")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+    )
+    console = logging.StreamHandler(open(log_dir / "legacy_console.log", "w", encoding="utf-8"))
+    console.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+    file_handler = logging.FileHandler(log_dir / "legacy.log", encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    logger.addHandler(console)
+    logger.addHandler(file_handler)
+    return logger
+
+
+def queued_logger(log_dir: Path, rate_limit: float):
+    logger = logging.getLogger("bench.queued")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    log_queue = queue.SimpleQueue()
+    handler = _LazyQueueHandler(log_queue)
+    handler.addFilter(RateLimitFilter(rate_limit))
+    logger.addHandler(handler)
+
+    console = logging.StreamHandler(open(log_dir / "queued_console.log", "w", encoding="utf-8"))
+    console.setFormatter(JsonFormatter())
+    file_handler = logging.FileHandler(log_dir / "queued.log", encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, console, file_handler)
+    listener.start()
+    return logger, listener
+
+
+def legacy_request(logger: logging.Logger, session_id: str, query: str, updates: int) -> None:
+    logger.info(f"Chat request from session {session_id}: {query[:100]}")
+    logger.info(f"Processing query for session {session_id}: {query[:100]}")
+    logger.info(f"Query processed in {0.42:.2f}s")
+    logger.info(f"Created chat message: {session_id} for session {session_id}")
+    for progress in range(updates):
+        logger.info(f"Progress update - Document: {session_id}, Stage: vectorization, Progress: {progress}%")
+        logger.info(f"Sending progress update to {session_id}: vectorization - {progress}%")
+        logger.info(f"Progress update sent successfully to {session_id}")
+
+
+def queued_request(logger: logging.Logger, session_id: str, query: str, updates: int) -> None:
+    logger.info("Chat request from session %s: %.100s", session_id, query)
+    logger.info("Processing query for session %s: %.100s", session_id, query)
+    logger.info("Query processed in %.2fs", 0.42)
+    logger.info("Created chat message: %s for session %s", session_id, session_id)
+    for progress in range(updates):
+        logger.debug("Progress update - Document: %s, Stage: %s, Progress: %s%%", session_id, "vectorization", progress)
+        logger.debug("Sent progress update to %s: %s - %s%%", session_id, "vectorization", progress)
+
+
+def run(replay, logger, requests: int, updates: int) -> float:
+    """Mean caller-side seconds per request"""
+    query = "What BLEU score does the big Transformer reach on English-to-German translation?"
+    started = time.perf_counter()
+    for i in range(requests):
+        replay(logger, f"session-{i % 32:04d}", query, updates)
+    return (time.perf_counter() - started) / requests
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests replayed per pipeline")
+    parser.add_argument("--progress-updates", type=int, default=40, help="Progress updates logged per request")
+    parser.add_argument("--rate-limit", type=float, default=20.0, help="INFO records per call site per second")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+
+        legacy = run(legacy_request, legacy_logger(log_dir), args.requests, args.progress_updates)
+
+        logger, listener = queued_logger(log_dir, args.rate_limit)
+        queued = run(queued_request, logger, args.requests, args.progress_updates)
+        drain_started = time.perf_counter()
+        listener.stop()
+        drain_seconds = time.perf_counter() - drain_started
+
+        results = {
+            "requests": args.requests,
+            "progress_updates_per_request": args.progress_updates,
+            "legacy_us_per_request": round(legacy * 1e6, 1),
+            "queued_us_per_request": round(queued * 1e6, 1),
+            "speedup": round(legacy / queued, 1) if queued else None,
+            "writer_drain_ms": round(drain_seconds * 1000, 1),
+            "legacy_log_bytes": (log_dir / "legacy.log").stat().st_size,
+            "queued_log_bytes": (log_dir / "queued.log").stat().st_size
+        }
+
+    print(f"legacy: {results['legacy_us_per_request']} us/request on the caller")
+    print(f"queued: {results['queued_us_per_request']} us/request on the caller ({results['speedup']}x)")
+    print(f"writer thread drained the backlog in {results['writer_drain_ms']} ms")
+
+    if args.output:
+        write_results(args.output, "logging_overhead", results)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark for metrics recording overhead.
+
+Times the calls made on hot paths (histogram observe, labeled lookup,
+counter increment) and a full /metrics render, and fails if recording
+costs more than the budget per call.
+
+Usage:
+    python -m benchmarks.metrics_overhead [--budget-us 5] [--iterations 200000]
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks.common import write_results
+from app.utils.metrics import Counter, Histogram, registry
+
+
+def time_per_call(function, iterations: int) -> float:
+    """Mean seconds per call"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-us", type=float, default=5.0, help="Maximum microseconds per recording call")
+    parser.add_argument("--iterations", type=int, default=200000, help="Calls per measurement")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    histogram = Histogram("bench_seconds", "Benchmark histogram")
+    labeled = Histogram("bench_stage_seconds", "Benchmark labeled histogram", ["stage"])
+    counter = Counter("bench_events", "Benchmark counter", ["kind"])
+
+    def timed_block():
+        with histogram.time():
+            pass
+
+    baseline = time_per_call(lambda: None, args.iterations)
+    calls = {
+        "histogram_observe": lambda: histogram.observe(0.042),
+        "labeled_observe": lambda: labeled.labels("embed").observe(0.042),
+        "counter_inc": lambda: counter.labels("prompt").inc(12),
+        "histogram_time_block": timed_block,
+    }
+
+    results = {"iterations": args.iterations}
+    for name, call in calls.items():
+        seconds = max(0.0, time_per_call(call, args.iterations) - baseline)
+        results[f"{name}_us"] = round(seconds * 1e6, 3)
+        print(f"{name:<22} {results[f'{name}_us']:>8} us/call")
+
+    render_seconds = time_per_call(registry.render, 200)
+    results["render_ms"] = round(render_seconds * 1000, 3)
+    print(f"{'render':<22} {results['render_ms']:>8} ms/scrape")
+
+    if args.output:
+        write_results(args.output, "metrics_overhead", results)
+
+    slowest = max(results[f"{name}_us"] for name in calls)
+    if slowest > args.budget_us:
+        print(f"FAIL: recording costs {slowest} us/call, above {args.budget_us} us budget")
+        return 1
+
+    print("OK: recording overhead within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
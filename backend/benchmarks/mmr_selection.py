@@ -0,0 +1,119 @@
+"""
+Micro-benchmark of MMR candidate selection.
+
+Times app.utils.mmr.mmr_select against a reference implementation that
+scores every candidate/selected pair in a Python loop. It also times
+LangChain's maximal_marginal_relevance when it is installed. Candidate
+sets of 50 to 500 random unit vectors are used, each with planted
+near-duplicates. The benchmark checks that the vectorized and reference
+implementations pick the same candidates.
+
+Usage:
+    python -m benchmarks.mmr_selection [--candidates 50 100 200 500] [--k 10] [--dim 384]
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from benchmarks.common import latency_summary, write_results
+from app.utils.mmr import mmr_select
+
+
+def reference_mmr(query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """Textbook MMR with per-pair similarity computed in Python loops"""
+    def cosine(a, b):
+        return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+    relevance = [cosine(query, candidate) for candidate in candidates]
+    selected: List[int] = []
+    while len(selected) < min(k, len(candidates)):
+        best, best_score = -1, -np.inf
+        for i, candidate in enumerate(candidates):
+            if i in selected:
+                continue
+            redundancy = max((cosine(candidate, candidates[j]) for j in selected), default=0.0)
+            score = lambda_mult * relevance[i] - (1 - lambda_mult) * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+    return selected
+
+
+def candidate_set(size: int, dim: int, rng: np.random.Generator):
+    """Random unit vectors where a fifth of candidates are near-duplicates"""
+    query = rng.normal(size=dim).astype(np.float32)
+    candidates = rng.normal(size=(size, dim)).astype(np.float32) + 0.3 * query
+    duplicates = rng.choice(size, size // 5, replace=False)
+    candidates[duplicates] = candidates[(duplicates + 1) % size] + rng.normal(scale=0.01, size=(len(duplicates), dim))
+    candidates /= np.linalg.norm(candidates, axis=1, keepdims=True)
+    return query / np.linalg.norm(query), candidates
+
+
+def time_calls(function: Callable, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[50, 100, 200, 500], help="Candidate set sizes")
+    parser.add_argument("--k", type=int, default=10, help="Candidates selected")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension (bge-small: 384)")
+    parser.add_argument("--lambda-mult", type=float, default=0.5, help="MMR relevance/diversity trade-off")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed calls per implementation")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    try:
+        from langchain_community.vectorstores.utils import maximal_marginal_relevance
+    except ImportError:
+        maximal_marginal_relevance = None
+
+    rng = np.random.default_rng(0)
+    rows = []
+
+    for size in args.candidates:
+        query, candidates = candidate_set(size, args.dim, rng)
+
+        vectorized = mmr_select(query, candidates, args.k, args.lambda_mult)
+        reference = reference_mmr(query, candidates, args.k, args.lambda_mult)
+
+        implementations = {
+            "vectorized": lambda: mmr_select(query, candidates, args.k, args.lambda_mult),
+            "python_loops": lambda: reference_mmr(query, candidates, args.k, args.lambda_mult),
+        }
+        if maximal_marginal_relevance:
+            implementations["langchain"] = lambda: maximal_marginal_relevance(
+                query, candidates, lambda_mult=args.lambda_mult, k=args.k
+            )
+
+        row = {"candidates": size, "same_selection": vectorized == reference}
+        for name, function in implementations.items():
+            # The loop reference is slow; fewer calls still give a stable median
+            repeat = max(3, args.repeat // 10) if name == "python_loops" else args.repeat
+            row[name] = {
+                key: round(value, 4)
+                for key, value in latency_summary(time_calls(function, repeat)).items()
+                if key in ("p50_ms", "p95_ms")
+            }
+        rows.append(row)
+
+        line = "  ".join(f"{name} p50 {row[name]['p50_ms']:.3f} ms" for name in implementations)
+        print(f"{size:>4} candidates: {line}  same selection: {row['same_selection']}")
+
+    if args.output:
+        write_results(args.output, "mmr_selection", {"k": args.k, "dim": args.dim, "runs": rows})
+
+    return 0 if all(row["same_selection"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Load test for query embedding micro-batching.
+
+Simulates concurrent chat requests embedding their queries, with and
+without QueryEmbeddingBatcher, and reports throughput against p50/p99
+latency for each concurrency level.
+
+Usage:
+    python -m benchmarks.query_batching [--concurrency 1 4 16 32] [--requests 256]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks.common import latency_summary, write_results
+from app.config import settings
+from app.services.embeddings import create_embeddings
+from app.services.query_batcher import QueryEmbeddingBatcher
+
+
+QUERIES = [
+    "What are the two main components of the Transformer architecture?",
+    "How many attention heads does the Transformer use, and what is the dimension of each head?",
+    "What is scaled dot-product attention?",
+    "Why use self-attention instead of recurrent layers?",
+    "What BLEU score does the big Transformer reach on English-to-German?",
+    "How are positional encodings computed?",
+    "What optimizer and learning rate schedule were used for training?",
+    "What regularization techniques does the model use?",
+]
+
+
+async def run_level(embed, concurrency: int, total: int) -> dict:
+    """Run total queries with the given number of concurrent clients"""
+    latencies = []
+    counter = iter(range(total))
+
+    async def client():
+        for i in counter:
+            started = time.perf_counter()
+            await embed(QUERIES[i % len(QUERIES)])
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "throughput_qps": round(total / elapsed, 2),
+        **{key: round(value, 2) for key, value in latency_summary(latencies).items()}
+    }
+
+
+async def main_async(args) -> dict:
+    embeddings = create_embeddings()
+    embeddings.embed_query("warm-up")
+
+    loop = asyncio.get_running_loop()
+
+    async def unbatched(text):
+        return await loop.run_in_executor(None, embeddings.embed_query, text)
+
+    results = {"unbatched": [], "batched": []}
+
+    for concurrency in args.concurrency:
+        results["unbatched"].append(await run_level(unbatched, concurrency, args.requests))
+
+        batcher = QueryEmbeddingBatcher(embeddings, max_wait_ms=args.max_wait_ms, max_batch=args.max_batch)
+        level = await run_level(batcher.embed_query, concurrency, args.requests)
+        level["mean_batch_size"] = round(batcher.mean_batch_size, 2)
+        batcher.shutdown()
+        results["batched"].append(level)
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--requests", type=int, default=256, help="Queries per concurrency level")
+    parser.add_argument("--max-wait-ms", type=float, default=settings.QUERY_BATCH_MAX_WAIT_MS)
+    parser.add_argument("--max-batch", type=int, default=settings.QUERY_BATCH_MAX_SIZE)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print(f"{'mode':<10} {'conc':>5} {'qps':>9} {'p50 ms':>9} {'p99 ms':>9} {'batch':>6}")
+    for mode, levels in results.items():
+        for level in levels:
+            print(
+                f"{mode:<10} {level['concurrency']:>5} {level['throughput_qps']:>9} "
+                f"{level['p50_ms']:>9} {level['p99_ms']:>9} {level.get('mean_batch_size', 1):>6}"
+            )
+
+    if args.output:
+        write_results(args.output, "query_batching", results)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Offline retrieval quality and latency evaluation.
+
+Builds a session vector store from the sample PDF chunks (or from PDFs
+partitioned on the fly), runs every question in the question set through
+RAGService.retrieve, and reports recall@k, MRR and p50/p95/p99 retrieval
+latency. The LLM is pointed at the local fake server, so no Groq key or
+network is needed and results are deterministic.
+
+Usage:
+    python -m benchmarks.retrieval_eval [--k 1 3 5 10] [--repeat 5] [--output results.json]
+    python -m benchmarks.retrieval_eval --pdf ../docs/attention-is-all-you-need.pdf
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+QUESTIONS = Path(__file__).parent / "data" / "retrieval_questions.json"
+
+
+async def build_session(args, session_id: str) -> int:
+    """Index the evaluation corpus into a fresh session"""
+    from benchmarks.common import load_sample_chunks
+    from app.services.vectorization_service import VectorizationService
+
+    vectorization_service = VectorizationService()
+
+    if not args.pdf:
+        chunks = load_sample_chunks()
+        await vectorization_service.create_vector_store(chunks, session_id, str(uuid.uuid4()), "attention-is-all-you-need.pdf")
+        return len(chunks)
+
+    from app.services.document_processor import DocumentProcessor
+    from app.services.chunking_service import ChunkingService
+
+    total = 0
+    for pdf in args.pdf:
+        partition_result = await DocumentProcessor().partition_pdf(pdf)
+        chunks = await ChunkingService().create_chunks(partition_result["elements"])
+        await vectorization_service.create_vector_store(chunks, session_id, str(uuid.uuid4()), Path(pdf).name)
+        total += len(chunks)
+    return total
+
+
+async def evaluate(args) -> Dict[str, Any]:
+    from benchmarks.common import latency_summary
+    from app.services.rag_service import RAGService
+
+    with open(QUESTIONS, encoding="utf-8") as f:
+        questions = json.load(f)["questions"]
+
+    session_id = f"eval-{uuid.uuid4()}"
+    corpus_size = await build_session(args, session_id)
+    rag_service = RAGService()
+
+    max_k = max(args.k)
+    recall = {k: [] for k in args.k}
+    reciprocal_ranks: List[float] = []
+    latencies: List[float] = []
+    per_question = []
+
+    # Warm-up so model and store loading don't count towards latency
+    await rag_service.retrieve(session_id, questions[0]["query"], max_k)
+
+    for question in questions:
+        relevant = set(question["relevant_chunk_ids"])
+
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            chunks = await rag_service.retrieve(session_id, question["query"], max_k)
+            latencies.append(time.perf_counter() - started)
+
+        retrieved = [chunk.metadata.get("chunk_id") for chunk in chunks]
+
+        for k in args.k:
+            recall[k].append(len(relevant & set(retrieved[:k])) / len(relevant))
+
+        rank = next((i + 1 for i, chunk_id in enumerate(retrieved) if chunk_id in relevant), None)
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+        per_question.append({"query": question["query"], "relevant": sorted(relevant), "retrieved": retrieved, "rank": rank})
+
+    return {
+        "corpus_chunks": corpus_size,
+        "questions": len(questions),
+        "recall": {f"@{k}": round(sum(values) / len(values), 4) for k, values in recall.items()},
+        "mrr": round(sum(reciprocal_ranks) / len(reciprocal_ranks), 4),
+        "latency": {key: round(value, 3) for key, value in latency_summary(latencies).items()},
+        "per_question": per_question
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed retrievals per question")
+    parser.add_argument("--pdf", nargs="*", help="Partition these PDFs instead of using the exported sample chunks")
+    parser.add_argument("--port", type=int, default=8766, help="Port for the fake LLM server")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--verbose", action="store_true", help="Print per-question rankings")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="retrieval-eval-")
+
+    # Configure before app modules read settings
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/eval.db"
+    os.environ["CHROMA_PERSIST_DIR"] = f"{workdir}/chroma"
+    os.environ["IMAGE_DIR"] = f"{workdir}/images"
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    # Measure uncached, unrouted retrieval over the single-document corpus
+    os.environ["RETRIEVAL_CACHE_SIZE"] = "0"
+    os.environ["DOCUMENT_ROUTING"] = "false"
+
+    from benchmarks.common import write_results
+    from benchmarks.fake_groq import FakeGroqServer
+
+    with FakeGroqServer(port=args.port, latency_ms=0):
+        results = asyncio.run(evaluate(args))
+
+    if args.verbose:
+        for question in results["per_question"]:
+            print(f"rank {str(question['rank']):>4}  {question['query']}  retrieved={question['retrieved']}")
+
+    print(f"corpus: {results['corpus_chunks']} chunks, {results['questions']} questions")
+    print("recall " + "  ".join(f"{k}={value:.3f}" for k, value in results["recall"].items()))
+    print(f"MRR    {results['mrr']:.3f}")
+    latency = results["latency"]
+    print(f"latency p50={latency['p50_ms']}ms p95={latency['p95_ms']}ms p99={latency['p99_ms']}ms")
+
+    if args.output:
+        write_results(args.output, "retrieval_eval", results)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Summarization stage against the local fake LLM server.
+
+Summarizes the sample PDF chunks twice with a throwaway database: the
+first pass exercises bounded concurrency and rate limiting, the second
+must be served entirely from the summary cache. Pass --latency-ms above
+SUMMARY_TIMEOUT to exercise the raw-text fallback.
+
+Usage:
+    python -m benchmarks.summarization [--latency-ms 300] [--concurrency 4] [--rpm 600]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=600.0)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="summary-bench-")
+
+    # Configure before app modules read settings
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ["SUMMARY_CONCURRENCY"] = str(args.concurrency)
+    os.environ["SUMMARY_REQUESTS_PER_MINUTE"] = str(args.rpm)
+    os.environ["SUMMARY_TIMEOUT"] = str(args.timeout)
+
+    from benchmarks.common import load_sample_chunks
+    from benchmarks.fake_groq import FakeGroqServer
+    from app.database import init_db
+    from app.services.summarization_service import SummarizationService
+
+    init_db()
+
+    with FakeGroqServer(port=args.port, latency_ms=args.latency_ms) as server:
+        for label in ("cold", "cached"):
+            chunks = load_sample_chunks()
+            service = SummarizationService()
+            requests_before = server.app.state.requests
+
+            started = time.perf_counter()
+            asyncio.run(service.summarize_chunks(chunks))
+            elapsed = time.perf_counter() - started
+
+            summarized = sum(1 for chunk in chunks if "summary" in chunk)
+            print(
+                f"{label:>6}: {len(chunks)} chunks in {elapsed:.2f}s, "
+                f"{summarized} summarized, {server.app.state.requests - requests_before} LLM requests"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
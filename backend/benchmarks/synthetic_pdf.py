@@ -0,0 +1,78 @@
+"""Synthetic multi-page PDF generation for benchmarks"""
+
+import random
+from pathlib import Path
+from typing import List
+
+
+WORDS = (
+    "attention model encoder decoder layer sequence token embedding vector "
+    "training inference latency throughput batch gradient weight parameter "
+    "retrieval document chunk table image query answer context score"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(page_number: int, rng: random.Random) -> bytes:
+    """Content stream with a heading and wrapped paragraphs"""
+    lines: List[str] = ["BT", "/F1 18 Tf", "72 740 Td", f"({_escape(f'Section {page_number}: Synthetic Heading')}) Tj"]
+    lines += ["/F1 11 Tf", "0 -28 Td", "14 TL"]
+
+    for _ in range(6):
+        for _ in range(7):
+            sentence = " ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "."
+            lines.append(f"({_escape(sentence)}) Tj T*")
+        lines.append("T*")
+
+    lines.append("ET")
+    return "\n".join(lines).encode("latin-1")
+
+
+def write_synthetic_pdf(path: Path, pages: int, seed: int = 0) -> Path:
+    """
+    Write a text-only PDF with one titled section per page.
+
+    Args:
+        path: Output path
+        pages: Number of pages
+        seed: Random seed for deterministic content
+
+    Returns:
+        The output path
+    """
+    rng = random.Random(seed)
+    objects: List[bytes] = []
+
+    # 1: catalog, 2: page tree, 3: font, then (page, content) pairs
+    page_ids = [4 + 2 * i for i in range(pages)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for i, page_id in enumerate(page_ids):
+        stream = _page_stream(i + 1, rng)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+
+    path = Path(path)
+    path.write_bytes(bytes(output))
+    return path
@@ -0,0 +1,182 @@
+"""
+Memory benchmark of multi-worker serving.
+
+Starts the API with 1, 2 and 4 workers in two modes and measures the
+memory of the whole process tree once every worker reports ready:
+
+- prefork: `python -m app.serve`, models loaded once in the parent and
+  shared copy-on-write by the forked workers
+- independent: `uvicorn app.main:app --workers N`, every worker loads
+  its own models
+
+PSS (proportional set size) splits shared pages between the processes
+mapping them, so the summed PSS is the real memory cost of a deployment;
+summed RSS counts shared pages once per process. Linux only.
+
+Usage:
+    python -m benchmarks.worker_memory [--workers 1 2 4] [--modes prefork independent]
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import write_results
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def command(mode: str, workers: int, port: int) -> List[str]:
+    if mode == "prefork":
+        return [sys.executable, "-m", "app.serve", "--workers", str(workers), "--port", str(port)]
+    return [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--workers", str(workers), "--port", str(port)
+    ]
+
+
+def wait_until_ready(port: int, workers: int, timeout: float) -> float:
+    """
+    Poll /ready until enough consecutive successes that every worker has
+    likely answered, returning the seconds waited.
+    """
+    url = f"http://127.0.0.1:{port}/ready"
+    needed = workers * 3
+    streak = 0
+    started = time.perf_counter()
+
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                streak = streak + 1 if response.status == 200 else 0
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            streak = 0
+
+        if streak >= needed:
+            return time.perf_counter() - started
+        time.sleep(0.05 if streak else 0.5)
+
+    raise TimeoutError(f"Server on port {port} not ready after {timeout:.0f}s")
+
+
+def process_tree(pid: int) -> List[int]:
+    """A process and all of its descendants"""
+    pids = [pid]
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        children = (task / "children").read_text().split()
+        for child in children:
+            pids.extend(process_tree(int(child)))
+    return pids
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """Rss, Pss and shared/private totals from /proc/<pid>/smaps_rollup"""
+    values = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, _, rest = line.partition(":")
+        parts = rest.split()
+        if parts and parts[-1] == "kB":
+            values[name] = int(parts[0])
+
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "shared": values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0),
+        "private": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+    }
+
+
+def measure(mode: str, workers: int, port: int, timeout: float, settle: float) -> Dict[str, float]:
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+    env["WARMUP_ON_STARTUP"] = "true"
+    env["RETENTION_SWEEP_ENABLED"] = "false"
+
+    server = subprocess.Popen(
+        command(mode, workers, port),
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    try:
+        ready_seconds = wait_until_ready(port, workers, timeout)
+        time.sleep(settle)
+
+        totals = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+        pids = process_tree(server.pid)
+        for pid in pids:
+            try:
+                for key, value in memory_kb(pid).items():
+                    totals[key] += value
+            except FileNotFoundError:
+                continue
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "processes": len(pids),
+        "ready_seconds": round(ready_seconds, 1),
+        "rss_mb": round(totals["rss"] / 1024, 1),
+        "pss_mb": round(totals["pss"] / 1024, 1),
+        "shared_mb": round(totals["shared"] / 1024, 1),
+        "private_mb": round(totals["private"] / 1024, 1),
+        "pss_mb_per_worker": round(totals["pss"] / 1024 / workers, 1)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to measure")
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["prefork", "independent"],
+        default=["prefork", "independent"],
+        help="Serving modes to compare"
+    )
+    parser.add_argument("--port", type=int, default=8765, help="Port used by the servers under test")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for readiness")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds to wait after readiness before measuring")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        print("This benchmark needs Linux /proc/<pid>/smaps_rollup")
+        return 1
+
+    runs = []
+    for mode in args.modes:
+        for workers in args.workers:
+            run = measure(mode, workers, args.port, args.timeout, args.settle)
+            runs.append(run)
+            print(
+                f"{mode:<12} {workers} workers: PSS {run['pss_mb']:>8} MB "
+                f"({run['pss_mb_per_worker']} MB/worker), RSS {run['rss_mb']:>8} MB, "
+                f"shared {run['shared_mb']} MB, ready in {run['ready_seconds']}s"
+            )
+
+    if args.output:
+        write_results(args.output, "worker_memory", {"runs": runs})
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())